@@ -2,26 +2,23 @@
 Decisum - App Principal
 Sistema de Decisões Judiciais com Autenticação
 """
+import time
+from services.startup_profiler import PROFILE_ENABLED, start_import_profiling, record_render
+
+SCRIPT_STARTED = time.perf_counter()
+
+# Modo de perfil: medir imports a partir daqui
+if PROFILE_ENABLED:
+    start_import_profiling()
+
 import streamlit as st
-import sys
-import os
 from datetime import datetime
 
-# Adicionar pastas ao path
-sys.path.append(os.path.join(os.path.dirname(__file__), 'config'))
-sys.path.append(os.path.join(os.path.dirname(__file__), 'services'))
-sys.path.append(os.path.join(os.path.dirname(__file__), 'components'))
-
-from config.supabase_config import test_connection
+# Módulos das páginas (Gemini, PyPDF2, Supabase...) são importados apenas na página que os usa
 from components.auth_components import (
     show_login_page, check_authentication, get_current_user, 
-    is_admin, show_admin_panel, show_logout_button
-)
-from components.process_components import (
-    show_process_upload, show_process_list, show_process_viewer
+    is_admin, show_logout_button
 )
-from components.decision_generator_v2 import show_decision_generator_v3
-from components.prompt_manager import show_prompt_manager
 
 def main():
     st.set_page_config(
@@ -30,15 +27,24 @@ def main():
         layout="wide"
     )
     
-    # Executar limpeza automática silenciosa
-    from services.cleanup_service import run_auto_cleanup
-    run_auto_cleanup()
-    
     # Verificar se usuário está logado
     if not check_authentication():
         show_login_page()
+        show_startup_profile("Login")
         return
     
+    # Executar limpeza automática silenciosa (uma vez por sessão, após o login)
+    from services.cleanup_service import run_auto_cleanup
+    run_auto_cleanup()
+    
+    # Retomar o envio de gravações pendentes (ex.: após reinício do servidor)
+    from services.write_queue_service import start_flusher
+    start_flusher()
+    
+    # Exportação das métricas (apenas com DECISUM_METRICS_PORT definido)
+    from services.metrics_service import start_metrics_server
+    start_metrics_server()
+    
     # Usuário logado - mostrar aplicação principal
     user_data = get_current_user()
     
@@ -54,45 +60,79 @@ def main():
         if is_admin():
             page = st.selectbox(
                 "Navegação",
-                ["Dashboard", "Painel Admin", "Upload Processo", "Meus Processos", "Gerar Decisões", "Gerenciar Prompts", "Configurações"]
+                ["Dashboard", "Painel Admin", "Desempenho", "Upload Processo", "Meus Processos", "Gerar Decisões", "Histórico de Decisões", "Gerenciar Prompts", "Configurações"]
             )
         else:
             page = st.selectbox(
                 "Navegação", 
-                ["Dashboard", "Upload Processo", "Meus Processos", "Gerenciar Prompts", "Gerar Decisões", "Configurações"]
+                ["Dashboard", "Upload Processo", "Meus Processos", "Gerenciar Prompts", "Gerar Decisões", "Histórico de Decisões", "Configurações"]
             )
         
         show_logout_button()
     
-    # Conteúdo principal baseado na página selecionada
+    # Conteúdo principal baseado na página selecionada (consultas ao banco rastreadas)
+    from services.query_tracer import trace_queries, check_query_budget, get_query_budget
+    with trace_queries(page) as trace:
+        render_page(page)
+    
+    if not check_query_budget(trace) and is_admin():
+        st.sidebar.warning(f"⚠️ {trace['count']} consultas ao banco nesta página (orçamento: {get_query_budget(page)})")
+    
+    show_startup_profile(page)
+
+def render_page(page: str):
+    """Renderiza a página selecionada no menu"""
     if page == "Dashboard":
         show_dashboard()
     elif page == "Painel Admin" and is_admin():
+        from components.auth_components import show_admin_panel
         show_admin_panel()
+    elif page == "Desempenho" and is_admin():
+        from components.performance_dashboard import show_performance_dashboard
+        show_performance_dashboard()
     elif page == "Upload Processo":
         show_upload_page()
     elif page == "Meus Processos":
         show_my_processes_page()
     elif page == "Gerenciar Prompts":
+        from components.prompt_manager import show_prompt_manager
         show_prompt_manager()
     elif page == "Gerar Decisões":
         show_decision_generator()
+    elif page == "Histórico de Decisões":
+        from components.decision_history import show_decision_history
+        show_decision_history()
     elif page == "Configurações":
         show_settings()
     else:
         st.info(f"Página '{page}' em desenvolvimento...")
 
+def show_startup_profile(page: str):
+    """Relatório de inicialização (apenas com DECISUM_PROFILE_STARTUP=1)"""
+    if not PROFILE_ENABLED:
+        return
+    
+    from services.startup_profiler import get_startup_report
+    record_render(page, SCRIPT_STARTED)
+    report = get_startup_report()
+    
+    print(f"[startup-profile] {page}: {report['first_render'].get(page)}")
+    with st.sidebar.expander("⏱️ Perfil de Inicialização"):
+        st.json(report)
+
 def show_dashboard():
     """Página principal do dashboard com estatísticas colaborativas"""
     st.title("📊 Dashboard - Decisum")
     
-    from services.stats_service import (
-        get_system_overview, get_decision_stats, get_top_legal_areas, 
-        get_recent_prompts, get_top_prompt_contributors, format_time_ago
-    )
+    from services.stats_service import format_time_ago
+    from services.async_service import get_dashboard_stats
     
     user_data = get_current_user()
     
+    # Consultas independentes em paralelo no cliente assíncrono
+    # (seção com erro ou sem resposta no tempo limite fica vazia)
+    stats = get_dashboard_stats()
+    
     # Boas vindas personalizada
     st.markdown(f"### Bem-vindo, **{user_data.get('email').split('@')[0].title()}**! 👋")
     st.markdown("*Visão colaborativa de toda a comunidade Decisum*")
@@ -100,7 +140,7 @@ def show_dashboard():
     # Seção 1: Visão Geral do Sistema
     st.markdown("### 🌐 Visão Geral da Comunidade")
     
-    overview = get_system_overview()
+    overview = stats["overview"]
     if overview["success"]:
         col1, col2, col3, col4 = st.columns(4)
         
@@ -137,7 +177,7 @@ def show_dashboard():
     # Seção 2: Estatísticas de Decisões Geradas
     st.markdown("### ⚖️ Decisões Geradas pela Comunidade")
     
-    decision_stats = get_decision_stats()
+    decision_stats = stats["decision_stats"]
     if decision_stats["success"] and decision_stats["total_decisions"] > 0:
         col_stats, col_chart = st.columns([1, 2])
         
@@ -176,7 +216,7 @@ def show_dashboard():
     with col_areas:
         st.markdown("### 🏛️ Top 5 Áreas Jurídicas")
         
-        top_areas = get_top_legal_areas()
+        top_areas = stats["top_areas"]
         if top_areas["success"] and top_areas["areas"]:
             for i, area_data in enumerate(top_areas["areas"], 1):
                 # Emoji baseado na posição
@@ -192,7 +232,7 @@ def show_dashboard():
     with col_contributors:
         st.markdown("### 🏆 Top Contribuidores de Prompts")
         
-        top_contributors = get_top_prompt_contributors()
+        top_contributors = stats["top_contributors"]
         if top_contributors["success"] and top_contributors["contributors"]:
             for i, contributor in enumerate(top_contributors["contributors"][:5], 1):
                 # Emoji baseado na posição
@@ -210,7 +250,7 @@ def show_dashboard():
     # Seção 4: Últimos Prompts Adicionados
     st.markdown("### 🆕 Últimos Prompts da Comunidade")
     
-    recent_prompts = get_recent_prompts()
+    recent_prompts = stats["recent_prompts"]
     if recent_prompts["success"] and recent_prompts["prompts"]:
         # Mostrar últimos 5 prompts em cards
         for prompt in recent_prompts["prompts"][:5]:
@@ -247,6 +287,7 @@ def show_dashboard():
     # Seção final: Teste de Conexão (mantido para desenvolvimento)
     with st.expander("🔧 Testes de Sistema (Desenvolvimento)"):
         if st.button("Testar Conexão Supabase"):
+            from config.supabase_config import test_connection
             with st.spinner("Testando..."):
                 if test_connection():
                     st.success("✅ Conexão funcionando!")
@@ -262,9 +303,9 @@ def show_dashboard():
         })
 
 def show_decision_generator():
-    """Página de geração de decisões - Versão 3.1 MELHORADA"""
-    from components.decision_generator_v3_improved import show_decision_generator_v3_improved
-    show_decision_generator_v3_improved()
+    """Página de geração de decisões"""
+    from components.decision_generator import show_decision_generator as show_generator
+    show_generator()
 
 def show_settings():
     """Página de configurações com limpeza automática"""
@@ -368,6 +409,8 @@ def show_settings():
         - 📊 **Limite por usuário:** máximo **5 processos** simultâneos
         - 🔄 **Execução:** a cada acesso ao sistema
         
+        Processos importados em lote pelo administrador não expiram nem contam no limite.
+        
         **Por que fazemos isso?**
         - ⚡ Manter sistema rápido e responsivo
         - 💾 Evitar sobrecarga do banco de dados
@@ -434,7 +477,7 @@ def show_settings():
         - **Limite atingido**: Máximo 5 processos por usuário
         - **Erro de chave API**: Verifique se a chave foi copiada corretamente
         - **Geração lenta**: Normal para decisões complexas (até 2-3 minutos)
-        - **PDF não processado**: Certifique-se que é um PDF com texto (não imagem)
+        - **PDF não processado**: PDFs escaneados dependem do OCR local (Tesseract) estar instalado
         
         **Dicas de uso:**
         - Baixe decisões importantes antes das 24h
@@ -467,7 +510,8 @@ def show_settings():
             # Limpar session_state
             keys_to_clear = ['generated_decision', 'generation_data', 'selected_legal_area', 
                             'selected_decision_type', 'selected_prompt', 'depoimentos_processados',
-                            'processes_cache', 'viewing_prompt', 'editing_prompt', 'auto_cleanup_done']
+                            'processes_cache', 'viewing_prompt', 'editing_prompt', 'auto_cleanup_done',
+                            'history_bodies']
             cleared_count = 0
             for key in keys_to_clear:
                 if key in st.session_state:
@@ -485,11 +529,13 @@ def show_settings():
 
 def show_upload_page():
     """Página de upload de processos"""
+    from components.process_components import show_process_upload
     st.title("📤 Upload de Processo")
     show_process_upload()
 
 def show_my_processes_page():
     """Página de gerenciamento de processos"""
+    from components.process_components import show_process_list, show_process_viewer
     st.title("📁 Meus Processos")
     
     # Verificar se está visualizando um processo específico
@@ -0,0 +1,66 @@
+"""
+Benchmark de Hash de Senhas
+Mede logins/segundo (verificação scrypt) para cada fator de trabalho
+
+Uso:
+    python benchmarks/bench_password_hashing.py [--rounds 20] [--threads 4] [--json]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.password_service import hash_password, verify_password
+
+WORK_FACTORS = [2 ** 12, 2 ** 13, 2 ** 14, 2 ** 15, 2 ** 16]
+PASSWORD = "senha-de-teste-123"
+
+def measure(n: int, rounds: int, threads: int) -> dict:
+    """
+    Mede verificações por segundo em série e com o pool de threads
+    """
+    hashed = hash_password(PASSWORD, n=n)
+
+    started = time.perf_counter()
+    for _ in range(rounds):
+        verify_password(PASSWORD, hashed)
+    serial_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(lambda _: verify_password(PASSWORD, hashed), range(rounds)))
+    parallel_seconds = time.perf_counter() - started
+
+    return {
+        "n": n,
+        "memory_mb": round(128 * n * 8 / (1024 * 1024), 1),
+        "ms_per_login": round(serial_seconds / rounds * 1000, 2),
+        "logins_per_second": round(rounds / serial_seconds, 1),
+        "logins_per_second_pool": round(rounds / parallel_seconds, 1),
+        "threads": threads
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de logins/segundo por fator de trabalho do scrypt")
+    parser.add_argument("--rounds", type=int, default=20, help="Verificações por fator (padrão: 20)")
+    parser.add_argument("--threads", type=int, default=4, help="Threads do pool (padrão: 4)")
+    parser.add_argument("--json", action="store_true", help="Emitir resultado em JSON")
+    args = parser.parse_args()
+
+    results = [measure(n, args.rounds, args.threads) for n in WORK_FACTORS]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'N':>8} {'Memória':>9} {'ms/login':>9} {'logins/s':>9} {f'pool x{args.threads}':>10}")
+    for row in results:
+        print(f"{row['n']:>8} {row['memory_mb']:>7} MB {row['ms_per_login']:>9} "
+              f"{row['logins_per_second']:>9} {row['logins_per_second_pool']:>10}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+"""
+Suíte de Benchmarks Offline
+Executa os serviços contra substitutos locais do Supabase e do Gemini (benchmarks/fakes.py)
+e PDFs sintéticos (benchmarks/synthetic_pdfs.py), sem rede
+
+Mede:
+- extraction: páginas/s na extração de PDF (cache frio) e tempo com cache quente
+- prompt_assembly: tempo de montagem do prompt completo
+- dashboard: consultas ao Supabase e tempo de cada função do Dashboard/Configurações
+- generation: latência ponta a ponta da geração (extração + prompt + Gemini + gravação)
+
+Uso:
+    python benchmarks/bench_suite.py [--output resultado.json] [--compare anterior.json]
+                                     [--db-latency 0.02] [--gemini-latency 0.5] [--quick]
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Cache e fila em diretórios temporários (antes de importar os serviços)
+_WORKDIR = tempfile.mkdtemp(prefix="decisum-bench-")
+os.environ.setdefault("DECISUM_CACHE_DIR", os.path.join(_WORKDIR, "cache"))
+os.environ.setdefault("DECISUM_QUEUE_PATH", os.path.join(_WORKDIR, "queue.sqlite3"))
+os.environ.setdefault("DECISUM_PROMPT_INDEX_PATH", os.path.join(_WORKDIR, "index", "prompts.npz"))
+os.environ.setdefault("DECISUM_PRECEDENT_DIR", os.path.join(_WORKDIR, "index", "precedents"))
+
+from benchmarks.fakes import FakeSupabase, FakeGenai, install_fakes
+from benchmarks.synthetic_pdfs import make_corpus
+from services import async_service, cleanup_service, gemini_service, process_service, prompt_service, stats_service
+from services.metrics_service import percentile
+from services.write_queue_service import flush_pending
+
+BENCH_USER = {"id": "bench-user", "email": "juiz@tjrn.jus.br", "role": "admin", "approved": True}
+
+# Funções chamadas na renderização do Dashboard e das Configurações
+DASHBOARD_FUNCTIONS = {
+    "get_system_overview": stats_service.get_system_overview,
+    "get_decision_stats": stats_service.get_decision_stats,
+    "get_top_legal_areas": stats_service.get_top_legal_areas,
+    "get_top_prompt_contributors": stats_service.get_top_prompt_contributors,
+    "get_recent_prompts": stats_service.get_recent_prompts,
+    "get_system_stats": cleanup_service.get_system_stats,
+    # Mesmas cinco seções do Dashboard, em paralelo no cliente assíncrono
+    "get_dashboard_stats": async_service.get_dashboard_stats
+}
+
+def seed_tables(users: int = 50, processes_per_user: int = 5, decisions_per_user: int = 20) -> dict:
+    """
+    Dados sintéticos: usuários, prompts para cada área/tipo, processos e decisões
+    """
+    tables = {"users": [], "prompts": [], "processes": [], "decisions": []}
+    tables["users"].append({**BENCH_USER, "gemini_api_key": "fake-key", "created_at": "2024-01-01T00:00:00+00:00"})
+    for i in range(users):
+        tables["users"].append({
+            "id": f"user-{i}", "email": f"juiz{i}@tjrn.jus.br", "role": "user",
+            "approved": True, "created_at": "2024-01-01T00:00:00+00:00"
+        })
+
+    for area in prompt_service.LEGAL_AREAS.values():
+        for decision_type in prompt_service.DECISION_TYPES.values():
+            for n in range(3):
+                tables["prompts"].append({
+                    "id": f"prompt-{len(tables['prompts'])}",
+                    "title": f"{decision_type} - {area} #{n}",
+                    "legal_area": area,
+                    "decision_type": decision_type,
+                    "description": "Modelo sintético",
+                    "instruction": "Elabore a decisão com fundamentação completa. " * 20,
+                    "paradigm_block": "",
+                    "is_public": True,
+                    "created_by": f"user-{len(tables['prompts']) % users}",
+                    "created_at": "2024-01-01T00:00:00+00:00"
+                })
+
+    for user in tables["users"]:
+        for n in range(processes_per_user):
+            tables["processes"].append({
+                "id": f"process-{user['id']}-{n}", "filename": f"processo_{n}.pdf",
+                "txt_content": "texto do processo " * 2000, "user_id": user["id"],
+                "ingested": False, "created_at": "2024-01-01T00:00:00+00:00"
+            })
+        for n in range(decisions_per_user):
+            prompt = tables["prompts"][(n * 7) % len(tables["prompts"])]
+            tables["decisions"].append({
+                "id": f"decision-{user['id']}-{n}", "prompt_id": prompt["id"],
+                "process_id": None, "generated_decision": "decisão " * 500,
+                "user_id": user["id"], "created_at": "2024-01-01T00:00:00+00:00"
+            })
+    return tables
+
+def _summary(samples: list[float]) -> dict:
+    return {
+        "runs": len(samples),
+        "mean_ms": round(sum(samples) / len(samples) * 1000, 2),
+        "p50_ms": round(percentile(samples, 50) * 1000, 2),
+        "p95_ms": round(percentile(samples, 95) * 1000, 2)
+    }
+
+def bench_extraction(corpus: dict) -> dict:
+    results = {}
+    for pages, pdf_bytes in corpus.items():
+        started = time.perf_counter()
+        text, stats = process_service.extract_pdf_bytes(pdf_bytes)
+        cold = time.perf_counter() - started
+
+        started = time.perf_counter()
+        process_service.extract_pdf_bytes(pdf_bytes)
+        warm = time.perf_counter() - started
+
+        results[f"{pages}_pages"] = {
+            "cold_ms": round(cold * 1000, 2),
+            "pages_per_second": round(pages / cold, 1),
+            "warm_ms": round(warm * 1000, 2),
+            "chars": len(text),
+            "boilerplate_removed_chars": stats.get("removed_chars", 0)
+        }
+    return results
+
+def bench_prompt_assembly(corpus: dict, prompt: dict, runs: int) -> dict:
+    results = {}
+    for pages, pdf_bytes in corpus.items():
+        text, _ = process_service.extract_pdf_bytes(pdf_bytes)
+        samples = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            assembled = gemini_service.build_complete_prompt(prompt, "Julgue procedente o pedido.", text, "", "")
+            samples.append(time.perf_counter() - started)
+        results[f"{pages}_pages"] = {**_summary(samples), "prompt_chars": len(assembled)}
+    return results
+
+def bench_dashboard(supabase: FakeSupabase) -> dict:
+    results = {}
+    for name, func in DASHBOARD_FUNCTIONS.items():
+        supabase.reset_log()
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+        results[name] = {
+            "queries": len(supabase.query_log),
+            "rows_fetched": sum(query["rows"] for query in supabase.query_log),
+            "ms": round(elapsed * 1000, 2)
+        }
+    results["total"] = {
+        "queries": sum(r["queries"] for r in results.values()),
+        "rows_fetched": sum(r["rows_fetched"] for r in results.values()),
+        "ms": round(sum(r["ms"] for r in results.values()), 2)
+    }
+    return results
+
+def bench_generation(pdf_bytes: bytes, prompt: dict, supabase: FakeSupabase, runs: int) -> dict:
+    samples, save_samples = [], []
+    supabase.reset_log()
+    for n in range(runs):
+        pdf_file = io.BytesIO(pdf_bytes)
+        pdf_file.name = f"processo_{n}.pdf"
+
+        started = time.perf_counter()
+        success, result = gemini_service.generate_decision(pdf_file, prompt, "Julgue procedente o pedido.")
+        generated = time.perf_counter()
+        if not success:
+            raise RuntimeError(result)
+        gemini_service.save_generated_decision(None, prompt["id"], result, "Julgue procedente o pedido.")
+        finished = time.perf_counter()
+
+        samples.append(finished - started)
+        save_samples.append(finished - generated)
+
+    # Envia o que ficou na fila (fora da medição da requisição)
+    while flush_pending():
+        pass
+
+    return {
+        "end_to_end": _summary(samples),
+        "save_on_request_path": _summary(save_samples),
+        "queries_per_generation": round(len(supabase.query_log) / runs, 2)
+    }
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+def _flatten(data: dict, prefix: str = "") -> dict:
+    flat = {}
+    for key, value in data.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{path}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[path] = value
+    return flat
+
+def compare(current: dict, baseline: dict):
+    """
+    Imprime a variação percentual de cada métrica em relação a um resultado anterior
+    """
+    now, before = _flatten(current["results"]), _flatten(baseline["results"])
+    print(f"{'métrica':<60} {'anterior':>12} {'atual':>12} {'variação':>9}")
+    for key in sorted(now.keys() & before.keys()):
+        change = f"{(now[key] - before[key]) / before[key]:+.0%}" if before[key] else "—"
+        print(f"{key:<60} {before[key]:>12} {now[key]:>12} {change:>9}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks offline com Supabase e Gemini simulados")
+    parser.add_argument("--output", help="Grava o resultado em JSON neste arquivo (padrão: stdout)")
+    parser.add_argument("--compare", help="Resultado JSON anterior para comparação")
+    parser.add_argument("--db-latency", type=float, default=0.02, help="Latência simulada por consulta, em segundos (padrão: 0.02)")
+    parser.add_argument("--gemini-latency", type=float, default=0.5, help="Tempo até o primeiro token simulado, em segundos (padrão: 0.5)")
+    parser.add_argument("--runs", type=int, default=20, help="Repetições por medição (padrão: 20)")
+    parser.add_argument("--quick", action="store_true", help="Corpus e repetições reduzidos")
+    args = parser.parse_args()
+
+    sizes = (5, 50) if args.quick else (5, 50, 200)
+    runs = 3 if args.quick else args.runs
+
+    supabase = FakeSupabase(seed_tables(), latency=args.db_latency)
+    genai = FakeGenai(first_token_latency=args.gemini_latency)
+    install_fakes(supabase, genai, BENCH_USER)
+
+    corpus = make_corpus(sizes)
+    prompt = supabase.tables["prompts"][0]
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "db_latency_s": args.db_latency,
+            "gemini_first_token_s": args.gemini_latency,
+            "runs": runs
+        },
+        "results": {
+            "extraction": bench_extraction(corpus),
+            "prompt_assembly": bench_prompt_assembly(corpus, prompt, runs),
+            "dashboard": bench_dashboard(supabase),
+            "generation": bench_generation(corpus[sizes[-1]], prompt, supabase, max(1, runs // 4))
+        }
+    }
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(report, json.load(f))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+"""
+Substitutos locais do Supabase e do Gemini para benchmarks e testes de carga
+
+- FakeSupabase: cliente em memória compatível com o subconjunto do PostgREST usado
+  pelos serviços (select com recursos embutidos, filtros, ordenação, range, count,
+  insert/update/delete), com latência configurável e registro de cada consulta;
+  async_client() devolve a variante assíncrona sobre as mesmas tabelas
+- FakeGenai: substituto do módulo google.generativeai com latência e streaming configuráveis
+- install_fakes(): aponta os serviços já importados para os substitutos
+"""
+import asyncio
+import copy
+import re
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+# Chave estrangeira usada em cada recurso embutido: (tabela, embutido) -> coluna
+EMBED_KEYS = {
+    ("decisions", "prompts"): "prompt_id",
+    ("decisions", "processes"): "process_id",
+    ("prompts", "users"): "created_by",
+    ("gemini_usage", "prompts"): "prompt_id",
+    ("gemini_usage", "users"): "user_id"
+}
+
+_EMBED_PATTERN = re.compile(r"^(\w+)(!inner)?\((.*)\)$", re.S)
+
+class FakeAPIError(Exception):
+    """Erro no formato do postgrest (atributo code com o código PostgreSQL)"""
+    def __init__(self, message: str, code: str = None):
+        super().__init__(message)
+        self.code = code
+
+def _split_fields(fields: str) -> list[str]:
+    parts, depth, current = [], 0, ""
+    for char in fields:
+        if char == "," and depth == 0:
+            parts.append(current.strip())
+            current = ""
+            continue
+        depth += char == "("
+        depth -= char == ")"
+        current += char
+    if current.strip():
+        parts.append(current.strip())
+    return parts
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+class _Query:
+    def __init__(self, client: "FakeSupabase", table: str):
+        self.client = client
+        self.table_name = table
+        self.operation = "select"
+        self.fields = "*"
+        self.count = None
+        self.filters = []
+        self.ordering = []
+        self.row_range = None
+        self.payload = None
+        self.returning = "representation"
+
+    # Operações
+    def select(self, fields: str = "*", count: str = None):
+        self.operation, self.fields, self.count = "select", fields, count
+        return self
+
+    def insert(self, records, returning: str = "representation"):
+        self.operation, self.payload, self.returning = "insert", records, returning
+        return self
+
+    def update(self, values: dict):
+        self.operation, self.payload = "update", values
+        return self
+
+    def delete(self):
+        self.operation = "delete"
+        return self
+
+    # Filtros
+    def _filter(self, column: str, test):
+        self.filters.append((column, test))
+        return self
+
+    def eq(self, column, value):
+        return self._filter(column, lambda v: v == value)
+
+    def neq(self, column, value):
+        return self._filter(column, lambda v: v != value)
+
+    def gt(self, column, value):
+        return self._filter(column, lambda v: v is not None and v > value)
+
+    def gte(self, column, value):
+        return self._filter(column, lambda v: v is not None and v >= value)
+
+    def lt(self, column, value):
+        return self._filter(column, lambda v: v is not None and v < value)
+
+    def lte(self, column, value):
+        return self._filter(column, lambda v: v is not None and v <= value)
+
+    def in_(self, column, values):
+        values = set(values)
+        return self._filter(column, lambda v: v in values)
+
+    def ilike(self, column, pattern):
+        regex = re.compile("^" + re.escape(pattern).replace("%", ".*") + "$", re.I | re.S)
+        return self._filter(column, lambda v: v is not None and bool(regex.match(str(v))))
+
+    # Ordenação e paginação
+    def order(self, column, desc: bool = False):
+        self.ordering.append((column, desc))
+        return self
+
+    def limit(self, size: int):
+        start = self.row_range[0] if self.row_range else 0
+        self.row_range = (start, start + size - 1)
+        return self
+
+    def range(self, start: int, end: int):
+        self.row_range = (start, end)
+        return self
+
+    def execute(self):
+        return self.client._execute(self)
+
+class _AsyncQuery(_Query):
+    async def execute(self):
+        # Latência simulada sem bloquear o laço de eventos
+        if self.client.latency:
+            await asyncio.sleep(self.client.latency)
+        return self.client._execute(self, simulate_latency=False)
+
+class FakeAsyncSupabase:
+    """
+    Cliente PostgREST assíncrono sobre as mesmas tabelas e registro de um FakeSupabase
+    """
+    def __init__(self, sync_client: "FakeSupabase"):
+        self.sync_client = sync_client
+
+    def table(self, name: str) -> _AsyncQuery:
+        return _AsyncQuery(self.sync_client, name)
+
+    from_ = table
+
+class FakeSupabase:
+    """
+    Cliente Supabase em memória
+    latency: segundos simulados por requisição (ida e volta ao PostgREST)
+    """
+    def __init__(self, tables: dict = None, latency: float = 0.0):
+        self.tables = {name: list(rows) for name, rows in (tables or {}).items()}
+        self.latency = latency
+        self.query_log = []
+        self.unique_columns = {"users": ("email",)}
+        self._lock = threading.Lock()
+
+    def table(self, name: str) -> _Query:
+        return _Query(self, name)
+
+    def async_client(self) -> FakeAsyncSupabase:
+        return FakeAsyncSupabase(self)
+
+    def reset_log(self):
+        with self._lock:
+            self.query_log.clear()
+
+    # Execução
+    def _execute(self, query: _Query, simulate_latency: bool = True):
+        started = time.perf_counter()
+        if self.latency and simulate_latency:
+            time.sleep(self.latency)
+
+        with self._lock:
+            handler = getattr(self, f"_run_{query.operation}")
+            data, count = handler(query)
+            self.query_log.append({
+                "table": query.table_name,
+                "operation": query.operation,
+                "rows": len(data),
+                "seconds": time.perf_counter() - started
+            })
+
+        return SimpleNamespace(data=copy.deepcopy(data), count=count)
+
+    def _rows(self, table: str) -> list:
+        return self.tables.setdefault(table, [])
+
+    def _embedded(self, table: str, row: dict, name: str):
+        key = EMBED_KEYS.get((table, name))
+        if key is None:
+            raise FakeAPIError(f"Relacionamento desconhecido: {table} -> {name}")
+        return next((other for other in self._rows(name) if other.get("id") == row.get(key)), None)
+
+    def _value(self, table: str, row: dict, column: str):
+        if "." in column:
+            name, field = column.split(".", 1)
+            embedded = self._embedded(table, row, name)
+            return embedded.get(field) if embedded else None
+        return row.get(column)
+
+    def _matches(self, query: _Query, row: dict) -> bool:
+        return all(test(self._value(query.table_name, row, column)) for column, test in query.filters)
+
+    def _project(self, table: str, row: dict, fields: str):
+        projected = {}
+        for field in _split_fields(fields):
+            embed = _EMBED_PATTERN.match(field)
+            if embed:
+                name, inner, subfields = embed.groups()
+                embedded = self._embedded(table, row, name)
+                if embedded is None and inner:
+                    return None
+                projected[name] = self._project(name, embedded, subfields) if embedded else None
+            elif field == "*":
+                projected.update(row)
+            else:
+                projected[field] = row.get(field)
+        return projected
+
+    def _run_select(self, query: _Query):
+        rows = [row for row in self._rows(query.table_name) if self._matches(query, row)]
+        projected = [p for p in (self._project(query.table_name, row, query.fields) for row in rows) if p is not None]
+
+        for column, desc in reversed(query.ordering):
+            projected.sort(key=lambda row: (row.get(column) is None, row.get(column)), reverse=desc)
+
+        count = len(projected) if query.count else None
+        if query.row_range:
+            start, end = query.row_range
+            projected = projected[start:end + 1]
+        return projected, count
+
+    def _run_insert(self, query: _Query):
+        records = query.payload if isinstance(query.payload, list) else [query.payload]
+        rows = self._rows(query.table_name)
+        inserted = []
+        for record in records:
+            row = {"id": str(uuid.uuid4()), "created_at": _now_iso(), **record}
+            for column in ("id",) + self.unique_columns.get(query.table_name, ()):
+                if any(existing.get(column) == row[column] for existing in rows):
+                    raise FakeAPIError(f"duplicate key value violates unique constraint ({column})", code="23505")
+            inserted.append(row)
+        rows.extend(inserted)
+        return ([] if query.returning == "minimal" else inserted), None
+
+    def _run_update(self, query: _Query):
+        updated = []
+        for row in self._rows(query.table_name):
+            if self._matches(query, row):
+                row.update(query.payload)
+                updated.append(row)
+        return updated, None
+
+    def _run_delete(self, query: _Query):
+        rows = self._rows(query.table_name)
+        deleted = [row for row in rows if self._matches(query, row)]
+        self.tables[query.table_name] = [row for row in rows if not self._matches(query, row)]
+        return deleted, None
+
+class _FakeChunk:
+    def __init__(self, text: str):
+        self.text = text
+
+class _FakeResponse:
+    def __init__(self, chunks: list[str], usage, first_token_latency: float, chunk_latency: float, stream: bool):
+        self._chunks = chunks
+        self._first_token_latency = first_token_latency
+        self._chunk_latency = chunk_latency
+        self.usage_metadata = usage
+        if not stream:
+            time.sleep(first_token_latency + chunk_latency * (len(chunks) - 1))
+        self.text = "".join(chunks)
+
+    def __iter__(self):
+        for i, chunk in enumerate(self._chunks):
+            time.sleep(self._first_token_latency if i == 0 else self._chunk_latency)
+            yield _FakeChunk(chunk)
+
+class FakeGenai:
+    """
+    Substituto do módulo google.generativeai
+    first_token_latency: segundos até o primeiro trecho; chunk_latency: entre trechos
+    """
+    def __init__(self, first_token_latency: float = 0.5, chunk_latency: float = 0.05,
+                 chunks: int = 20, output_chars: int = 6000):
+        self.first_token_latency = first_token_latency
+        self.chunk_latency = chunk_latency
+        self.chunks = chunks
+        self.output_chars = output_chars
+        self.calls = 0
+
+    def configure(self, api_key: str = None):
+        pass
+
+    def GenerativeModel(self, name: str):
+        return SimpleNamespace(generate_content=self._generate_content)
+
+    def _generate_content(self, prompt: str, stream: bool = False):
+        self.calls += 1
+        body = ("## DECISÃO\n\nVistos etc. " * (self.output_chars // 24 + 1))[:self.output_chars]
+        size = -(-len(body) // self.chunks)
+        chunks = [body[i:i + size] for i in range(0, len(body), size)]
+        usage = SimpleNamespace(
+            prompt_token_count=len(prompt) // 4,
+            candidates_token_count=len(body) // 4,
+            cached_content_token_count=0
+        )
+        return _FakeResponse(chunks, usage, self.first_token_latency, self.chunk_latency, stream)
+
+def install_fakes(supabase: FakeSupabase = None, genai: FakeGenai = None, user: dict = None):
+    """
+    Aponta os módulos já importados (config, services, components) para os substitutos
+    O cliente simulado passa pelo rastreamento de consultas, como o real
+    user: perfil devolvido por get_current_user (None mantém a sessão do Streamlit)
+    """
+    from services.query_tracer import traced_client
+    client = traced_client(supabase) if supabase is not None else None
+    async_client = traced_client(supabase.async_client()) if supabase is not None else None
+
+    for name, module in list(sys.modules.items()):
+        if not name.startswith(("config.", "services.", "components.")) or module is None:
+            continue
+        if supabase is not None and hasattr(module, "get_supabase_client"):
+            module.get_supabase_client = lambda: client
+        if supabase is not None and hasattr(module, "get_async_supabase_client"):
+            module.get_async_supabase_client = lambda: async_client
+        if user is not None and hasattr(module, "get_current_user"):
+            module.get_current_user = lambda: user
+
+    if genai is not None and "services.gemini_service" in sys.modules:
+        sys.modules["services.gemini_service"]._get_genai = lambda: genai
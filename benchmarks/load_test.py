@@ -0,0 +1,266 @@
+"""
+Teste de Carga Multiusuário
+Simula sessões simultâneas do app pela API de testes do Streamlit (AppTest), contra os
+substitutos locais do Supabase e do Gemini (benchmarks/fakes.py), aumentando a concorrência
+em etapas
+
+Cada sessão percorre: login → Dashboard → Meus Processos → upload → geração →
+Gerar Decisões (seleção de área/tipo/prompt) → refinamento → Histórico → Configurações
+
+Relata, por nível de concorrência: jornadas/s, percentis de latência por página,
+memória por sessão e a primeira página a saturar (p95 acima de N vezes o de uma sessão)
+
+Uso:
+    python benchmarks/load_test.py [--levels 1,2,4,8,16] [--db-latency 0.02]
+                                   [--gemini-latency 0.5] [--output resultado.json]
+
+Obs.: o AppTest não simula st.file_uploader; upload e geração executam o mesmo caminho
+dos serviços (extração, gravação, Gemini) em um script auxiliar na sessão do usuário
+"""
+import argparse
+import gc
+import importlib
+import json
+import os
+import pkgutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+_WORKDIR = tempfile.mkdtemp(prefix="decisum-load-")
+os.environ["DECISUM_CACHE_DIR"] = os.path.join(_WORKDIR, "cache")
+os.environ["DECISUM_QUEUE_PATH"] = os.path.join(_WORKDIR, "queue.sqlite3")
+os.environ["DECISUM_PROMPT_INDEX_PATH"] = os.path.join(_WORKDIR, "index", "prompts.npz")
+os.environ["DECISUM_PRECEDENT_DIR"] = os.path.join(_WORKDIR, "index", "precedents")
+os.environ.setdefault("DECISUM_SESSION_SECRET", "decisum-load-test")
+
+from streamlit.testing.v1 import AppTest
+
+from benchmarks.fakes import FakeSupabase, FakeGenai, install_fakes
+from benchmarks.bench_suite import seed_tables
+from benchmarks.synthetic_pdfs import make_court_pdf
+from services.metrics_service import percentile
+from services.password_service import hash_password
+
+APP_PATH = os.path.join(ROOT, "app.py")
+PASSWORD = "senha-carga-123"
+APP_TIMEOUT = 120
+
+LEGAL_AREA = "Direito Civil"
+DECISION_TYPE = "Sentença"
+
+def _upload_and_generate_script():
+    # Executado pelo AppTest na sessão do usuário (código autocontido)
+    import io
+    import streamlit as st
+    from services.process_service import extract_text_with_stats, save_process_to_db, file_fingerprint, read_file_bytes
+    from services.gemini_service import generate_decision, save_generated_decision
+
+    pdf_file = io.BytesIO(st.session_state.load_pdf)
+    pdf_file.name = "processo_carga.pdf"
+
+    if st.session_state.load_step == "upload":
+        text, _ = extract_text_with_stats(pdf_file)
+        save_process_to_db(pdf_file.name, text, file_fingerprint(read_file_bytes(pdf_file)))
+    else:
+        prompt = st.session_state.load_prompt
+        success, result = generate_decision(pdf_file, prompt, "Julgue procedente o pedido.")
+        if success:
+            save_generated_decision(None, prompt["id"], result, "Julgue procedente o pedido.")
+        else:
+            raise RuntimeError(result)
+
+def preload_modules():
+    """
+    Importa todos os módulos do app antes de instalar os substitutos
+    (as páginas fazem imports tardios, que não seriam alcançados)
+    """
+    for package in ("config", "services", "components"):
+        for module in pkgutil.iter_modules([os.path.join(ROOT, package)]):
+            importlib.import_module(f"{package}.{module.name}")
+
+def seed_load_tables(sessions: int) -> dict:
+    tables = seed_tables(users=max(sessions, 10))
+    password_hash = hash_password(PASSWORD)
+    for user in tables["users"]:
+        user["password_hash"] = password_hash
+        user["gemini_api_key"] = "fake-key"
+    return tables
+
+def _rss_kb() -> int:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+class Session:
+    """
+    Uma sessão de usuário simulada (um AppTest do app e um do script auxiliar)
+    """
+    def __init__(self, user: dict, prompt: dict, pdf_bytes: bytes):
+        self.user = user
+        self.prompt = prompt
+        self.pdf_bytes = pdf_bytes
+        self.app = AppTest.from_file(APP_PATH, default_timeout=APP_TIMEOUT)
+        self.helper = AppTest.from_function(_upload_and_generate_script, default_timeout=APP_TIMEOUT)
+        self.timings = []
+        self.errors = []
+
+    def _step(self, page: str, action):
+        started = time.perf_counter()
+        try:
+            action()
+            exceptions = list(self.app.exception) + list(self.helper.exception)
+            if exceptions:
+                self.errors.append({"page": page, "error": exceptions[0].message[:200]})
+        except Exception as e:
+            self.errors.append({"page": page, "error": f"{type(e).__name__}: {e}"[:200]})
+        self.timings.append((page, time.perf_counter() - started))
+
+    def _navigate(self, page: str):
+        self.app.sidebar.selectbox[0].set_value(page).run()
+
+    def _login(self):
+        self.app.run()
+        inputs = [widget for widget in self.app.text_input if widget.key is None]
+        next(widget for widget in inputs if widget.label == "Email").input(self.user["email"])
+        next(widget for widget in inputs if widget.label == "Senha").input(PASSWORD)
+        next(button for button in self.app.button if button.label == "Entrar").click().run()
+
+    def _helper(self, step: str):
+        self.helper.session_state["user_data"] = {key: self.user[key] for key in ("id", "email", "role", "approved")}
+        self.helper.session_state["load_pdf"] = self.pdf_bytes
+        self.helper.session_state["load_prompt"] = self.prompt
+        self.helper.session_state["load_step"] = step
+        self.helper.run()
+
+    def _select_prompt(self):
+        self._navigate("Gerar Decisões")
+        self.app.button(key=f"area_{LEGAL_AREA}").click().run()
+        self.app.button(key=f"type_{DECISION_TYPE}").click().run()
+        self.app.button(key=f"prompt_{self.prompt['id']}").click().run()
+
+    def _refine(self):
+        self.app.session_state["generated_decision"] = "## DECISÃO\n\nVistos etc. " * 200
+        self.app.run()
+        self.app.text_area(key="refinar_instrucao").input("Torne a fundamentação mais concisa.")
+        next(button for button in self.app.button if button.label == "🔄 Refinar Texto" and not button.disabled).click().run()
+
+    def run_journey(self):
+        self._step("login", self._login)
+        self._step("dashboard", self.app.run)
+        self._step("my_processes", lambda: self._navigate("Meus Processos"))
+        self._step("upload", lambda: self._helper("upload"))
+        self._step("generate", lambda: self._helper("generate"))
+        self._step("generator_page", self._select_prompt)
+        self._step("refine", self._refine)
+        self._step("history", lambda: self._navigate("Histórico de Decisões"))
+        self._step("settings", lambda: self._navigate("Configurações"))
+
+def run_level(concurrency: int, tables: dict, pdf_bytes: bytes) -> dict:
+    users = [user for user in tables["users"] if user["role"] == "user"][:concurrency]
+    prompt = next(p for p in tables["prompts"] if p["legal_area"] == LEGAL_AREA and p["decision_type"] == DECISION_TYPE)
+
+    gc.collect()
+    rss_before = _rss_kb()
+
+    sessions = [Session(user, prompt, pdf_bytes) for user in users]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(Session.run_journey, sessions))
+    elapsed = time.perf_counter() - started
+
+    # Sessões ainda vivas: diferença de memória atribuída a elas
+    rss_after = _rss_kb()
+
+    by_page = {}
+    for session in sessions:
+        for page, seconds in session.timings:
+            by_page.setdefault(page, []).append(seconds)
+
+    result = {
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 2),
+        "journeys_per_second": round(len(sessions) / elapsed, 3),
+        "memory_per_session_kb": round((rss_after - rss_before) / len(sessions)) if rss_before else None,
+        "pages": {
+            page: {
+                "p50_ms": round(percentile(samples, 50) * 1000, 1),
+                "p95_ms": round(percentile(samples, 95) * 1000, 1),
+                "p99_ms": round(percentile(samples, 99) * 1000, 1)
+            }
+            for page, samples in by_page.items()
+        },
+        "errors": [error for session in sessions for error in session.errors][:20]
+    }
+    del sessions
+    return result
+
+def find_saturation(levels: list[dict], factor: float) -> dict:
+    """
+    Primeira página cujo p95 passa de `factor` vezes o p95 com uma sessão
+    """
+    baseline = levels[0]["pages"]
+    for level in levels[1:]:
+        degraded = [
+            (page, stats["p95_ms"] / baseline[page]["p95_ms"])
+            for page, stats in level["pages"].items()
+            if page in baseline and baseline[page]["p95_ms"] and stats["p95_ms"] / baseline[page]["p95_ms"] >= factor
+        ]
+        if degraded:
+            page, ratio = max(degraded, key=lambda item: item[1])
+            return {"page": page, "concurrency": level["concurrency"], "p95_ratio": round(ratio, 1)}
+    return {"page": None, "concurrency": None, "p95_ratio": None}
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga multiusuário com AppTest e serviços simulados")
+    parser.add_argument("--levels", default="1,2,4,8,16", help="Níveis de concorrência (padrão: 1,2,4,8,16)")
+    parser.add_argument("--db-latency", type=float, default=0.02, help="Latência simulada por consulta, em segundos (padrão: 0.02)")
+    parser.add_argument("--gemini-latency", type=float, default=0.5, help="Tempo até o primeiro token simulado, em segundos (padrão: 0.5)")
+    parser.add_argument("--pages", type=int, default=50, help="Páginas do PDF sintético (padrão: 50)")
+    parser.add_argument("--saturation-factor", type=float, default=3.0, help="p95 relativo a uma sessão que caracteriza saturação (padrão: 3)")
+    parser.add_argument("--output", help="Grava o resultado em JSON neste arquivo (padrão: stdout)")
+    args = parser.parse_args()
+
+    levels = [int(level) for level in args.levels.split(",")]
+
+    preload_modules()
+    tables = seed_load_tables(max(levels))
+    supabase = FakeSupabase(tables, latency=args.db_latency)
+    install_fakes(supabase, FakeGenai(first_token_latency=args.gemini_latency))
+
+    pdf_bytes = make_court_pdf(args.pages)
+    results = []
+    for concurrency in levels:
+        print(f"→ {concurrency} sessão(ões) simultânea(s)...", file=sys.stderr)
+        results.append(run_level(concurrency, supabase.tables, pdf_bytes))
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "cpu_count": os.cpu_count(),
+            "db_latency_s": args.db_latency,
+            "gemini_first_token_s": args.gemini_latency,
+            "pdf_pages": args.pages
+        },
+        "levels": results,
+        "saturation": find_saturation(results, args.saturation_factor)
+    }
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
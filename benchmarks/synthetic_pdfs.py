@@ -0,0 +1,109 @@
+"""
+PDFs sintéticos de processos judiciais (sem dependências externas)
+
+Cada página tem cabeçalho/rodapé repetidos (como os carimbos do PJe) e o corpo
+percorre as peças reconhecidas pela segmentação (petição inicial, contestação,
+réplica, decisões, sentença), para exercitar extração, normalização e recorte.
+"""
+import random
+
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842
+LINES_PER_PAGE = 48
+CHARS_PER_LINE = 90
+
+SECTIONS = [
+    "PETIÇÃO INICIAL",
+    "DECISÃO",
+    "CONTESTAÇÃO",
+    "RÉPLICA",
+    "TERMO DE AUDIÊNCIA",
+    "ALEGAÇÕES FINAIS",
+    "DESPACHO",
+    "SENTENÇA"
+]
+
+WORDS = (
+    "autor réu processo pedido prova documento testemunha juízo comarca vara direito "
+    "obrigação contrato dano moral material indenização prazo intimação citação "
+    "audiência recurso tutela urgência liminar honorários custas artigo código civil "
+    "processo civil jurisprudência tribunal acórdão relator fundamento dispositivo"
+).split()
+
+def _escape(text: str) -> bytes:
+    data = text.encode("cp1252", errors="replace")
+    return data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+def _paragraph(rng: random.Random, lines: int) -> list[str]:
+    result = []
+    for _ in range(lines):
+        line = ""
+        while len(line) < CHARS_PER_LINE - 12:
+            line += rng.choice(WORDS) + " "
+        result.append(line.strip().capitalize() + ".")
+    return result
+
+def _page_lines(rng: random.Random, page: int, pages: int) -> list[str]:
+    # Peça da página proporcional à posição no processo
+    section = SECTIONS[min(len(SECTIONS) - 1, page * len(SECTIONS) // pages)]
+    previous = SECTIONS[min(len(SECTIONS) - 1, (page - 1) * len(SECTIONS) // pages)] if page else None
+
+    lines = [
+        "PODER JUDICIÁRIO - TRIBUNAL DE JUSTIÇA",
+        f"Processo nº 0801234-56.2024.8.20.5001 - Num. {1000 + page} - Pág. {page + 1}",
+        ""
+    ]
+    if section != previous:
+        lines += [section, ""]
+    lines += _paragraph(rng, LINES_PER_PAGE - len(lines) - 2)
+    lines += ["", "Assinado eletronicamente por: JUIZ DE DIREITO - 01/01/2024 10:00:00"]
+    return lines
+
+def _content_stream(lines: list[str]) -> bytes:
+    parts = [b"BT /F1 9 Tf 11 TL 40 800 Td"]
+    for line in lines:
+        parts.append(b"(" + _escape(line) + b") Tj T*")
+    parts.append(b"ET")
+    return b"\n".join(parts)
+
+def make_court_pdf(pages: int, seed: int = 0) -> bytes:
+    """
+    Gera um PDF de processo com `pages` páginas (determinístico para a mesma semente)
+    """
+    rng = random.Random(seed)
+
+    # Objetos: 1 catálogo, 2 páginas, 3 fonte, depois pares (página, conteúdo)
+    objects = {
+        1: b"<< /Type /Catalog /Pages 2 0 R >>",
+        3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>"
+    }
+    kids = []
+    for page in range(pages):
+        page_id, content_id = 4 + page * 2, 5 + page * 2
+        stream = _content_stream(_page_lines(rng, page, pages))
+        objects[page_id] = (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>"
+        ).encode()
+        objects[content_id] = b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream"
+        kids.append(f"{page_id} 0 R")
+    objects[2] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {pages} >>".encode()
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for object_id in sorted(objects):
+        offsets[object_id] = len(output)
+        output += b"%d 0 obj\n" % object_id + objects[object_id] + b"\nendobj\n"
+
+    xref_offset = len(output)
+    size = max(objects) + 1
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % size
+    for object_id in range(1, size):
+        output += b"%010d 00000 n \n" % offsets[object_id]
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (size, xref_offset)
+    return bytes(output)
+
+def make_corpus(sizes=(5, 50, 200), seed: int = 0) -> dict:
+    """
+    Corpus de PDFs por número de páginas: {páginas: bytes}
+    """
+    return {pages: make_court_pdf(pages, seed + pages) for pages in sizes}
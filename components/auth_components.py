@@ -2,7 +2,14 @@
 Componentes de Autenticação - Interface
 """
 import streamlit as st
-from services.auth_service import register_user, login_user, get_pending_users, approve_user
+from datetime import datetime
+from services.auth_service import (
+    register_user, login_user, get_pending_users, approve_users, reject_users,
+    create_session_token, verify_session_token
+)
+
+# Cadastros pendentes exibidos por página no painel admin
+PENDING_PAGE_SIZE = 50
 
 def show_login_page():
     """Exibe página de login"""
@@ -24,9 +31,12 @@ def show_login_page():
                     success, message, user_data = login_user(email, password)
                     
                     if success:
-                        # Salvar dados do usuário na sessão
-                        st.session_state.user_logged_in = True
-                        st.session_state.user_data = user_data
+                        # Salvar perfil assinado do usuário na sessão
+                        try:
+                            start_session(user_data)
+                        except RuntimeError as e:
+                            st.error(f"Erro no login: {e}")
+                            return
                         st.success(message)
                         st.rerun()  # Atualiza a página
                     else:
@@ -58,35 +68,108 @@ def show_login_page():
                 else:
                     st.error("Preencha todos os campos!")
 
+def show_write_queue_status():
+    """Situação da fila de gravação (processos e decisões aguardando envio ao banco)"""
+    from services.write_queue_service import get_queue_metrics, get_failed_writes, requeue_failed_writes
+    
+    metrics = get_queue_metrics()
+    col_depth, col_lag, col_retry, col_failed = st.columns(4)
+    col_depth.metric("Gravações pendentes", metrics["depth"])
+    col_lag.metric("Atraso da fila", f"{metrics['lag_seconds']:.0f}s")
+    col_retry.metric("Em nova tentativa", metrics["retrying"])
+    col_failed.metric("Recusadas", metrics["dead_letter"])
+    
+    if metrics["retrying"] and metrics["last_error"]:
+        st.warning(f"Último erro no envio: {metrics['last_error'][:200]}")
+    
+    if metrics["dead_letter"]:
+        with st.expander(f"⚠️ {metrics['dead_letter']} gravação(ões) recusada(s) pelo banco"):
+            for failed in get_failed_writes():
+                failed_at = datetime.fromtimestamp(failed["failed_at"]).strftime("%d/%m/%Y %H:%M")
+                st.write(f"**{failed['table']}** `{failed['record_id']}` • {failed_at} • {failed['attempts']} tentativa(s)")
+                st.caption(failed["last_error"][:300] if failed["last_error"] else "")
+            if st.button("🔁 Reenviar gravações recusadas", key="requeue_failed_writes"):
+                st.success(f"{requeue_failed_writes()} gravação(ões) devolvida(s) à fila.")
+
 def show_admin_panel():
     """Painel administrativo"""
     st.title("👨‍💼 Painel Administrativo")
     
+    show_write_queue_status()
+    
     st.subheader("Usuários Pendentes de Aprovação")
     
-    pending_users = get_pending_users()
+    if 'pending_page' not in st.session_state:
+        st.session_state.pending_page = 0
+    
+    pending_users, total_pending = get_pending_users(st.session_state.pending_page, PENDING_PAGE_SIZE)
+    
+    # Página atual pode ter ficado vazia após aprovações/rejeições
+    if not pending_users and st.session_state.pending_page > 0:
+        st.session_state.pending_page = 0
+        st.rerun()
     
     if not pending_users:
         st.info("Nenhum usuário pendente de aprovação.")
-    else:
-        for user in pending_users:
-            col1, col2, col3 = st.columns([2, 1, 1])
-            
-            with col1:
-                st.write(f"📧 **{user['email']}**")
-                st.write(f"📅 Cadastrado em: {user['created_at'][:10]}")
-            
-            with col2:
-                if st.button("✅ Aprovar", key=f"approve_{user['id']}"):
-                    if approve_user(user['id']):
-                        st.success(f"Usuário {user['email']} aprovado!")
-                        st.rerun()
-            
-            with col3:
-                if st.button("❌ Rejeitar", key=f"reject_{user['id']}"):
-                    st.error("Função de rejeição será implementada!")
-            
-            st.divider()
+        return
+    
+    total_pages = (total_pending - 1) // PENDING_PAGE_SIZE + 1
+    st.write(f"**{total_pending}** cadastro(s) pendente(s) • página {st.session_state.pending_page + 1} de {total_pages}")
+    
+    select_all = st.checkbox("Selecionar todos desta página")
+    
+    with st.form("pending_users_form"):
+        edited_rows = st.data_editor(
+            [
+                {
+                    "selecionar": select_all,
+                    "email": user["email"],
+                    "cadastrado_em": user["created_at"][:10],
+                    "id": user["id"]
+                }
+                for user in pending_users
+            ],
+            column_config={
+                "selecionar": st.column_config.CheckboxColumn("Selecionar"),
+                "email": st.column_config.TextColumn("📧 Email", disabled=True),
+                "cadastrado_em": st.column_config.TextColumn("📅 Cadastrado em", disabled=True),
+                "id": None
+            },
+            hide_index=True,
+            use_container_width=True,
+            key=f"pending_users_editor_{st.session_state.pending_page}_{select_all}"
+        )
+        
+        col_approve, col_reject = st.columns(2)
+        with col_approve:
+            approve_button = st.form_submit_button("✅ Aprovar selecionados", type="primary", use_container_width=True)
+        with col_reject:
+            reject_button = st.form_submit_button("❌ Rejeitar selecionados", use_container_width=True)
+    
+    selected_ids = [row["id"] for row in edited_rows if row["selecionar"]]
+    
+    if approve_button or reject_button:
+        if not selected_ids:
+            st.warning("Selecione ao menos um usuário!")
+        elif approve_button:
+            approved_count = approve_users(selected_ids)
+            st.success(f"{approved_count} usuário(s) aprovado(s)!")
+            st.rerun()
+        else:
+            rejected_count = reject_users(selected_ids)
+            st.success(f"{rejected_count} cadastro(s) rejeitado(s)!")
+            st.rerun()
+    
+    # Paginação
+    col_prev, col_next = st.columns(2)
+    with col_prev:
+        if st.button("⬅️ Anterior", disabled=st.session_state.pending_page == 0, use_container_width=True):
+            st.session_state.pending_page -= 1
+            st.rerun()
+    with col_next:
+        if st.button("Próxima ➡️", disabled=st.session_state.pending_page + 1 >= total_pages, use_container_width=True):
+            st.session_state.pending_page += 1
+            st.rerun()
 
 def show_logout_button():
     """Botão de logout no sidebar"""
@@ -94,16 +177,35 @@ def show_logout_button():
         st.divider()
         if st.button("🚪 Logout"):
             # Limpar sessão
-            for key in st.session_state.keys():
+            for key in list(st.session_state.keys()):
                 del st.session_state[key]
             st.rerun()
 
+def start_session(user_data: dict):
+    """
+    Registra o perfil do usuário (sem senha nem chave API) e o token assinado na sessão
+    Lança RuntimeError se DECISUM_SESSION_SECRET não estiver configurado
+    """
+    st.session_state.session_token = create_session_token(user_data)
+    st.session_state.user_data = user_data
+
 def check_authentication():
     """
-    Verifica se o usuário está logado
+    Verifica se o usuário está logado (token da sessão válido e dentro da validade)
+    O perfil vem do token: reruns não consultam o banco
     Returns: True se logado, False caso contrário
     """
-    return st.session_state.get("user_logged_in", False)
+    token = st.session_state.get("session_token")
+    profile = verify_session_token(token) if token else None
+    
+    if not profile:
+        # Sessão expirada ou adulterada: volta para o login
+        for key in ("session_token", "user_data"):
+            st.session_state.pop(key, None)
+        return False
+    
+    st.session_state.user_data = profile
+    return True
 
 def get_current_user():
     """Retorna dados do usuário atual"""
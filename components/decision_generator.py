@@ -0,0 +1,564 @@
+"""
+Componente de Geração de Decisões
+Interface única, montada a partir de LEGAL_AREAS/DECISION_TYPES, com seletor em fragment
+"""
+import streamlit as st
+from components.process_components import show_depositions_batch
+from services.prompt_service import get_area_prompts_by_type, prefetch_area_prompts, LEGAL_AREAS, DECISION_TYPES
+from services.gemini_service import generate_decision, refine_decision, save_generated_decision, clean_markdown_for_download
+from services.process_service import resolve_process_id, file_fingerprint, read_file_bytes, extract_text_from_pdf
+
+# Rótulos curtos dos botões (demais usam o próprio nome da área/tipo)
+BUTTON_LABELS = {
+    "Direito Penal": "🔥 Direito Penal",
+    "Justiça da Infância e da Juventude": "Justiça Infância",
+    "Competência Delegada e Acidentes de Trabalho": "Competência Delegada",
+    "Sentença": "🔥 Sentença"
+}
+AREA_BUTTONS_PER_ROW = 4
+
+# Prompts sugeridos a partir do conteúdo do processo
+RECOMMENDED_PROMPTS = 3
+
+SESSION_DEFAULTS = {
+    "selected_legal_area": None,
+    "selected_decision_type": None,
+    "selected_prompt": None,
+    "generated_decision": None,
+    "generation_data": None,
+    "instruction_confirmed": False,
+    "doctrine_confirmed": False,
+    "prompt_recommendations": None,
+    "recommended_for": None
+}
+
+def show_decision_generator():
+    """
+    Interface de geração de decisões
+    """
+    st.title("⚖️ Gerar Decisão Judicial")
+    
+    # Inicializar estado da sessão
+    for key, default in SESSION_DEFAULTS.items():
+        if key not in st.session_state:
+            st.session_state[key] = default
+    
+    # Layout em duas colunas principais
+    col_input, col_output = st.columns([1, 1])
+    
+    with col_input:
+        # Seção 1: Upload de Processo
+        st.markdown("### 📄 1. Processo Judicial (.pdf)")
+        st.markdown("*Faça o upload do processo judicial em formato PDF. O sistema converterá o arquivo para texto automaticamente.*")
+        
+        uploaded_file = st.file_uploader(
+            "Selecionar Arquivo PDF",
+            type="pdf",
+            key="decision_pdf_upload"
+        )
+        
+        if uploaded_file:
+            st.success(f"✅ **{uploaded_file.name}** ({uploaded_file.size/1024:.1f} KB)")
+            _update_recommendations(uploaded_file)
+        else:
+            st.session_state.prompt_recommendations = None
+            st.session_state.recommended_for = None
+        
+        st.divider()
+        
+        # Seção 2: Modelo de Decisão (Prompts)
+        st.markdown("### 🎯 2. Modelo de Decisão (Prompt)")
+        show_prompt_selector()
+        
+        st.divider()
+        
+        # Seção 3: Instrução Principal
+        st.markdown("### ✏️ 3. Instrução Principal")
+        st.markdown("*Descreva o resultado esperado da decisão. A IA utilizará esta instrução como a diretriz principal, aplicando o modelo selecionado e os contextos abaixo.*")
+        
+        instrucao_principal = st.text_area(
+            "",
+            placeholder="Ex: 'Julgue o pedido procedente para condenar o réu ao pagamento de R$ 5.000,00 a título de danos morais, utilizando o fundamento da falha na prestação do serviço...'",
+            height=120,
+            key="instrucao_principal"
+        )
+        
+        # Botão de confirmação da instrução
+        col_confirm, col_reset = st.columns([2, 1])
+        with col_confirm:
+            if instrucao_principal.strip() and not st.session_state.instruction_confirmed:
+                if st.button("✅ Confirmar Instrução", key="confirm_instruction", use_container_width=True):
+                    st.session_state.instruction_confirmed = True
+                    st.success("Instrução confirmada!")
+                    st.rerun()
+        
+        with col_reset:
+            if st.session_state.instruction_confirmed:
+                if st.button("🔄 Editar", key="reset_instruction", use_container_width=True):
+                    st.session_state.instruction_confirmed = False
+                    st.rerun()
+        
+        # Mostrar instrução confirmada
+        if st.session_state.instruction_confirmed and instrucao_principal.strip():
+            st.success(f"✅ **Instrução confirmada:** {instrucao_principal[:100]}{'...' if len(instrucao_principal) > 100 else ''}")
+        
+        st.divider()
+        
+        # Seção 4: Depoimentos
+        st.markdown("### 👥 4. Depoimentos (Opcional)")
+        st.markdown("*Adicione o conteúdo de depoimentos e oitivas, seja colando o texto ou fazendo upload do termo em .pdf ou .txt.*")
+        
+        # Tabs para organizar as opções
+        tab_texto, tab_upload = st.tabs(["✏️ Colar Texto", "📁 Upload Arquivos"])
+        
+        with tab_texto:
+            depoimentos_text = st.text_area(
+                "Digite ou cole os depoimentos:",
+                placeholder="Ex: 'Testemunha João Silva: Confirmo que presenciei o acidente...'",
+                height=100,
+                key="depoimentos_text"
+            )
+        
+        with tab_upload:
+            uploaded_depoimentos = st.file_uploader(
+                "Selecione arquivos de depoimentos:",
+                type=["txt", "pdf"],
+                accept_multiple_files=True,
+                key="depoimentos_upload",
+                help="Você pode selecionar múltiplos arquivos .txt ou .pdf"
+            )
+            
+            show_depositions_batch(uploaded_depoimentos, uploaded_file)
+        
+        st.divider()
+        
+        # Seção 5: Doutrina e Jurisprudência
+        st.markdown("### 📚 5. Doutrina e Jurisprudência (Opcional)")
+        st.markdown("*Cole aqui outros fundamentos que devam ser considerados na decisão.*")
+        
+        doutrina_jurisprudencia = st.text_area(
+            "",
+            placeholder="Ex: 'Conforme entendimento do STJ no REsp 1.234.567...'",
+            height=120,
+            key="doutrina_jurisprudencia"
+        )
+        
+        # Botão de confirmação da doutrina (se preenchida)
+        if doutrina_jurisprudencia.strip():
+            col_confirm_doc, col_reset_doc = st.columns([2, 1])
+            with col_confirm_doc:
+                if not st.session_state.doctrine_confirmed:
+                    if st.button("✅ Confirmar Doutrina", key="confirm_doctrine", use_container_width=True):
+                        st.session_state.doctrine_confirmed = True
+                        st.success("Doutrina confirmada!")
+                        st.rerun()
+            
+            with col_reset_doc:
+                if st.session_state.doctrine_confirmed:
+                    if st.button("🔄 Editar", key="reset_doctrine", use_container_width=True):
+                        st.session_state.doctrine_confirmed = False
+                        st.rerun()
+            
+            # Mostrar doutrina confirmada
+            if st.session_state.doctrine_confirmed:
+                st.success(f"✅ **Doutrina confirmada:** {doutrina_jurisprudencia[:100]}{'...' if len(doutrina_jurisprudencia) > 100 else ''}")
+        
+        st.divider()
+        
+        # Botão principal de geração
+        can_generate = (
+            uploaded_file is not None and 
+            st.session_state.selected_prompt is not None and
+            st.session_state.instruction_confirmed
+        )
+        
+        # Reunir todos os dados para geração
+        if can_generate:
+            # Combinar depoimentos de texto e upload
+            all_depoimentos = []
+            if depoimentos_text and depoimentos_text.strip():
+                all_depoimentos.append(depoimentos_text)
+            if 'depoimentos_processados' in st.session_state:
+                all_depoimentos.append(st.session_state.depoimentos_processados)
+            
+            combined_depoimentos = "\n\n".join(all_depoimentos) if all_depoimentos else ""
+            
+            gerar_button = st.button(
+                "🚀 Gerar Minuta de Decisão",
+                use_container_width=True,
+                type="primary"
+            )
+            
+            if gerar_button:
+                # Gerar decisão real com Gemini
+                success, result = generate_decision(
+                    pdf_file=uploaded_file,
+                    prompt_data=st.session_state.selected_prompt,
+                    instrucao_principal=instrucao_principal,
+                    depoimentos=combined_depoimentos,
+                    doutrina=doutrina_jurisprudencia
+                )
+                
+                if success:
+                    st.session_state.generated_decision = result
+                    process_id = resolve_process_id(file_fingerprint(read_file_bytes(uploaded_file)))
+                    st.session_state.generation_data = {
+                        "pdf_file": uploaded_file,
+                        "process_id": process_id,
+                        "prompt": st.session_state.selected_prompt,
+                        "instrucao": instrucao_principal,
+                        "depoimentos": combined_depoimentos,
+                        "doutrina": doutrina_jurisprudencia
+                    }
+                    
+                    # Salvar no banco de dados
+                    st.session_state.generation_data["decision_id"] = save_generated_decision(
+                        process_id,
+                        st.session_state.selected_prompt['id'],
+                        result,
+                        instrucao_principal,
+                        doutrina_jurisprudencia,
+                        usage=st.session_state.pop('last_gemini_usage', None)
+                    )
+                    
+                    st.success("✅ Decisão gerada com sucesso!")
+                    st.balloons()
+                    st.rerun()
+                else:
+                    st.error(f"❌ {result}")
+        else:
+            st.button(
+                "🚀 Gerar Minuta de Decisão",
+                use_container_width=True,
+                disabled=True,
+                help="Necessário: PDF + Prompt + Instrução Confirmada"
+            )
+            
+            # Mostrar o que está faltando
+            missing = []
+            if not uploaded_file:
+                missing.append("📄 Upload do PDF")
+            if not st.session_state.selected_prompt:
+                missing.append("🎯 Seleção do prompt")  
+            if not st.session_state.instruction_confirmed:
+                missing.append("✅ Confirmação da instrução")
+            
+            if missing:
+                st.warning(f"**Faltando:** {' • '.join(missing)}")
+    
+    with col_output:
+        show_output_area()
+
+def _update_recommendations(uploaded_file):
+    # Uma vez por arquivo; o texto extraído fica em cache e é reaproveitado na geração
+    fingerprint = file_fingerprint(read_file_bytes(uploaded_file))
+    if st.session_state.recommended_for == fingerprint:
+        return
+    
+    try:
+        from services.recommendation_service import recommend_prompts
+        with st.spinner("Analisando o processo para sugerir modelos..."):
+            recommendations = recommend_prompts(extract_text_from_pdf(uploaded_file), k=RECOMMENDED_PROMPTS)
+    except Exception as e:
+        st.warning(f"Não foi possível sugerir modelos para este processo: {e}")
+        recommendations = []
+    
+    st.session_state.prompt_recommendations = recommendations
+    st.session_state.recommended_for = fingerprint
+
+def _select_recommended_prompt(recommendation: dict):
+    st.session_state.selected_legal_area = recommendation["legal_area"]
+    st.session_state.selected_decision_type = recommendation["decision_type"]
+    prompts = get_area_prompts_by_type(recommendation["legal_area"], recommendation["decision_type"])
+    st.session_state.selected_prompt = next((p for p in prompts if p["id"] == recommendation["id"]), None)
+    # Seleção libera o botão de geração: rerun da página inteira
+    st.session_state.selector_needs_app_rerun = True
+
+def _clear_selected_prompt():
+    # Prompt selecionado afeta o botão de geração (fora do fragment)
+    if st.session_state.selected_prompt is not None:
+        st.session_state.selected_prompt = None
+        st.session_state.selector_needs_app_rerun = True
+
+def _select_legal_area(legal_area: str):
+    st.session_state.selected_legal_area = legal_area
+    _clear_selected_prompt()
+    # Busca os prompts de todos os tipos da área enquanto o usuário escolhe o tipo de ato
+    prefetch_area_prompts(legal_area)
+
+def _select_decision_type(decision_type: str):
+    st.session_state.selected_decision_type = decision_type
+    _clear_selected_prompt()
+
+@st.fragment
+def show_prompt_selector():
+    """
+    Seleção de área, tipo de ato e prompt
+    Executa como fragment: cliques em área/tipo reexecutam apenas este trecho
+    """
+    if st.session_state.pop("selector_needs_app_rerun", False):
+        st.rerun()
+    
+    if st.session_state.prompt_recommendations:
+        st.markdown("*✨ Sugeridos para este processo:*")
+        for recommendation in st.session_state.prompt_recommendations:
+            st.button(
+                f"📝 {recommendation['title']} · {recommendation['legal_area']} → {recommendation['decision_type']} "
+                f"({recommendation['score']:.0%} de afinidade)",
+                key=f"suggested_{recommendation['id']}",
+                use_container_width=True,
+                on_click=_select_recommended_prompt,
+                args=(recommendation,)
+            )
+    
+    st.markdown("*Selecione o ramo do direito:*")
+    
+    legal_areas = list(LEGAL_AREAS.values())
+    for row_start in range(0, len(legal_areas), AREA_BUTTONS_PER_ROW):
+        row_areas = legal_areas[row_start:row_start + AREA_BUTTONS_PER_ROW]
+        for column, legal_area in zip(st.columns(AREA_BUTTONS_PER_ROW), row_areas):
+            with column:
+                st.button(
+                    BUTTON_LABELS.get(legal_area, legal_area),
+                    key=f"area_{legal_area}",
+                    use_container_width=True,
+                    type="primary" if st.session_state.selected_legal_area == legal_area else "secondary",
+                    on_click=_select_legal_area,
+                    args=(legal_area,)
+                )
+    
+    # Mostrar área selecionada
+    if st.session_state.selected_legal_area:
+        st.info(f"📂 **Área selecionada:** {st.session_state.selected_legal_area}")
+    
+    st.markdown("*Selecione o tipo de ato judicial:*")
+    
+    decision_types = list(DECISION_TYPES.values())
+    for column, decision_type in zip(st.columns(len(decision_types)), decision_types):
+        with column:
+            st.button(
+                BUTTON_LABELS.get(decision_type, decision_type),
+                key=f"type_{decision_type}",
+                use_container_width=True,
+                type="primary" if st.session_state.selected_decision_type == decision_type else "secondary",
+                on_click=_select_decision_type,
+                args=(decision_type,)
+            )
+    
+    # Mostrar prompts disponíveis
+    if st.session_state.selected_legal_area and st.session_state.selected_decision_type:
+        st.markdown("*Selecione o prompt desejado:*")
+        
+        prompts = get_area_prompts_by_type(
+            st.session_state.selected_legal_area, 
+            st.session_state.selected_decision_type
+        )
+        
+        if prompts:
+            for prompt in prompts:
+                is_selected = st.session_state.selected_prompt and st.session_state.selected_prompt['id'] == prompt['id']
+                
+                with st.container():
+                    if st.button(
+                        f"📝 {prompt['title']}",
+                        key=f"prompt_{prompt['id']}",
+                        use_container_width=True,
+                        type="primary" if is_selected else "secondary"
+                    ):
+                        # Seleção libera o botão de geração: rerun da página inteira
+                        st.session_state.selected_prompt = prompt
+                        st.rerun()
+                    
+                    if is_selected:
+                        st.markdown(f"**Descrição:** {prompt['description']}")
+                        with st.expander("👁️ Ver instrução completa"):
+                            st.text_area("Instrução:", value=prompt['instruction'], height=100, disabled=True)
+                            if prompt.get('paradigm_block'):
+                                st.text_area("Bloco paradigma:", value=prompt['paradigm_block'], height=100, disabled=True)
+        else:
+            st.warning(f"Nenhum prompt encontrado para **{st.session_state.selected_legal_area}** → **{st.session_state.selected_decision_type}**")
+            st.info("💡 Você pode criar novos prompts na seção 'Gerenciar Prompts'!")
+
+def show_output_area():
+    """
+    Área de saída com minuta gerada
+    """
+    st.markdown("### 📋 Minuta Gerada")
+    
+    if st.session_state.generated_decision:
+        show_draft_area()
+        
+        # Botão Nova Minuta (limpa também o formulário: rerun da página inteira)
+        st.divider()
+        if st.button("🆕 Nova Minuta", use_container_width=True, type="secondary"):
+            # Limpar todos os dados
+            keys_to_clear = ['generated_decision', 'generation_data', 'selected_legal_area', 
+                           'selected_decision_type', 'selected_prompt', 'depoimentos_processados',
+                           'instruction_confirmed', 'doctrine_confirmed']
+            for key in keys_to_clear:
+                if key in st.session_state:
+                    del st.session_state[key]
+            st.rerun()
+        
+    else:
+        # Container com fundo branco para aguardar geração
+        st.markdown("""
+        <div style="background-color: white; padding: 20px; border-radius: 10px; min-height: 600px; color: black; border: 1px solid #ddd;">
+        <p style="color: #666; text-align: center; margin-top: 200px;">
+        ⏳ A minuta da sua decisão aparecerá aqui...<br><br>
+        <small>Configure sua chave API Gemini nas Configurações e siga os passos ao lado</small>
+        </p>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        # Botões desabilitados
+        st.divider()
+        
+        col_btn1, col_btn2, col_btn3 = st.columns(3)
+        
+        with col_btn1:
+            st.button("✏️ Editar", disabled=True, use_container_width=True)
+        with col_btn2:
+            st.button("📋 Copiar Formatado", disabled=True, use_container_width=True)
+        with col_btn3:
+            st.button("💾 Download", disabled=True, use_container_width=True)
+        
+        st.divider()
+        st.markdown("### 🔄 Refinar Minuta")
+        st.text_area("", disabled=True, placeholder="Aguardando geração da decisão...")
+        st.button("🔄 Refinar Texto", disabled=True, use_container_width=True)
+
+@st.fragment
+def show_draft_area():
+    """
+    Minuta, ações (editar, copiar, download) e refinamento
+    Executa como fragment: interações com a minuta não reexecutam a página inteira
+    """
+    # Container com fundo branco para a minuta
+    st.markdown("""
+    <div style="background-color: white; padding: 20px; border-radius: 10px; color: black; border: 1px solid #ddd;">
+    """, unsafe_allow_html=True)
+    
+    # Mostrar decisão formatada
+    st.markdown(st.session_state.generated_decision)
+    
+    st.markdown("</div>", unsafe_allow_html=True)
+    
+    # Botões de ação
+    st.divider()
+    
+    col_btn1, col_btn2, col_btn3 = st.columns(3)
+    
+    with col_btn1:
+        if st.button("✏️ Editar Texto", use_container_width=True):
+            st.session_state.editing_decision = True
+            st.rerun(scope="fragment")
+    
+    with col_btn2:
+        # Cópia formatada
+        if st.button("📋 Copiar Formatado", use_container_width=True):
+            try:
+                # Converter markdown para texto formatado
+                formatted_text = format_for_word_copy(st.session_state.generated_decision)
+                
+                # Usar pyperclip para copiar automaticamente
+                import pyperclip
+                pyperclip.copy(formatted_text)
+                st.success("✅ Texto copiado para área de transferência! Cole no Word com formatação.")
+            except Exception as e:
+                # Fallback se pyperclip não funcionar
+                st.info("📋 Use Ctrl+A e Ctrl+C no texto abaixo:")
+                st.code(clean_markdown_for_download(st.session_state.generated_decision), language=None)
+    
+    with col_btn3:
+        # Download como arquivo
+        clean_text = clean_markdown_for_download(st.session_state.generated_decision)
+        st.download_button(
+            "💾 Download .txt",
+            data=clean_text,
+            file_name="decisao_judicial.txt",
+            mime="text/plain",
+            use_container_width=True
+        )
+    
+    st.divider()
+    
+    # Seção Refinar Minuta
+    st.markdown("### 🔄 Refinar Minuta")
+    st.markdown("*Dê uma instrução para a IA ajustar a minuta gerada. Você pode pedir para deixar um parágrafo mais conciso, alterar o tom ou adicionar uma fundamentação.*")
+    
+    refinar_instrucao = st.text_area(
+        "",
+        placeholder="Ex: 'Torne o terceiro parágrafo mais conciso e direto.'",
+        height=80,
+        key="refinar_instrucao"
+    )
+    
+    if st.button("🔄 Refinar Texto", use_container_width=True):
+        if refinar_instrucao.strip():
+            generation_data = st.session_state.generation_data or {}
+            success, refined_decision = refine_decision(
+                st.session_state.generated_decision, 
+                refinar_instrucao,
+                prompt_id=(generation_data.get("prompt") or {}).get("id"),
+                decision_id=generation_data.get("decision_id")
+            )
+            
+            if success:
+                st.session_state.generated_decision = refined_decision
+                st.success("✅ Decisão refinada!")
+                st.rerun(scope="fragment")
+            else:
+                st.error(f"❌ {refined_decision}")
+        else:
+            st.warning("Digite uma instrução para refinamento!")
+    
+    # Modal de edição
+    if st.session_state.get('editing_decision'):
+        show_edit_decision_modal()
+
+def format_for_word_copy(markdown_text):
+    """
+    Formata o texto para cópia no Word com formatação
+    """
+    # Remove markdown e adiciona formatação para Word
+    text = markdown_text.replace('**', '')  # Remove negritos
+    text = text.replace('##', '')  # Remove headers
+    text = text.replace('###', '')  # Remove subheaders
+    
+    # Adiciona quebras de linha adequadas
+    text = text.replace('\n\n', '\n\n')
+    
+    return text
+
+def show_edit_decision_modal():
+    """
+    Modal para edição direta da decisão
+    """
+    st.markdown("---")
+    st.markdown("### ✏️ Editando Decisão")
+    
+    with st.form("edit_decision_form"):
+        edited_text = st.text_area(
+            "Edite o texto da decisão:",
+            value=st.session_state.generated_decision,
+            height=400
+        )
+        
+        col_save, col_cancel = st.columns([1, 1])
+        
+        with col_save:
+            save_button = st.form_submit_button("💾 Salvar Alterações", type="primary", use_container_width=True)
+        
+        with col_cancel:
+            cancel_button = st.form_submit_button("❌ Cancelar", use_container_width=True)
+        
+        if save_button:
+            st.session_state.generated_decision = edited_text
+            st.session_state.editing_decision = False
+            st.success("Decisão atualizada!")
+            st.rerun(scope="fragment")
+        
+        if cancel_button:
+            st.session_state.editing_decision = False
+            st.rerun(scope="fragment")
\ No newline at end of file
@@ -0,0 +1,135 @@
+"""
+Componentes do Histórico de Decisões
+Navegação paginada nas decisões já geradas, com carregamento sob demanda do texto
+"""
+import streamlit as st
+from services.decision_service import get_decision_history, get_decision_body
+from services.prompt_service import get_prompt_titles, LEGAL_AREAS, DECISION_TYPES
+from services.gemini_service import clean_markdown_for_download
+from services.stats_service import format_time_ago
+
+HISTORY_PAGE_SIZE = 20
+
+def show_decision_history():
+    """
+    Página de histórico de decisões do usuário
+    """
+    st.title("🗂️ Histórico de Decisões")
+    st.markdown("*Reaproveite minutas já geradas sem uma nova chamada ao Gemini. As decisões ficam disponíveis por 24 horas.*")
+    
+    if 'history_page' not in st.session_state:
+        st.session_state.history_page = 0
+    if 'history_bodies' not in st.session_state:
+        st.session_state.history_bodies = {}
+    
+    # Filtros (qualquer alteração volta para a primeira página)
+    col_area, col_type, col_prompt = st.columns(3)
+    
+    with col_area:
+        filter_area = st.selectbox("Área:", ["Todas"] + list(LEGAL_AREAS.keys()), key="history_area", on_change=_reset_history_page)
+    
+    with col_type:
+        filter_type = st.selectbox("Tipo:", ["Todos"] + list(DECISION_TYPES.keys()), key="history_type", on_change=_reset_history_page)
+    
+    legal_area = LEGAL_AREAS.get(filter_area)
+    decision_type = DECISION_TYPES.get(filter_type)
+    
+    with col_prompt:
+        # Opções por id: prompts com o mesmo título continuam distintos
+        prompt_titles = {prompt["id"]: prompt["title"] for prompt in get_prompt_titles(legal_area, decision_type)}
+        filter_prompt = st.selectbox(
+            "Prompt:", [None] + list(prompt_titles),
+            format_func=lambda prompt_id: "Todos" if prompt_id is None else prompt_titles[prompt_id],
+            key="history_prompt", on_change=_reset_history_page
+        )
+    
+    decisions, total = get_decision_history(
+        page=st.session_state.history_page,
+        page_size=HISTORY_PAGE_SIZE,
+        prompt_id=filter_prompt,
+        legal_area=legal_area,
+        decision_type=decision_type
+    )
+    
+    if not decisions:
+        st.info("📂 Nenhuma decisão encontrada com os filtros aplicados.")
+        return
+    
+    total_pages = (total - 1) // HISTORY_PAGE_SIZE + 1
+    st.write(f"**{total}** decisão(ões) • página {st.session_state.history_page + 1} de {total_pages}")
+    
+    for decision in decisions:
+        prompt = decision["prompts"]
+        
+        with st.container():
+            col_info, col_action = st.columns([3, 1])
+            
+            with col_info:
+                st.markdown(f"""
+                **📝 {prompt['title']}**  
+                `{prompt['legal_area']} → {prompt['decision_type']}` • {format_time_ago(decision['created_at'])}
+                """)
+            
+            with col_action:
+                is_open = decision["id"] in st.session_state.history_bodies
+                if st.button("🙈 Ocultar" if is_open else "👁️ Ver decisão", key=f"history_toggle_{decision['id']}", use_container_width=True):
+                    if is_open:
+                        del st.session_state.history_bodies[decision["id"]]
+                    else:
+                        # Texto carregado apenas quando a decisão é aberta
+                        st.session_state.history_bodies[decision["id"]] = get_decision_body(decision["id"])
+                    st.rerun()
+            
+            body = st.session_state.history_bodies.get(decision["id"])
+            if body:
+                show_decision_body(decision, body)
+            
+            st.markdown("---")
+    
+    # Paginação
+    col_prev, col_next = st.columns(2)
+    with col_prev:
+        if st.button("⬅️ Anterior", disabled=st.session_state.history_page == 0, use_container_width=True):
+            st.session_state.history_page -= 1
+            st.rerun()
+    with col_next:
+        if st.button("Próxima ➡️", disabled=st.session_state.history_page + 1 >= total_pages, use_container_width=True):
+            st.session_state.history_page += 1
+            st.rerun()
+
+def show_decision_body(decision: dict, body: dict):
+    """
+    Texto completo da decisão e ações de reaproveitamento
+    """
+    st.markdown(body["generated_decision"])
+    
+    if body.get("additional_context"):
+        st.caption(f"**Instrução usada:** {body['additional_context'][:300]}")
+    
+    col_reuse, col_download = st.columns(2)
+    
+    with col_reuse:
+        if st.button("♻️ Reutilizar minuta", key=f"history_reuse_{decision['id']}", type="primary", use_container_width=True):
+            st.session_state.generated_decision = body["generated_decision"]
+            # Refinamentos seguem associados ao prompt e à decisão de origem
+            st.session_state.generation_data = {
+                "process_id": decision["process_id"],
+                "prompt": {"id": decision["prompt_id"], **decision["prompts"]},
+                "instrucao": body.get("additional_context") or "",
+                "doutrina": body.get("doctrine_jurisprudence") or "",
+                "decision_id": decision["id"]
+            }
+            st.success("✅ Minuta carregada! Abra 'Gerar Decisões' para editar ou refinar.")
+    
+    with col_download:
+        st.download_button(
+            "💾 Download .txt",
+            data=clean_markdown_for_download(body["generated_decision"]),
+            file_name=f"decisao_{decision['created_at'][:10]}.txt",
+            mime="text/plain",
+            key=f"history_download_{decision['id']}",
+            use_container_width=True
+        )
+
+def _reset_history_page():
+    st.session_state.history_page = 0
@@ -0,0 +1,168 @@
+"""
+Painel de Desempenho (administradores)
+Visão operacional a partir do registro de métricas: latências, Gemini, PDFs, cache e fila
+"""
+import json
+import time
+import streamlit as st
+from components.auth_components import show_write_queue_status
+from services.metrics_service import export_json, export_prometheus
+from services.ocr_service import OCR_RECOGNITION_SERIES
+from services.process_service import TEXT_EXTRACTION_SERIES
+from services.stats_service import get_gemini_usage_summary
+
+REFRESH_SECONDS = 10
+SLOW_CALLS_SHOWN = 15
+
+# Séries usadas nos indicadores
+GEMINI_SERIES = "gemini.generate_content"
+GEMINI_TTFT_SERIES = "gemini.time_to_first_token"
+
+USAGE_GROUPS = {"Prompt": "prompt", "Usuário": "user", "Dia": "day"}
+
+def show_performance_dashboard():
+    """
+    Página de desempenho (atualizada automaticamente, sem recarregar o app)
+    """
+    st.title("📈 Desempenho")
+    st.markdown(f"*Métricas deste servidor desde o último reinício • atualização a cada {REFRESH_SECONDS}s*")
+    
+    show_performance_metrics()
+    
+    st.divider()
+    show_gemini_usage()
+
+def show_gemini_usage():
+    """
+    Consumo e custo estimado do Gemini (banco de dados, sem atualização automática)
+    """
+    st.subheader("💰 Consumo do Gemini")
+    
+    col_days, col_group = st.columns(2)
+    with col_days:
+        days = st.selectbox("Período:", [1, 7, 30], index=1, format_func=lambda d: f"Últimos {d} dia(s)")
+    with col_group:
+        group_label = st.selectbox("Agrupar por:", list(USAGE_GROUPS.keys()))
+    
+    summary = get_gemini_usage_summary(days, USAGE_GROUPS[group_label])
+    if not summary:
+        st.info("Nenhuma chamada registrada no período.")
+        return
+    
+    total_cost = sum(row["cost_usd"] for row in summary)
+    st.metric("Custo estimado no período", f"US$ {total_cost:,.2f}")
+    
+    st.dataframe([
+        {
+            group_label: row["label"],
+            "Chamadas": row["calls"],
+            "Tokens entrada": row["prompt_tokens"],
+            "Tokens saída": row["output_tokens"],
+            "Tokens em cache": row["cached_tokens"],
+            "Entrada média": row["avg_prompt_tokens"],
+            "Tempo médio (s)": row["avg_wall_s"],
+            "Custo (US$)": row["cost_usd"]
+        }
+        for row in summary
+    ], use_container_width=True, hide_index=True)
+    
+    if group_label == "Prompt":
+        st.caption("💡 Entrada média alta indica instrução ou bloco paradigma extensos: eles são enviados em toda chamada.")
+
+@st.fragment(run_every=REFRESH_SECONDS)
+def show_performance_metrics():
+    metrics = export_json()
+    series = metrics["series"]
+    counters = metrics["counters"]
+    
+    # Gemini
+    st.subheader("🤖 Gemini")
+    gemini = series.get(GEMINI_SERIES, {})
+    ttft = series.get(GEMINI_TTFT_SERIES, {})
+    col_calls, col_p95, col_ttft, col_in, col_out = st.columns(5)
+    col_calls.metric("Chamadas", gemini.get("count", 0))
+    col_p95.metric("Latência p95", f"{gemini.get('p95', 0):.1f}s")
+    col_ttft.metric("1º token p50", f"{ttft.get('p50', 0):.1f}s")
+    col_in.metric("Tokens entrada", f"{int(counters.get('gemini.tokens_in', 0)):,}")
+    col_out.metric("Tokens saída", f"{int(counters.get('gemini.tokens_out', 0)):,}")
+    
+    # PDFs
+    st.subheader("📄 Extração de PDF")
+    col_pdf, col_ocr = st.columns(2)
+    # Séries separadas: o OCR (e seus acertos de cache) não entra na taxa da camada de texto
+    col_pdf.metric("Páginas/s (texto)", _throughput(series.get(TEXT_EXTRACTION_SERIES)))
+    col_ocr.metric("Páginas/s (OCR)", _throughput(series.get(OCR_RECOGNITION_SERIES)))
+    
+    # Cache
+    st.subheader("🗄️ Cache")
+    cache_rows = _cache_hit_rates(counters)
+    if cache_rows:
+        st.dataframe(cache_rows, use_container_width=True, hide_index=True)
+    else:
+        st.info("Nenhuma consulta ao cache ainda.")
+    
+    # Fila de gravação
+    st.subheader("📨 Fila de gravação")
+    show_write_queue_status()
+    
+    # Latência por função
+    st.subheader("⏱️ Latência por função")
+    latency_rows = [
+        {
+            "Função": name,
+            "Chamadas": data["count"],
+            "p50 (ms)": round(data["p50"] * 1000, 1),
+            "p95 (ms)": round(data["p95"] * 1000, 1),
+            "p99 (ms)": round(data["p99"] * 1000, 1),
+            "Erros": sum(data["errors"].values()),
+            "Linhas": data["rows"]
+        }
+        for name, data in sorted(series.items(), key=lambda item: item[1]["p95"], reverse=True)
+    ]
+    if latency_rows:
+        st.dataframe(latency_rows, use_container_width=True, hide_index=True)
+    else:
+        st.info("Nenhuma chamada registrada ainda.")
+    
+    # Chamadas mais lentas
+    st.subheader(f"🐢 Chamadas mais lentas (últimos {metrics['slow_calls_window_seconds'] / 60:.0f} min)")
+    slow_rows = [
+        {
+            "Função": call["name"],
+            "Duração (s)": call["seconds"],
+            "Quando": time.strftime("%d/%m %H:%M:%S", time.localtime(call["at"])),
+            "Erro": call["error"] or ""
+        }
+        for call in metrics["slow_calls"][:SLOW_CALLS_SHOWN]
+    ]
+    if slow_rows:
+        st.dataframe(slow_rows, use_container_width=True, hide_index=True)
+    
+    # Exportação
+    col_json, col_prom = st.columns(2)
+    with col_json:
+        st.download_button("💾 Exportar JSON", data=_to_json(metrics), file_name="metricas.json", mime="application/json", use_container_width=True)
+    with col_prom:
+        st.download_button("💾 Exportar Prometheus", data=export_prometheus(), file_name="metricas.prom", mime="text/plain", use_container_width=True)
+
+def _throughput(data: dict) -> str:
+    if not data or not data["sum_seconds"]:
+        return "—"
+    return f"{data['rows'] / data['sum_seconds']:.1f}"
+
+def _cache_hit_rates(counters: dict) -> list[dict]:
+    namespaces = sorted({name.split(".")[1] for name in counters if name.startswith("cache.")})
+    rows = []
+    for namespace in namespaces:
+        hits = counters.get(f"cache.{namespace}.hit", 0)
+        misses = counters.get(f"cache.{namespace}.miss", 0)
+        rows.append({
+            "Cache": namespace,
+            "Acertos": int(hits),
+            "Falhas": int(misses),
+            "Taxa de acerto": f"{hits / (hits + misses):.0%}" if hits + misses else "—"
+        })
+    return rows
+
+def _to_json(metrics: dict) -> str:
+    return json.dumps(metrics, ensure_ascii=False, indent=2)
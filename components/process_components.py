@@ -3,8 +3,10 @@ Componentes para Gerenciamento de Processos
 """
 import streamlit as st
 from services.process_service import (
-    extract_text_from_pdf, save_process_to_db, get_user_processes, 
-    get_process_by_id, delete_process, search_processes
+    extract_text_with_stats, save_process_to_db, get_user_processes, 
+    get_process_by_id, delete_process, search_processes,
+    extract_depositions, save_case_depositions, load_case_depositions,
+    file_fingerprint, read_file_bytes
 )
 
 def show_process_upload():
@@ -28,18 +30,25 @@ def show_process_upload():
             if st.button("🔍 Processar PDF", type="primary"):
                 with st.spinner("Extraindo texto do PDF..."):
                     # Extrair texto
-                    text_content = extract_text_from_pdf(uploaded_file)
+                    text_content, extraction_stats = extract_text_with_stats(uploaded_file)
                     
                     if text_content:
                         # Mostrar preview do texto
                         st.success("✅ Texto extraído com sucesso!")
                         
+                        if extraction_stats.get("removed_chars", 0) > 0:
+                            st.caption(
+                                f"🧹 {extraction_stats['removed_chars']:,} caracteres repetidos removidos "
+                                f"(cabeçalhos, rodapés e carimbos) de {extraction_stats['pages']} páginas"
+                            )
+                        
                         with st.expander("👁️ Visualizar texto extraído (primeiras 500 palavras)"):
                             preview_text = " ".join(text_content.split()[:500])
                             st.text_area("", value=preview_text, height=300, disabled=True)
                         
                         # Salvar no banco
-                        if save_process_to_db(uploaded_file.name, text_content):
+                        content_hash = file_fingerprint(read_file_bytes(uploaded_file))
+                        if save_process_to_db(uploaded_file.name, text_content, content_hash):
                             st.success("💾 Processo salvo no banco de dados!")
                             st.balloons()
                             
@@ -52,7 +61,7 @@ def show_process_upload():
                         st.error("❌ Não foi possível extrair texto do PDF!")
         
         with col2:
-            st.info("💡 **Dicas:**\n- PDFs devem estar em formato texto\n- Evite PDFs escaneados\n- Tamanho máximo: 200MB")
+            st.info("💡 **Dicas:**\n- PDFs em formato texto são processados mais rápido\n- Páginas escaneadas passam por OCR (mais lento)\n- Tamanho máximo: 200MB")
 
 def show_process_list():
     """Lista dos processos do usuário"""
@@ -146,4 +155,60 @@ def show_process_viewer():
         value=process['txt_content'],
         height=400,
         disabled=True
-    )
\ No newline at end of file
+    )
+
+def get_case_key(case_file):
+    """
+    Hash do PDF principal do caso (memorizado na sessão por nome e tamanho)
+    """
+    if case_file is None:
+        return None
+    
+    case_keys = st.session_state.setdefault("case_keys", {})
+    file_id = f"{case_file.name}:{case_file.size}"
+    if file_id not in case_keys:
+        case_keys[file_id] = file_fingerprint(read_file_bytes(case_file))
+    return case_keys[file_id]
+
+def show_depositions_batch(uploaded_depoimentos, case_file=None):
+    """
+    Processamento em lote dos arquivos de depoimentos (.pdf/.txt)
+    O resultado fica associado ao PDF principal e é recuperado em novas sessões
+    """
+    case_key = get_case_key(case_file)
+    
+    # Recuperar depoimentos já processados para este processo
+    if case_key and 'depoimentos_processados' not in st.session_state:
+        saved_depositions = load_case_depositions(case_key)
+        if saved_depositions:
+            st.session_state.depoimentos_processados = saved_depositions
+            st.info("♻️ Depoimentos já processados para este processo foram recuperados.")
+    
+    if not uploaded_depoimentos:
+        return
+    
+    st.success(f"✅ {len(uploaded_depoimentos)} arquivo(s) selecionado(s):")
+    for file in uploaded_depoimentos:
+        st.write(f"📄 {file.name} ({file.size/1024:.1f} KB)")
+    
+    # Botão para processar arquivos
+    if st.button("🔄 Processar Depoimentos", key="process_depoimentos"):
+        with st.spinner("Processando depoimentos..."):
+            combined_depositions, errors = extract_depositions(uploaded_depoimentos)
+        
+        for error in errors:
+            st.error(error)
+        
+        if combined_depositions:
+            st.session_state.depoimentos_processados = combined_depositions
+            if case_key:
+                save_case_depositions(case_key, combined_depositions)
+            st.success("✅ Depoimentos processados com sucesso!")
+            
+            with st.expander("👁️ Visualizar depoimentos processados"):
+                st.text_area(
+                    "Conteúdo extraído:",
+                    value=st.session_state.depoimentos_processados,
+                    height=200,
+                    disabled=True
+                )
\ No newline at end of file
@@ -2,23 +2,68 @@
 Configuração do Supabase
 """
 import os
-from supabase import create_client, Client
+import threading
+from typing import TYPE_CHECKING
 from dotenv import load_dotenv
 
+if TYPE_CHECKING:
+    from supabase import Client
+
 # Carregar variáveis de ambiente
 load_dotenv()
 
-def get_supabase_client() -> Client:
-    """
-    Cria e retorna cliente do Supabase
-    """
+# Um cliente por processo: as consultas reaproveitam o mesmo pool de conexões HTTP
+_client = None
+_async_client = None
+_client_lock = threading.Lock()
+
+def _get_credentials() -> tuple[str, str]:
     url = os.getenv("SUPABASE_URL")
     key = os.getenv("SUPABASE_ANON_KEY")
     
     if not url or not key:
         raise ValueError("Credenciais do Supabase não encontradas no arquivo .env")
+    return url, key
+
+def get_supabase_client() -> "Client":
+    """
+    Retorna o cliente do Supabase compartilhado (com rastreamento de consultas)
+    """
+    global _client
+    if _client is not None:
+        return _client
+    
+    # Import tardio: a página de login não precisa carregar o cliente
+    from supabase import create_client
+    # Consultas contadas por página renderizada (services/query_tracer.py)
+    from services.query_tracer import traced_client
+    
+    with _client_lock:
+        if _client is None:
+            url, key = _get_credentials()
+            _client = traced_client(create_client(url, key))
+    return _client
+
+def get_async_supabase_client():
+    """
+    Retorna o cliente PostgREST assíncrono compartilhado (com rastreamento de consultas)
+    Usado apenas no laço de eventos dos serviços (services/query_executor.py), ao qual o pool fica vinculado
+    """
+    global _async_client
+    if _async_client is not None:
+        return _async_client
+    
+    # Mesmo pacote usado internamente pelo cliente síncrono do supabase
+    from postgrest import AsyncPostgrestClient
+    from services.query_tracer import traced_client
     
-    return create_client(url, key)
+    with _client_lock:
+        if _async_client is None:
+            url, key = _get_credentials()
+            client = AsyncPostgrestClient(f"{url}/rest/v1", headers={"apiKey": key})
+            client.auth(token=key)
+            _async_client = traced_client(client)
+    return _async_client
 
 def test_connection():
     """
@@ -0,0 +1,3 @@
+-- Offsets das peças processuais (petição inicial, contestação, decisões...)
+-- Gerados por services/segmentation_service.segment_process
+alter table processes add column if not exists segments jsonb not null default '[]'::jsonb;
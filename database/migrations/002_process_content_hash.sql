@@ -0,0 +1,8 @@
+-- Hash SHA-256 do PDF original, usado para deduplicar uploads e importações em lote
+alter table processes add column if not exists content_hash text;
+
+create index if not exists processes_user_content_hash_idx on processes (user_id, content_hash);
+
+-- Processos importados em lote (ingest.py) não entram na retenção de 6 horas
+-- nem no limite de 5 processos por usuário
+alter table processes add column if not exists ingested boolean not null default false;
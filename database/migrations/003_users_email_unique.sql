@@ -0,0 +1,2 @@
+-- Email único: o cadastro insere direto e trata a violação (sem consulta prévia)
+create unique index if not exists users_email_key on users (email);
@@ -0,0 +1,13 @@
+-- Trilha de auditoria das ações administrativas (aprovação/rejeição em lote)
+create table if not exists admin_audit_log (
+    id uuid primary key default gen_random_uuid(),
+    actor_id uuid references users (id) on delete set null,
+    action text not null,
+    target_ids jsonb not null default '[]'::jsonb,
+    created_at timestamptz not null default now()
+);
+
+create index if not exists admin_audit_log_created_at_idx on admin_audit_log (created_at desc);
+
+-- Paginação dos cadastros pendentes
+create index if not exists users_pending_created_at_idx on users (created_at) where approved = false;
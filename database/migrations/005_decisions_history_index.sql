@@ -0,0 +1,2 @@
+-- Histórico paginado: decisões do usuário, mais recentes primeiro
+create index if not exists decisions_user_created_at_idx on decisions (user_id, created_at desc);
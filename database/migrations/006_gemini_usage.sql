@@ -0,0 +1,36 @@
+-- Consumo do Gemini por chamada (geração e refinamento)
+create table if not exists gemini_usage (
+    id uuid primary key default gen_random_uuid(),
+    user_id uuid references users (id) on delete set null,
+    prompt_id uuid references prompts (id) on delete set null,
+    -- Decisões são removidas em 24h; o consumo permanece
+    decision_id uuid references decisions (id) on delete set null,
+    operation text not null,
+    model text not null,
+    prompt_tokens integer not null default 0,
+    output_tokens integer not null default 0,
+    cached_tokens integer not null default 0,
+    wall_ms integer not null default 0,
+    created_at timestamptz not null default now()
+);
+
+create index if not exists gemini_usage_created_at_idx on gemini_usage (created_at desc);
+
+-- Agregação por usuário, prompt e dia (consultada pelo painel de desempenho)
+create or replace view gemini_usage_daily as
+select
+    date_trunc('day', u.created_at)::date as day,
+    u.user_id,
+    us.email,
+    u.prompt_id,
+    p.title as prompt_title,
+    count(*) as calls,
+    sum(u.prompt_tokens) as prompt_tokens,
+    sum(u.output_tokens) as output_tokens,
+    sum(u.cached_tokens) as cached_tokens,
+    round(avg(u.prompt_tokens)) as avg_prompt_tokens,
+    round(avg(u.wall_ms)) as avg_wall_ms
+from gemini_usage u
+left join users us on us.id = u.user_id
+left join prompts p on p.id = u.prompt_id
+group by 1, 2, 3, 4, 5;
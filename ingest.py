@@ -0,0 +1,214 @@
+"""
+Decisum - Importação em Lote
+Importa todos os PDFs de uma pasta (ou arquivo .zip) para a tabela processes
+
+Uso:
+    python ingest.py <pasta|arquivo.zip> --email usuario@tribunal.jus.br [--batch-size 50] [--workers N]
+
+Os processos importados são marcados com ingested = true e ficam fora da limpeza
+automática (retenção de 6 horas e limite de 5 processos por usuário); removê-los
+cabe à limpeza manual ou à limpeza completa do administrador.
+"""
+import argparse
+import hashlib
+import os
+import sys
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from contextlib import contextmanager
+
+from config.supabase_config import get_supabase_client
+from services.process_service import (
+    extract_pdf_bytes, build_process_record,
+    get_existing_content_hashes, save_processes_batch
+)
+
+# Arquivos em extração por processo do pool (limita a memória em remessas grandes)
+WINDOW_PER_WORKER = 2
+
+def iter_pdf_files(source: str):
+    """
+    Percorre uma pasta (recursivamente) ou um .zip e gera (nome, referência) de cada PDF
+    A referência (caminho ou membro do .zip) é lida sob demanda por read_pdf
+    """
+    if zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            for info in archive.infolist():
+                if not info.is_dir() and info.filename.lower().endswith(".pdf"):
+                    yield os.path.basename(info.filename), (source, info.filename)
+        return
+
+    for root, _, files in os.walk(source):
+        for name in sorted(files):
+            if name.lower().endswith(".pdf"):
+                yield name, os.path.join(root, name)
+
+@contextmanager
+def open_pdf(ref):
+    """
+    Abre o PDF referenciado (caminho ou (zip, membro)) para leitura binária
+    """
+    if isinstance(ref, tuple):
+        with zipfile.ZipFile(ref[0]) as archive, archive.open(ref[1]) as f:
+            yield f
+    else:
+        with open(ref, "rb") as f:
+            yield f
+
+def read_pdf(ref) -> bytes:
+    with open_pdf(ref) as f:
+        return f.read()
+
+def hash_pdf(ref) -> str:
+    """
+    Hash do conteúdo (o mesmo de file_fingerprint), lido em blocos
+    """
+    digest = hashlib.sha256()
+    with open_pdf(ref) as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def extract_pdf_file(ref) -> tuple[str, dict]:
+    """
+    Executada no processo do pool: lê o arquivo e extrai o texto
+    (páginas escaneadas passam pelo OCR no próprio processo)
+    """
+    return extract_pdf_bytes(read_pdf(ref))
+
+def get_user_id(email: str) -> str:
+    """
+    Busca o id do usuário dono dos processos importados
+    """
+    supabase = get_supabase_client()
+    result = supabase.table("users").select("id").eq("email", email).execute()
+
+    if not result.data:
+        raise ValueError(f"Usuário não encontrado: {email}")
+    return result.data[0]["id"]
+
+def ingest(source: str, user_id: str, batch_size: int = 50, workers: int = None) -> dict:
+    """
+    Deduplica por hash, extrai os PDFs em paralelo e insere em lotes
+    Os arquivos são enviados ao pool em janelas (WINDOW_PER_WORKER por processo) e
+    lidos pelos próprios processos: a memória não cresce com o tamanho da remessa
+    Returns: resumo da importação
+    """
+    started = time.perf_counter()
+    summary = {
+        "found": 0, "duplicates": 0, "already_imported": 0,
+        "failed": 0, "empty": 0, "inserted": 0, "pages": 0, "errors": []
+    }
+
+    # Deduplicar dentro da própria remessa
+    files = {}
+    for name, ref in iter_pdf_files(source):
+        summary["found"] += 1
+        content_hash = hash_pdf(ref)
+        if content_hash in files:
+            summary["duplicates"] += 1
+            continue
+        files[content_hash] = (name, ref)
+
+    # Ignorar arquivos já importados anteriormente
+    existing = get_existing_content_hashes(user_id, list(files))
+    summary["already_imported"] = len(existing)
+    for content_hash in existing:
+        del files[content_hash]
+
+    total = len(files)
+    print(f"📂 {summary['found']} PDFs encontrados, {total} para importar")
+
+    pending_records = []
+    done = 0
+    workers = workers or os.cpu_count() or 1
+    queue = iter(files.items())
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        running = {}
+
+        def refill():
+            for content_hash, (name, ref) in queue:
+                running[executor.submit(extract_pdf_file, ref)] = (content_hash, name)
+                if len(running) >= workers * WINDOW_PER_WORKER:
+                    break
+
+        refill()
+        while running:
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                content_hash, name = running.pop(future)
+                done += 1
+
+                try:
+                    text, stats = future.result()
+                except Exception as e:
+                    summary["failed"] += 1
+                    summary["errors"].append(f"{name}: {e}")
+                    print(f"[{done}/{total}] ❌ {name}: {e}")
+                    continue
+
+                if not text:
+                    summary["empty"] += 1
+                    print(f"[{done}/{total}] ⚠️ {name}: sem texto extraível")
+                    continue
+
+                summary["pages"] += stats.get("pages", 0)
+                pending_records.append(build_process_record(name, text, user_id, content_hash, ingested=True))
+                print(f"[{done}/{total}] ✅ {name} ({stats.get('pages', 0)} páginas)")
+
+                if len(pending_records) >= batch_size:
+                    summary["inserted"] += len(save_processes_batch(pending_records))
+                    pending_records = []
+            refill()
+
+    summary["inserted"] += len(save_processes_batch(pending_records))
+    summary["elapsed_seconds"] = round(time.perf_counter() - started, 2)
+
+    return summary
+
+def print_summary(summary: dict):
+    """
+    Exibe o relatório final da importação
+    """
+    print()
+    print("=== RESUMO DA IMPORTAÇÃO ===")
+    print(f"PDFs encontrados:      {summary['found']}")
+    print(f"Duplicados na remessa: {summary['duplicates']}")
+    print(f"Já importados antes:   {summary['already_imported']}")
+    print(f"Sem texto:             {summary['empty']}")
+    print(f"Falhas:                {summary['failed']}")
+    print(f"Inseridos:             {summary['inserted']}")
+    print(f"Páginas processadas:   {summary['pages']}")
+    print(f"Tempo total:           {summary['elapsed_seconds']}s")
+
+    if summary["elapsed_seconds"] > 0 and summary["pages"]:
+        print(f"Vazão:                 {summary['pages'] / summary['elapsed_seconds']:.1f} páginas/s")
+
+    for error in summary["errors"]:
+        print(f"  ❌ {error}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Importa PDFs de processos em lote para o Decisum")
+    parser.add_argument("source", help="Pasta com PDFs ou arquivo .zip")
+    parser.add_argument("--email", required=True, help="Email do usuário dono dos processos")
+    parser.add_argument("--batch-size", type=int, default=50, help="Registros por inserção (padrão: 50)")
+    parser.add_argument("--workers", type=int, default=None, help="Processos de extração (padrão: núcleos da CPU)")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.source):
+        parser.error(f"Caminho não encontrado: {args.source}")
+
+    try:
+        user_id = get_user_id(args.email)
+        summary = ingest(args.source, user_id, args.batch_size, args.workers)
+    except Exception as e:
+        print(f"❌ Erro na importação: {e}")
+        sys.exit(1)
+
+    print_summary(summary)
+    sys.exit(1 if summary["failed"] else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Serviços Assíncronos
+Variante assíncrona das leituras dos serviços (processos, prompts, decisões, estatísticas,
+usuários) sobre o cliente PostgREST assíncrono, com um único pool de conexões HTTP
+
+As corrotinas executam no laço de eventos de services/query_executor.py, em uma thread de
+fundo. As funções síncronas dos serviços são fachadas sobre elas (run_sync), e páginas que
+disparam várias leituras usam run_concurrently, que aceita as corrotinas diretamente:
+
+    stats = get_dashboard_stats()                      # todas as seções em paralelo
+    processes = run_sync(get_user_processes_async(user_id))
+
+As consultas e o tratamento das linhas são os mesmos das funções síncronas
+(funções *_query e summarize_* de cada serviço). Erros propagam: as corrotinas não
+chamam st.* (executam fora da thread do script)
+"""
+import asyncio
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from config.supabase_config import get_async_supabase_client
+from services.metrics_service import instrumented
+from services.query_executor import QUERY_TIMEOUT_SECONDS, get_event_loop, run_concurrently
+from services import stats_service
+from services.auth_service import pending_users_query
+from services.decision_service import decision_history_query
+from services.process_service import user_processes_query
+from services.prompt_service import group_by_decision_type
+
+# Fachada síncrona
+
+def run_sync(coro, timeout: float = None):
+    """
+    Executa a corrotina no laço dos serviços e aguarda o resultado
+    As variáveis de contexto da chamada (rastreamento de consultas) seguem para a corrotina
+    """
+    future = asyncio.run_coroutine_threadsafe(coro, get_event_loop())
+    try:
+        return future.result(timeout)
+    except FutureTimeoutError:
+        future.cancel()
+        raise
+
+# Estatísticas
+
+@instrumented
+async def get_decision_stats_async() -> dict:
+    result = await stats_service.decision_stats_query(get_async_supabase_client()).execute()
+    return stats_service.summarize_decision_stats(result.data)
+
+@instrumented
+async def get_top_legal_areas_async() -> dict:
+    result = await stats_service.top_legal_areas_query(get_async_supabase_client()).execute()
+    return stats_service.summarize_top_legal_areas(result.data)
+
+@instrumented
+async def get_recent_prompts_async() -> dict:
+    result = await stats_service.recent_prompts_query(get_async_supabase_client()).execute()
+    return stats_service.summarize_recent_prompts(result.data)
+
+@instrumented
+async def get_top_prompt_contributors_async() -> dict:
+    result = await stats_service.top_prompt_contributors_query(get_async_supabase_client()).execute()
+    return stats_service.summarize_top_prompt_contributors(result.data)
+
+@instrumented
+async def get_system_overview_async() -> dict:
+    queries = stats_service.system_overview_queries(get_async_supabase_client())
+    # Contagens independentes, em paralelo (contagem com erro ou além do tempo: None)
+    outcomes = await asyncio.gather(
+        *(asyncio.wait_for(query.execute(), QUERY_TIMEOUT_SECONDS) for query in queries.values()),
+        return_exceptions=True
+    )
+    results = {
+        name: None if isinstance(outcome, Exception) else outcome
+        for name, outcome in zip(queries, outcomes)
+    }
+    return stats_service.summarize_system_overview(results)
+
+def get_dashboard_stats(timeout: float = None) -> dict:
+    """
+    Todas as seções do Dashboard em paralelo (seção com erro ou sem resposta: success False)
+    """
+    return run_concurrently({
+        "overview": get_system_overview_async,
+        "decision_stats": get_decision_stats_async,
+        "top_areas": get_top_legal_areas_async,
+        "top_contributors": get_top_prompt_contributors_async,
+        "recent_prompts": get_recent_prompts_async
+    }, timeout, fallback={"success": False})
+
+# Processos, prompts, decisões e usuários
+
+@instrumented
+async def get_user_processes_async(user_id: str) -> list:
+    result = await user_processes_query(get_async_supabase_client(), user_id).execute()
+    return result.data
+
+@instrumented
+async def get_prompts_by_area_async(legal_area: str) -> dict:
+    """
+    Prompts públicos da área agrupados por tipo de decisão
+    """
+    supabase = get_async_supabase_client()
+    result = await supabase.table("prompts").select("*").eq("legal_area", legal_area).eq("is_public", True).execute()
+    return group_by_decision_type(result.data)
+
+@instrumented
+async def get_decision_history_async(user_id: str, page: int = 0, page_size: int = 20, prompt_id: str = None,
+                                     legal_area: str = None, decision_type: str = None) -> tuple[list, int]:
+    """
+    Returns: (decisões da página, total)
+    """
+    query = decision_history_query(get_async_supabase_client(), user_id, page, page_size,
+                                   prompt_id, legal_area, decision_type)
+    result = await query.execute()
+    return result.data, result.count or 0
+
+@instrumented
+async def get_pending_users_async(page: int = 0, page_size: int = 50) -> tuple[list, int]:
+    """
+    Returns: (usuários da página, total de pendentes)
+    """
+    result = await pending_users_query(get_async_supabase_client(), page, page_size).execute()
+    return result.data, result.count or 0
@@ -1,18 +1,25 @@
 """
 Serviço de Autenticação
 """
+import base64
 import hashlib
+import hmac
+import json
+import os
+import time
 import streamlit as st
 from config.supabase_config import get_supabase_client
+from services.password_service import hash_password, verify_password, needs_rehash, run_kdf
+from services.metrics_service import instrumented, record_error
 
-def hash_password(password: str) -> str:
-    """Gera hash da senha"""
-    return hashlib.sha256(password.encode()).hexdigest()
+# Campos mantidos no perfil de sessão (nunca a senha ou a chave API)
+SESSION_PROFILE_FIELDS = ("id", "email", "role", "approved")
+SESSION_TTL_HOURS = float(os.getenv("DECISUM_SESSION_TTL_HOURS", "12"))
 
-def verify_password(password: str, hashed: str) -> bool:
-    """Verifica se a senha está correta"""
-    return hash_password(password) == hashed
+# Violação de restrição única no Postgres
+UNIQUE_VIOLATION = "23505"
 
+@instrumented
 def register_user(email: str, password: str) -> tuple[bool, str]:
     """
     Registra novo usuário
@@ -21,25 +28,24 @@ def register_user(email: str, password: str) -> tuple[bool, str]:
     try:
         supabase = get_supabase_client()
         
-        # Verificar se email já existe
-        result = supabase.table("users").select("email").eq("email", email).execute()
-        if result.data:
-            return False, "Email já cadastrado!"
-        
-        # Criar usuário
-        password_hash = hash_password(password)
+        # Criar usuário (email único garantido pelo banco, sem consulta prévia)
+        password_hash = run_kdf(hash_password, password)
         result = supabase.table("users").insert({
             "email": email,
             "password_hash": password_hash,
             "role": "user",
             "approved": False  # Precisa aprovação do admin
-        }).execute()
+        }, returning="minimal").execute()
         
         return True, "Usuário registrado! Aguarde aprovação do administrador."
     
     except Exception as e:
+        record_error(e)
+        if getattr(e, "code", None) == UNIQUE_VIOLATION:
+            return False, "Email já cadastrado!"
         return False, f"Erro ao registrar: {e}"
 
+@instrumented
 def login_user(email: str, password: str) -> tuple[bool, str, dict]:
     """
     Faz login do usuário
@@ -48,8 +54,8 @@ def login_user(email: str, password: str) -> tuple[bool, str, dict]:
     try:
         supabase = get_supabase_client()
         
-        # Buscar usuário
-        result = supabase.table("users").select("*").eq("email", email).execute()
+        # Buscar usuário (apenas os campos necessários para autenticar)
+        result = supabase.table("users").select("id, email, role, approved, password_hash").eq("email", email).execute()
         
         if not result.data:
             return False, "Email não encontrado!", {}
@@ -57,34 +63,145 @@ def login_user(email: str, password: str) -> tuple[bool, str, dict]:
         user = result.data[0]
         
         # Verificar senha
-        if not verify_password(password, user["password_hash"]):
+        if not run_kdf(verify_password, password, user["password_hash"]):
             return False, "Senha incorreta!", {}
         
+        # Migrar hashes antigos (SHA-256) ou com fatores de trabalho desatualizados
+        if needs_rehash(user["password_hash"]):
+            try:
+                new_hash = run_kdf(hash_password, password)
+                supabase.table("users").update({"password_hash": new_hash}).eq("id", user["id"]).execute()
+            except Exception:
+                pass  # Migração é oportunista: o login não deve falhar por isso
+        
         # Verificar se está aprovado
         if not user["approved"]:
             return False, "Usuário ainda não foi aprovado pelo administrador!", {}
         
-        return True, "Login realizado com sucesso!", user
+        return True, "Login realizado com sucesso!", build_session_profile(user)
     
     except Exception as e:
+        record_error(e)
         return False, f"Erro no login: {e}", {}
 
-def get_pending_users():
-    """Retorna usuários pendentes de aprovação"""
+def build_session_profile(user: dict) -> dict:
+    """
+    Monta o perfil de sessão a partir do registro do usuário
+    """
+    return {field: user.get(field) for field in SESSION_PROFILE_FIELDS}
+
+def _session_secret() -> bytes:
+    # Obrigatório: um segredo aleatório por processo invalidaria as sessões a cada reinício
+    secret = os.getenv("DECISUM_SESSION_SECRET")
+    if not secret:
+        raise RuntimeError("DECISUM_SESSION_SECRET não configurado")
+    return secret.encode()
+
+def _sign(payload: bytes) -> str:
+    return hmac.new(_session_secret(), payload, hashlib.sha256).hexdigest()
+
+def create_session_token(profile: dict) -> str:
+    """
+    Gera token assinado (HMAC-SHA256) com o perfil de sessão e validade
+    O token fica apenas no estado da sessão no servidor (nunca na URL)
+    """
+    data = dict(build_session_profile(profile), exp=int(time.time() + SESSION_TTL_HOURS * 3600))
+    payload = base64.urlsafe_b64encode(json.dumps(data, separators=(",", ":")).encode())
+    return f"{payload.decode()}.{_sign(payload)}"
+
+def verify_session_token(token: str):
+    """
+    Valida o token de sessão sem consultar o banco
+    Returns: perfil do usuário ou None se inválido/expirado
+    """
     try:
-        supabase = get_supabase_client()
-        result = supabase.table("users").select("*").eq("approved", False).execute()
-        return result.data
+        payload, signature = token.rsplit(".", 1)
+        if not hmac.compare_digest(_sign(payload.encode()), signature):
+            return None
+        
+        data = json.loads(base64.urlsafe_b64decode(payload.encode()))
+        if data.get("exp", 0) < time.time():
+            return None
+        
+        return build_session_profile(data)
+    except Exception:
+        return None
+
+def pending_users_query(supabase, page: int, page_size: int):
+    # Consulta da variante assíncrona (services/async_service.py)
+    start = page * page_size
+    return supabase.table("users").select("id, email, created_at", count="exact").eq("approved", False).order("created_at").range(start, start + page_size - 1)
+
+@instrumented
+def get_pending_users(page: int = 0, page_size: int = 50) -> tuple[list, int]:
+    """
+    Retorna uma página de usuários pendentes de aprovação
+    Returns: (usuários da página, total de pendentes)
+    """
+    try:
+        # Import tardio: async_service importa este módulo
+        from services.async_service import run_sync, get_pending_users_async
+        return run_sync(get_pending_users_async(page, page_size))
     except Exception as e:
+        record_error(e)
         st.error(f"Erro ao buscar usuários: {e}")
-        return []
+        return [], 0
 
-def approve_user(user_id: str) -> bool:
-    """Aprova um usuário"""
+@instrumented
+def log_admin_action(action: str, target_ids: list[str]):
+    """
+    Registra ação administrativa na trilha de auditoria
+    """
+    # Import local: auth_components importa este módulo
+    from components.auth_components import get_current_user
+    
+    supabase = get_supabase_client()
+    supabase.table("admin_audit_log").insert({
+        "actor_id": get_current_user().get("id"),
+        "action": action,
+        "target_ids": target_ids
+    }, returning="minimal").execute()
+
+@instrumented
+def approve_users(user_ids: list[str]) -> int:
+    """
+    Aprova vários usuários com um único UPDATE
+    Returns: quantidade de usuários aprovados
+    """
+    if not user_ids:
+        return 0
     try:
         supabase = get_supabase_client()
-        supabase.table("users").update({"approved": True}).eq("id", user_id).execute()
-        return True
+        result = supabase.table("users").update({"approved": True}).in_("id", user_ids).eq("approved", False).execute()
+        approved_ids = [row["id"] for row in result.data]
+        if approved_ids:
+            log_admin_action("approve_users", approved_ids)
+        return len(approved_ids)
     except Exception as e:
-        st.error(f"Erro ao aprovar usuário: {e}")
-        return False
\ No newline at end of file
+        record_error(e)
+        st.error(f"Erro ao aprovar usuários: {e}")
+        return 0
+
+@instrumented
+def reject_users(user_ids: list[str]) -> int:
+    """
+    Rejeita (remove) vários cadastros pendentes com um único DELETE
+    Returns: quantidade de cadastros removidos
+    """
+    if not user_ids:
+        return 0
+    try:
+        supabase = get_supabase_client()
+        result = supabase.table("users").delete().in_("id", user_ids).eq("approved", False).execute()
+        rejected_ids = [row["id"] for row in result.data]
+        if rejected_ids:
+            log_admin_action("reject_users", rejected_ids)
+        return len(rejected_ids)
+    except Exception as e:
+        record_error(e)
+        st.error(f"Erro ao rejeitar usuários: {e}")
+        return 0
+
+def approve_user(user_id: str) -> bool:
+    """Aprova um usuário"""
+    return approve_users([user_id]) > 0
\ No newline at end of file
@@ -0,0 +1,86 @@
+"""
+Serviço de Cache Local
+Cache em disco, por hash de conteúdo, para textos extraídos (PDF, OCR, depoimentos)
+"""
+import json
+import os
+import time
+from services.metrics_service import increment
+
+CACHE_DIR = os.getenv("DECISUM_CACHE_DIR", os.path.join(os.path.dirname(os.path.dirname(__file__)), ".cache"))
+
+# Mesma retenção dos processos: dados sensíveis não ficam armazenados
+CACHE_TTL_HOURS = float(os.getenv("DECISUM_CACHE_TTL_HOURS", "6"))
+
+def _cache_path(namespace: str, key: str) -> str:
+    return os.path.join(CACHE_DIR, namespace, key[:2], key)
+
+def cache_get(namespace: str, key: str):
+    """
+    Retorna o texto em cache ou None se ausente/expirado
+    """
+    path = _cache_path(namespace, key)
+    try:
+        if time.time() - os.path.getmtime(path) > CACHE_TTL_HOURS * 3600:
+            increment(f"cache.{namespace}.miss")
+            return None
+        with open(path, encoding="utf-8") as f:
+            text = f.read()
+    except OSError:
+        increment(f"cache.{namespace}.miss")
+        return None
+    
+    increment(f"cache.{namespace}.hit")
+    return text
+
+def cache_put(namespace: str, key: str, text: str):
+    """
+    Grava o texto no cache (escrita atômica)
+    """
+    path = _cache_path(namespace, key)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass  # Cache é apenas otimização
+
+def cache_get_json(namespace: str, key: str):
+    """
+    Retorna o objeto JSON em cache ou None
+    """
+    cached = cache_get(namespace, key)
+    if cached is None:
+        return None
+    try:
+        return json.loads(cached)
+    except ValueError:
+        return None
+
+def cache_put_json(namespace: str, key: str, data):
+    """
+    Grava um objeto JSON no cache
+    """
+    cache_put(namespace, key, json.dumps(data, ensure_ascii=False))
+
+def purge_expired_cache() -> int:
+    """
+    Remove entradas expiradas do cache
+    Returns: quantidade de arquivos removidos
+    """
+    removed = 0
+    cutoff = time.time() - CACHE_TTL_HOURS * 3600
+
+    for root, _, files in os.walk(CACHE_DIR):
+        for name in files:
+            path = os.path.join(root, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    removed += 1
+            except OSError:
+                pass
+
+    return removed
@@ -6,10 +6,19 @@ import streamlit as st
 from datetime import datetime, timedelta
 from config.supabase_config import get_supabase_client
 from components.auth_components import get_current_user, is_admin
+from services.cache_service import purge_expired_cache
+from services.query_executor import run_concurrently
+from services.metrics_service import instrumented, record_error
+import os
 
+# Retenção das decisões geradas (também aplicada ao índice de precedentes)
+DECISION_RETENTION_HOURS = float(os.getenv("DECISUM_DECISION_RETENTION_HOURS", "24"))
+
+@instrumented
 def auto_cleanup_old_processes():
     """
     Remove processos com mais de 6 horas automaticamente
+    Processos importados em lote (ingest.py) não expiram
     Executa automaticamente quando o usuário acessa o sistema
     """
     try:
@@ -20,7 +29,7 @@ def auto_cleanup_old_processes():
         cutoff_time = six_hours_ago.isoformat()
         
         # Buscar processos antigos
-        old_processes = supabase.table("processes").select("id, filename, created_at").lt("created_at", cutoff_time).execute()
+        old_processes = supabase.table("processes").select("id, filename, created_at").lt("created_at", cutoff_time).eq("ingested", False).execute()
         
         if old_processes.data:
             # Deletar processos antigos
@@ -32,18 +41,18 @@ def auto_cleanup_old_processes():
         return True, 0
     
     except Exception as e:
+        record_error(e)
         return False, str(e)
 
+@instrumented
 def cleanup_old_decisions():
     """
-    Remove decisões geradas com mais de 24 horas
+    Remove decisões geradas fora da retenção (padrão: 24 horas)
     """
     try:
         supabase = get_supabase_client()
         
-        # Calcular 24 horas atrás
-        twentyfour_hours_ago = datetime.now() - timedelta(hours=24)
-        cutoff_time = twentyfour_hours_ago.isoformat()
+        cutoff_time = (datetime.now() - timedelta(hours=DECISION_RETENTION_HOURS)).isoformat()
         
         # Buscar decisões antigas
         old_decisions = supabase.table("decisions").select("id").lt("created_at", cutoff_time).execute()
@@ -52,25 +61,29 @@ def cleanup_old_decisions():
             # Deletar decisões antigas
             for decision in old_decisions.data:
                 supabase.table("decisions").delete().eq("id", decision["id"]).execute()
-            
-            return True, len(old_decisions.data)
         
-        return True, 0
+        # Índice local de precedentes segue a mesma retenção
+        from services.precedent_service import prune_precedents
+        prune_precedents()
+        
+        return True, len(old_decisions.data)
     
     except Exception as e:
+        record_error(e)
         return False, str(e)
 
+@instrumented
 def enforce_user_limits():
     """
     Garante que cada usuário tenha no máximo 5 processos ativos
-    Remove os mais antigos se exceder o limite
+    Remove os mais antigos se exceder o limite (processos importados em lote não contam)
     """
     try:
         user_data = get_current_user()
         supabase = get_supabase_client()
         
         # Buscar processos do usuário ordenados por data (mais recente primeiro)
-        user_processes = supabase.table("processes").select("id, filename, created_at").eq("user_id", user_data["id"]).order("created_at", desc=True).execute()
+        user_processes = supabase.table("processes").select("id, filename, created_at").eq("user_id", user_data["id"]).eq("ingested", False).order("created_at", desc=True).execute()
         
         if len(user_processes.data) > 5:
             # Remover processos além do limite (manter apenas os 5 mais recentes)
@@ -84,8 +97,10 @@ def enforce_user_limits():
         return True, 0
     
     except Exception as e:
+        record_error(e)
         return False, str(e)
 
+@instrumented
 def get_system_stats():
     """
     Retorna estatísticas do sistema para monitoramento
@@ -93,39 +108,54 @@ def get_system_stats():
     try:
         supabase = get_supabase_client()
         
-        # Contar total de registros
-        processes_count = supabase.table("processes").select("id", count="exact").execute()
-        prompts_count = supabase.table("prompts").select("id", count="exact").execute()
-        decisions_count = supabase.table("decisions").select("id", count="exact").execute()
-        users_count = supabase.table("users").select("id", count="exact").execute()
-        
-        # Processos por usuário
         user_data = get_current_user()
-        user_processes = supabase.table("processes").select("id", count="exact").eq("user_id", user_data["id"]).execute()
+        
+        # Contagens independentes, em paralelo
+        counts = run_concurrently({
+            "processes": lambda: supabase.table("processes").select("id", count="exact").execute().count,
+            "prompts": lambda: supabase.table("prompts").select("id", count="exact").execute().count,
+            "decisions": lambda: supabase.table("decisions").select("id", count="exact").execute().count,
+            "users": lambda: supabase.table("users").select("id", count="exact").execute().count,
+            # Processos por usuário (sujeitos ao limite de 5)
+            "user_processes": lambda: supabase.table("processes").select("id", count="exact").eq("user_id", user_data["id"]).eq("ingested", False).execute().count,
+            # Amostra para o tamanho aproximado dos dados
+            "recent_processes": lambda: supabase.table("processes").select("txt_content").limit(10).execute().data
+        })
+        
+        # Contagem sem resposta (erro ou tempo limite) não vira zero
+        missing = [name for name, value in counts.items() if value is None]
+        if missing:
+            return {
+                "error": f"Estatísticas indisponíveis: {', '.join(missing)}",
+                "missing": missing,
+                "success": False
+            }
         
         # Calcular tamanho aproximado dos dados
-        recent_processes = supabase.table("processes").select("txt_content").limit(10).execute()
+        recent_processes = counts["recent_processes"]
         avg_size = 0
-        if recent_processes.data:
-            total_chars = sum(len(p.get("txt_content", "")) for p in recent_processes.data)
-            avg_size = total_chars / len(recent_processes.data) if recent_processes.data else 0
+        if recent_processes:
+            total_chars = sum(len(p.get("txt_content", "")) for p in recent_processes)
+            avg_size = total_chars / len(recent_processes)
         
         return {
-            "total_processes": processes_count.count or 0,
-            "total_prompts": prompts_count.count or 0, 
-            "total_decisions": decisions_count.count or 0,
-            "total_users": users_count.count or 0,
-            "user_processes": user_processes.count or 0,
+            "total_processes": counts["processes"],
+            "total_prompts": counts["prompts"], 
+            "total_decisions": counts["decisions"],
+            "total_users": counts["users"],
+            "user_processes": counts["user_processes"],
             "avg_process_size": avg_size,
             "success": True
         }
     
     except Exception as e:
+        record_error(e)
         return {
             "error": str(e),
             "success": False
         }
 
+@instrumented
 def manual_cleanup_user_data():
     """
     Permite ao usuário limpar seus próprios dados manualmente
@@ -149,11 +179,16 @@ def manual_cleanup_user_data():
         if decisions_count > 0:
             supabase.table("decisions").delete().eq("user_id", user_data["id"]).execute()
         
+        from services.precedent_service import remove_user_precedents
+        remove_user_precedents(user_data["id"])
+        
         return True, processes_count, decisions_count
     
     except Exception as e:
+        record_error(e)
         return False, 0, 0
 
+@instrumented
 def admin_cleanup_system():
     """
     Limpeza completa do sistema (apenas para admins)
@@ -176,11 +211,16 @@ def admin_cleanup_system():
         if decisions_count > 0:
             supabase.table("decisions").delete().neq("id", "").execute()  # Delete all
         
+        from services.precedent_service import clear_precedents
+        clear_precedents()
+        
         return True, f"Removidos: {processes_count} processos e {decisions_count} decisões"
     
     except Exception as e:
+        record_error(e)
         return False, str(e)
 
+@instrumented
 def check_storage_usage():
     """
     Verifica uso aproximado de armazenamento
@@ -216,6 +256,7 @@ def run_auto_cleanup():
             auto_cleanup_old_processes()
             cleanup_old_decisions()
             enforce_user_limits()
+            purge_expired_cache()
             
             # Marcar como executado nesta sessão
             st.session_state.auto_cleanup_done = True
@@ -0,0 +1,65 @@
+"""
+Serviço de Histórico de Decisões
+Consulta paginada das decisões geradas pelo usuário
+"""
+import streamlit as st
+from config.supabase_config import get_supabase_client
+from components.auth_components import get_current_user
+from services.metrics_service import instrumented, record_error
+
+# Apenas metadados na listagem: o texto da decisão é carregado sob demanda
+HISTORY_FIELDS = "id, created_at, prompt_id, process_id, prompts!inner(title, legal_area, decision_type)"
+
+def decision_history_query(supabase, user_id: str, page: int, page_size: int, prompt_id: str = None,
+                           legal_area: str = None, decision_type: str = None):
+    # Consulta da variante assíncrona (services/async_service.py)
+    query = supabase.table("decisions").select(HISTORY_FIELDS, count="exact").eq("user_id", user_id)
+
+    if prompt_id:
+        query = query.eq("prompt_id", prompt_id)
+    if legal_area:
+        query = query.eq("prompts.legal_area", legal_area)
+    if decision_type:
+        query = query.eq("prompts.decision_type", decision_type)
+
+    start = page * page_size
+    return query.order("created_at", desc=True).range(start, start + page_size - 1)
+
+@instrumented
+def get_decision_history(page: int = 0, page_size: int = 20, prompt_id: str = None,
+                         legal_area: str = None, decision_type: str = None) -> tuple[list, int]:
+    """
+    Retorna uma página do histórico de decisões do usuário (mais recentes primeiro)
+    Usa o índice (user_id, created_at)
+    Returns: (decisões da página, total)
+    """
+    try:
+        # Import tardio: async_service importa este módulo
+        from services.async_service import run_sync, get_decision_history_async
+        return run_sync(get_decision_history_async(get_current_user()["id"], page, page_size,
+                                                   prompt_id, legal_area, decision_type))
+
+    except Exception as e:
+        record_error(e)
+        st.error(f"Erro ao buscar histórico: {e}")
+        return [], 0
+
+@instrumented
+def get_decision_body(decision_id: str):
+    """
+    Retorna o texto completo de uma decisão do usuário
+    """
+    try:
+        user_data = get_current_user()
+        supabase = get_supabase_client()
+
+        result = supabase.table("decisions").select("generated_decision, additional_context, doctrine_jurisprudence").eq("id", decision_id).eq("user_id", user_data["id"]).execute()
+
+        if result.data:
+            return result.data[0]
+        return None
+
+    except Exception as e:
+        record_error(e)
+        st.error(f"Erro ao carregar decisão: {e}")
+        return None
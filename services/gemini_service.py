@@ -3,23 +3,102 @@ Serviço de Integração com Gemini AI
 Geração real de decisões judiciais
 """
 import streamlit as st
-import google.generativeai as genai
 from config.supabase_config import get_supabase_client
 from components.auth_components import get_current_user
 from services.process_service import extract_text_from_pdf
+from services.segmentation_service import segment_process, select_relevant_text
+from services.write_queue_service import enqueue_insert
+from services.metrics_service import instrumented, record_error, track, observe, increment
+import logging
 import os
 import re
+import time
 
+GEMINI_MODEL = "gemini-pro-latest"
+
+# Recorte do processo enviado no prompt (também usado na busca de precedentes)
+PROCESS_EXCERPT_CHARS = 15000
+
+logger = logging.getLogger(__name__)
+
+def _get_genai():
+    """
+    Importa o SDK do Gemini apenas quando uma chamada é feita (import pesado)
+    """
+    import google.generativeai as genai
+    return genai
+
+def _generate_text(model, prompt: str) -> tuple[str, dict]:
+    """
+    Chama o Gemini em modo streaming e retorna o texto completo e o consumo da chamada
+    Registra latência total, tempo até o primeiro trecho e tokens de entrada/saída
+    """
+    with track("gemini.generate_content") as call:
+        started = time.perf_counter()
+        response = model.generate_content(prompt, stream=True)
+        
+        chunks = []
+        for chunk in response:
+            if not chunks:
+                observe("gemini.time_to_first_token", time.perf_counter() - started)
+            chunks.append(chunk.text)
+        
+        text = "".join(chunks)
+        call["bytes"] = len(text)
+    
+    usage = {
+        "model": GEMINI_MODEL,
+        "prompt_tokens": 0,
+        "output_tokens": 0,
+        "cached_tokens": 0,
+        "wall_ms": int((time.perf_counter() - started) * 1000)
+    }
+    metadata = getattr(response, "usage_metadata", None)
+    if metadata:
+        usage["prompt_tokens"] = metadata.prompt_token_count
+        usage["output_tokens"] = metadata.candidates_token_count
+        usage["cached_tokens"] = getattr(metadata, "cached_content_token_count", 0) or 0
+        increment("gemini.tokens_in", usage["prompt_tokens"])
+        increment("gemini.tokens_out", usage["output_tokens"])
+    
+    return text, usage
+
+def record_gemini_usage(operation: str, usage: dict, prompt_id: str = None, decision_id: str = None):
+    """
+    Registra o consumo de uma chamada ao Gemini (gravação em lote pela fila local)
+    operation: "generate" ou "refine"
+    """
+    try:
+        user_data = get_current_user()
+        enqueue_insert("gemini_usage", {
+            "user_id": user_data["id"],
+            "prompt_id": prompt_id,
+            "decision_id": decision_id,
+            "operation": operation,
+            **usage
+        })
+    except Exception:
+        pass  # Contabilização não deve interromper a geração
+
+@instrumented
 def get_user_gemini_key():
     """
     Retorna a chave API Gemini do usuário
+    Buscada uma única vez por sessão (não faz parte do perfil de login)
     """
     try:
-        user_data = get_current_user()
-        return user_data.get('gemini_api_key', '')
+        if 'gemini_api_key' not in st.session_state:
+            user_data = get_current_user()
+            supabase = get_supabase_client()
+            
+            result = supabase.table("users").select("gemini_api_key").eq("id", user_data["id"]).execute()
+            st.session_state.gemini_api_key = (result.data[0].get('gemini_api_key') if result.data else '') or ''
+        
+        return st.session_state.gemini_api_key
     except:
         return ''
 
+@instrumented
 def save_user_gemini_key(api_key: str) -> bool:
     """
     Salva a chave API Gemini do usuário no banco
@@ -32,30 +111,36 @@ def save_user_gemini_key(api_key: str) -> bool:
             "gemini_api_key": api_key
         }).eq("id", user_data["id"]).execute()
         
+        st.session_state.gemini_api_key = api_key
         return True
     except Exception as e:
+        record_error(e)
         st.error(f"Erro ao salvar chave API: {e}")
         return False
 
+@instrumented
 def validate_gemini_key(api_key: str) -> bool:
     """
     Valida se a chave API Gemini está funcionando
     """
     try:
-        temp_genai = genai 
+        temp_genai = _get_genai()
         temp_genai.configure(api_key=api_key)
-        temp_model = temp_genai.GenerativeModel('gemini-pro-latest')
+        temp_model = temp_genai.GenerativeModel(GEMINI_MODEL)
         
         # Teste simples
         response = temp_model.generate_content("Teste")
         return True
     except Exception as e:
+        record_error(e)
         st.error(f"Chave API inválida: {e}")
         return False
 
+@instrumented
 def generate_decision(pdf_file, prompt_data, instrucao_principal, depoimentos="", doutrina=""):
     """
     Gera uma decisão judicial usando Gemini AI
+    O consumo da chamada fica em st.session_state.last_gemini_usage (gravado com a decisão)
     """
     try:
         # Obter chave API do usuário
@@ -64,9 +149,9 @@ def generate_decision(pdf_file, prompt_data, instrucao_principal, depoimentos=""
             return False, "Você precisa configurar sua chave API do Gemini nas Configurações!"
         
         # Configurar Gemini
-        temp_genai = genai 
+        temp_genai = _get_genai()
         temp_genai.configure(api_key=api_key)
-        model = temp_genai.GenerativeModel('gemini-pro-latest')
+        model = temp_genai.GenerativeModel(GEMINI_MODEL)
         
         # Extrair texto do PDF
         with st.spinner("Extraindo texto do processo..."):
@@ -74,25 +159,53 @@ def generate_decision(pdf_file, prompt_data, instrucao_principal, depoimentos=""
             if not processo_text:
                 return False, "Erro ao extrair texto do PDF!"
         
+        # Trechos de decisões anteriores do usuário parecidos com o caso
+        segments = segment_process(processo_text)
+        precedentes = _find_precedents(prompt_data, instrucao_principal, processo_text, segments)
+        
         # Construir prompt completo
         prompt_completo = build_complete_prompt(
-            prompt_data, instrucao_principal, processo_text, depoimentos, doutrina
+            prompt_data, instrucao_principal, processo_text, depoimentos, doutrina,
+            segments=segments, precedentes=precedentes
         )
         
         # Gerar decisão
         with st.spinner("Gerando decisão judicial... Isso pode levar alguns momentos."):
-            response = model.generate_content(prompt_completo)
-            decisao_gerada = response.text
+            decisao_gerada, st.session_state.last_gemini_usage = _generate_text(model, prompt_completo)
         
         return True, decisao_gerada
     
     except Exception as e:
+        record_error(e)
         return False, f"Erro na geração: {str(e)}"
 
-def build_complete_prompt(prompt_data, instrucao_principal, processo_text, depoimentos, doutrina):
+def _find_precedents(prompt_data, instrucao_principal, processo_text, segments) -> list:
+    """
+    Trechos do índice local de precedentes (services/precedent_service.py)
+    Falhas não impedem a geração: o prompt segue sem os trechos
+    """
+    try:
+        from services.precedent_service import retrieve_precedents
+        query = "\n".join([
+            prompt_data['title'],
+            instrucao_principal,
+            select_relevant_text(processo_text, prompt_data['decision_type'], max_chars=PROCESS_EXCERPT_CHARS, segments=segments)
+        ])
+        return retrieve_precedents(query, get_current_user()["id"])
+    except Exception as e:
+        logger.warning("Falha na busca de precedentes: %s", e)
+        return []
+
+@instrumented
+def build_complete_prompt(prompt_data, instrucao_principal, processo_text, depoimentos, doutrina, segments=None, precedentes=None):
     """
     Constrói o prompt completo para envio ao Gemini
+    Do processo são enviadas as peças mais relevantes para o tipo de decisão
+    precedentes: trechos de decisões anteriores (já limitados ao orçamento de tokens)
     """
+    processo_recorte = select_relevant_text(
+        processo_text, prompt_data['decision_type'], max_chars=PROCESS_EXCERPT_CHARS, segments=segments
+    )
     
     prompt_completo = f"""
 SISTEMA ESPECIALISTA EM DECISÕES JUDICIAIS
@@ -113,7 +226,7 @@ Descrição: {prompt_data.get('description', 'Não informado')}
 {instrucao_principal}
 
 === CONTEÚDO DO PROCESSO JUDICIAL ===
-{processo_text[:15000]}  # Limitando para não exceder tokens
+{processo_recorte}
 
 """
 
@@ -131,6 +244,20 @@ Descrição: {prompt_data.get('description', 'Não informado')}
 === DOUTRINA E JURISPRUDÊNCIA ===
 {doutrina[:3000]}
 
+"""
+
+    # Adicionar trechos de decisões anteriores recuperados do índice local
+    if precedentes:
+        from services.precedent_service import SOURCE_LABELS
+        trechos = "\n\n".join(
+            f"[{i}] {SOURCE_LABELS.get(p['source'], p['source'])}:\n{p['text']}"
+            for i, p in enumerate(precedentes, 1)
+        )
+        prompt_completo += f"""
+=== TRECHOS DE DECISÕES ANTERIORES DO GABINETE ===
+Casos semelhantes já decididos; use como referência de fundamentação e estilo, sem copiar fatos:
+{trechos}
+
 """
 
     # Adicionar bloco paradigma se existir
@@ -166,7 +293,8 @@ ELABORE A DECISÃO AGORA:
     
     return prompt_completo
 
-def refine_decision(original_decision, refinement_instruction):
+@instrumented
+def refine_decision(original_decision, refinement_instruction, prompt_id=None, decision_id=None):
     """
     Refina uma decisão já gerada baseada em nova instrução
     """
@@ -175,9 +303,9 @@ def refine_decision(original_decision, refinement_instruction):
         if not api_key:
             return False, "Chave API não configurada!"
         
-        temp_genai = genai 
+        temp_genai = _get_genai()
         temp_genai.configure(api_key=api_key)
-        model = temp_genai.GenerativeModel('gemini-pro-latest')
+        model = temp_genai.GenerativeModel(GEMINI_MODEL)
         
         refinement_prompt = f"""
 Você é um assistente especializado em aprimoramento de decisões judiciais.
@@ -199,43 +327,51 @@ DECISÃO REFINADA:
 """
         
         with st.spinner("Refinando decisão..."):
-            response = model.generate_content(refinement_prompt)
-            decisao_refinada = response.text
+            decisao_refinada, usage = _generate_text(model, refinement_prompt)
+        
+        record_gemini_usage("refine", usage, prompt_id, decision_id)
         
         return True, decisao_refinada
     
     except Exception as e:
+        record_error(e)
         return False, f"Erro no refinamento: {str(e)}"
 
-def save_generated_decision(pdf_filename, prompt_id, generated_text, additional_context="", doctrine=""):
+@instrumented
+def save_generated_decision(process_id, prompt_id, generated_text, additional_context="", doctrine="", usage=None):
     """
-    Salva a decisão gerada no banco de dados
+    Salva a decisão gerada (fila local, enviada ao banco em segundo plano)
+    process_id vem do fluxo de geração (None se o PDF não foi salvo em Meus Processos)
+    usage: consumo da chamada ao Gemini, gravado junto com a decisão
+    Returns: id da decisão (ou None em caso de erro)
     """
     try:
         user_data = get_current_user()
-        supabase = get_supabase_client()
-        
-        # Buscar o processo pelo nome do arquivo
-        process_result = supabase.table("processes").select("id").eq("filename", pdf_filename).eq("user_id", user_data["id"]).execute()
         
-        process_id = None
-        if process_result.data:
-            process_id = process_result.data[0]["id"]
-        
-        # Salvar decisão
-        result = supabase.table("decisions").insert({
+        decision_id = enqueue_insert("decisions", {
             "process_id": process_id,
             "prompt_id": prompt_id,
             "additional_context": additional_context,
             "doctrine_jurisprudence": doctrine,
             "generated_decision": generated_text,
             "user_id": user_data["id"]
-        }).execute()
+        })
         
-        return True
+        # Disponível como precedente nas próximas gerações (indexação em segundo plano)
+        try:
+            from services.precedent_service import index_decision_async
+            index_decision_async(decision_id, user_data["id"], generated_text, doctrine)
+        except Exception as e:
+            logger.warning("Falha ao agendar indexação da decisão: %s", e)
+        
+        if usage:
+            record_gemini_usage("generate", usage, prompt_id, decision_id)
+        
+        return decision_id
     except Exception as e:
+        record_error(e)
         st.error(f"Erro ao salvar decisão: {e}")
-        return False
+        return None
 
 def clean_markdown_for_download(text):
     """
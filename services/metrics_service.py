@@ -0,0 +1,263 @@
+"""
+Serviço de Métricas
+Registro em memória de latência, volume e erros das funções de serviço
+
+Uso:
+    @instrumented                       # mede cada chamada da função
+    def get_user_processes(): ...
+
+    with track("gemini.generate_content") as call:   # mede um trecho
+        response = model.generate_content(prompt)
+        call["bytes"] = len(response.text)
+
+    except Exception as e:
+        record_error(e)                 # erro tratado dentro da função medida
+
+Exportação: export_json() / export_prometheus(); com DECISUM_METRICS_PORT definido,
+um servidor HTTP local expõe /metrics (Prometheus) e /metrics.json
+"""
+import contextvars
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Limites dos buckets do histograma de latência (segundos)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# Amostras recentes por série, para percentis
+SAMPLE_SIZE = 1024
+
+# Chamadas mais lentas da janela recente (buffer circular de todas as chamadas)
+SLOW_CALLS_SIZE = 50
+SLOW_CALLS_WINDOW_SECONDS = float(os.getenv("DECISUM_SLOW_CALLS_WINDOW", "900"))
+RECENT_CALLS_SIZE = 4096
+
+METRICS_PORT = os.getenv("DECISUM_METRICS_PORT")
+
+_lock = threading.Lock()
+_series = {}
+_counters = {}
+_recent_calls = deque(maxlen=RECENT_CALLS_SIZE)
+_current_call = contextvars.ContextVar("current_call", default=None)
+_server = None
+
+def _new_series() -> dict:
+    return {
+        "count": 0,
+        "sum": 0.0,
+        "buckets": [0] * len(LATENCY_BUCKETS),
+        "samples": deque(maxlen=SAMPLE_SIZE),
+        "errors": {},
+        "rows": 0,
+        "bytes": 0
+    }
+
+def _result_size(result, call: dict):
+    """
+    Infere linhas e tamanho a partir do retorno (convenções dos serviços)
+    Um retorno (False, "mensagem") não é erro por si só (validação, senha incorreta):
+    erros são as exceções e as falhas registradas com record_error
+    """
+    if isinstance(result, tuple) and result:
+        result = result[0] if not isinstance(result[0], bool) else result[1] if len(result) > 1 else None
+
+    if isinstance(result, (list, dict)):
+        call.setdefault("rows", len(result))
+    elif isinstance(result, (str, bytes)):
+        call.setdefault("bytes", len(result))
+
+def _record(name: str, elapsed: float, call: dict):
+    with _lock:
+        series = _series.setdefault(name, _new_series())
+        series["count"] += 1
+        series["sum"] += elapsed
+        series["samples"].append(elapsed)
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if elapsed <= bound:
+                series["buckets"][i] += 1
+                break
+        series["rows"] += call.get("rows") or 0
+        series["bytes"] += call.get("bytes") or 0
+        if call["error"]:
+            series["errors"][call["error"]] = series["errors"].get(call["error"], 0) + 1
+
+        _recent_calls.append((time.time(), name, elapsed, call["error"]))
+
+@contextmanager
+def track(name: str):
+    """
+    Mede um trecho de código; o dicionário retornado aceita "rows" e "bytes"
+    """
+    call = {"error": None}
+    token = _current_call.set(call)
+    started = time.perf_counter()
+    try:
+        yield call
+    except Exception as e:
+        # Apenas erros: st.rerun/st.stop (RerunException, StopException) são controle de fluxo
+        call["error"] = type(e).__name__
+        raise
+    finally:
+        _current_call.reset(token)
+        _record(name, time.perf_counter() - started, call)
+
+def instrumented(func):
+    """
+    Decorador: mede cada chamada da função de serviço (nome: modulo.funcao)
+    """
+    name = f"{func.__module__.rsplit('.', 1)[-1]}.{func.__name__}"
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            with track(name) as call:
+                result = await func(*args, **kwargs)
+                _result_size(result, call)
+                return result
+
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with track(name) as call:
+            result = func(*args, **kwargs)
+            _result_size(result, call)
+            return result
+
+    return wrapper
+
+def record_error(error: Exception):
+    """
+    Registra um erro tratado (st.error, retorno de falha) na chamada medida atual
+    """
+    call = _current_call.get()
+    if call is not None:
+        call["error"] = type(error).__name__
+
+def observe(name: str, seconds: float):
+    """
+    Registra uma duração medida fora de track() (ex.: tempo até o primeiro token)
+    """
+    _record(name, seconds, {"error": None})
+
+def increment(counter: str, amount: float = 1):
+    """
+    Incrementa um contador (ex.: acertos de cache, páginas de PDF)
+    """
+    with _lock:
+        _counters[counter] = _counters.get(counter, 0) + amount
+
+def percentile(samples, q: float) -> float:
+    """
+    Percentil (0-100) de uma sequência de amostras
+    """
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+def _slow_calls() -> list[dict]:
+    # Chamada do registro com _lock adquirido
+    since = time.time() - SLOW_CALLS_WINDOW_SECONDS
+    recent = [entry for entry in _recent_calls if entry[0] >= since]
+    recent.sort(key=lambda entry: entry[2], reverse=True)
+    return [
+        {"name": name, "seconds": round(elapsed, 4), "at": at, "error": error}
+        for at, name, elapsed, error in recent[:SLOW_CALLS_SIZE]
+    ]
+
+def export_json() -> dict:
+    """
+    Retrato atual do registro (séries, contadores e chamadas mais lentas da janela recente)
+    """
+    with _lock:
+        series = {
+            name: {
+                "count": data["count"],
+                "sum_seconds": round(data["sum"], 4),
+                "p50": round(percentile(data["samples"], 50), 4),
+                "p95": round(percentile(data["samples"], 95), 4),
+                "p99": round(percentile(data["samples"], 99), 4),
+                "errors": dict(data["errors"]),
+                "rows": data["rows"],
+                "bytes": data["bytes"]
+            }
+            for name, data in _series.items()
+        }
+        return {
+            "series": series,
+            "counters": dict(_counters),
+            "slow_calls": _slow_calls(),
+            "slow_calls_window_seconds": SLOW_CALLS_WINDOW_SECONDS
+        }
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+def export_prometheus() -> str:
+    """
+    Registro no formato texto do Prometheus
+    """
+    lines = ["# TYPE decisum_call_duration_seconds histogram"]
+    with _lock:
+        for name, data in sorted(_series.items()):
+            label = f'function="{_label(name)}"'
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, data["buckets"]):
+                cumulative += count
+                lines.append(f'decisum_call_duration_seconds_bucket{{{label},le="{bound}"}} {cumulative}')
+            lines.append(f'decisum_call_duration_seconds_bucket{{{label},le="+Inf"}} {data["count"]}')
+            lines.append(f"decisum_call_duration_seconds_sum{{{label}}} {data['sum']}")
+            lines.append(f"decisum_call_duration_seconds_count{{{label}}} {data['count']}")
+
+        lines.append("# TYPE decisum_call_errors_total counter")
+        for name, data in sorted(_series.items()):
+            for error, count in sorted(data["errors"].items()):
+                lines.append(f'decisum_call_errors_total{{function="{_label(name)}",error="{_label(error)}"}} {count}')
+
+        for field in ("rows", "bytes"):
+            lines.append(f"# TYPE decisum_call_{field}_total counter")
+            for name, data in sorted(_series.items()):
+                lines.append(f'decisum_call_{field}_total{{function="{_label(name)}"}} {data[field]}')
+
+        lines.append("# TYPE decisum_events_total counter")
+        for counter, value in sorted(_counters.items()):
+            lines.append(f'decisum_events_total{{event="{_label(counter)}"}} {value}')
+
+    return "\n".join(lines) + "\n"
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/metrics":
+            body, content_type = export_prometheus().encode(), "text/plain; version=0.0.4"
+        elif self.path == "/metrics.json":
+            body, content_type = json.dumps(export_json()).encode(), "application/json"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_metrics_server():
+    """
+    Inicia o servidor de métricas em 127.0.0.1:DECISUM_METRICS_PORT (idempotente)
+    """
+    global _server
+    with _lock:
+        if _server is not None or not METRICS_PORT:
+            return
+        _server = ThreadingHTTPServer(("127.0.0.1", int(METRICS_PORT)), _MetricsHandler)
+    threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True).start()
@@ -0,0 +1,147 @@
+"""
+Serviço de OCR
+Reconhecimento local de páginas escaneadas (sem texto extraível)
+"""
+import hashlib
+import multiprocessing
+import os
+import shutil
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from services.cache_service import cache_get, cache_put
+from services.metrics_service import instrumented, track
+
+# Páginas com menos caracteres que isso são tratadas como escaneadas
+OCR_MIN_CHARS = int(os.getenv("DECISUM_OCR_MIN_CHARS", "50"))
+OCR_LANG = os.getenv("DECISUM_OCR_LANG", "por")
+OCR_DPI = int(os.getenv("DECISUM_OCR_DPI", "200"))
+OCR_MAX_WORKERS = int(os.getenv("DECISUM_OCR_WORKERS", "0")) or os.cpu_count() or 1
+
+# Série de métricas do reconhecimento em si (páginas fora do cache)
+OCR_RECOGNITION_SERIES = "ocr_service.recognize"
+
+# PDF carregado uma única vez em cada processo do pool
+_worker_pdf = None
+
+# Processos de OCR em execução no servidor, somando as chamadas simultâneas
+_ocr_slots = threading.BoundedSemaphore(OCR_MAX_WORKERS)
+
+def ocr_available() -> bool:
+    """
+    Verifica se o OCR local pode ser usado (bibliotecas e binário do Tesseract)
+    """
+    try:
+        import pytesseract  # noqa: F401
+        import pypdfium2  # noqa: F401
+    except ImportError:
+        return False
+    return shutil.which("tesseract") is not None
+
+def needs_ocr(page_text: str) -> bool:
+    """
+    Indica se a página tem pouco ou nenhum texto extraível
+    """
+    return len((page_text or "").strip()) < OCR_MIN_CHARS
+
+def page_hash(page) -> str:
+    """
+    Gera hash do conteúdo de uma página do PyPDF2 (fluxo de desenho + imagens)
+    """
+    digest = hashlib.sha256()
+
+    contents = page.get_contents()
+    if contents is not None:
+        digest.update(contents.get_data())
+
+    # Páginas escaneadas diferem essencialmente pelas imagens embutidas
+    resources = page.get("/Resources")
+    xobjects = resources.get_object().get("/XObject") if resources else None
+    if xobjects:
+        xobjects = xobjects.get_object()
+        for name in sorted(xobjects):
+            try:
+                digest.update(xobjects[name].get_object().get_data())
+            except Exception:
+                digest.update(name.encode())
+
+    return digest.hexdigest()
+
+def _cache_key(page_digest: str) -> str:
+    # Idioma e resolução mudam o resultado do OCR
+    return hashlib.sha256(f"{page_digest}:{OCR_LANG}:{OCR_DPI}".encode()).hexdigest()
+
+def _init_worker(pdf_bytes: bytes):
+    global _worker_pdf
+    import pypdfium2 as pdfium
+    _worker_pdf = pdfium.PdfDocument(pdf_bytes)
+
+def _ocr_page(page_index: int) -> tuple[int, str]:
+    import pytesseract
+
+    page = _worker_pdf[page_index]
+    image = page.render(scale=OCR_DPI / 72).to_pil()
+    text = pytesseract.image_to_string(image, lang=OCR_LANG)
+    page.close()
+
+    return page_index, text
+
+@instrumented
+def ocr_pages(pdf_bytes: bytes, page_hashes: dict) -> dict:
+    """
+    Executa OCR nas páginas indicadas ({índice: hash da página})
+    Usa cache por hash e distribui as páginas restantes em um pool de processos
+    (chamadas simultâneas dividem OCR_MAX_WORKERS processos)
+    Returns: {índice: texto reconhecido}
+    """
+    results = {}
+    pending = {}
+
+    for page_index, digest in page_hashes.items():
+        key = _cache_key(digest)
+        cached = cache_get("ocr", key)
+        if cached is not None:
+            results[page_index] = cached
+        else:
+            pending[page_index] = key
+
+    if not pending:
+        return results
+
+    # Só as páginas reconhecidas, sem acertos de cache (páginas/s do OCR no painel)
+    with track(OCR_RECOGNITION_SERIES) as call:
+        call["rows"] = len(pending)
+        _recognize(pdf_bytes, pending, results)
+
+    return results
+
+def _recognize(pdf_bytes: bytes, pending: dict, results: dict):
+    global _worker_pdf
+
+    # Já dentro de um pool de processos (ingest.py): OCR no próprio processo, sem pool aninhado
+    if multiprocessing.parent_process() is not None:
+        _init_worker(pdf_bytes)
+        try:
+            for page_index, text in map(_ocr_page, sorted(pending)):
+                results[page_index] = text
+                cache_put("ocr", pending[page_index], text)
+        finally:
+            _worker_pdf = None
+        return
+
+    workers = _acquire_slots(min(OCR_MAX_WORKERS, len(pending)))
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(pdf_bytes,)) as executor:
+            for page_index, text in executor.map(_ocr_page, sorted(pending)):
+                results[page_index] = text
+                cache_put("ocr", pending[page_index], text)
+    finally:
+        for _ in range(workers):
+            _ocr_slots.release()
+
+def _acquire_slots(wanted: int) -> int:
+    # Aguarda ao menos um processo livre e usa os demais disponíveis, até `wanted`
+    _ocr_slots.acquire()
+    slots = 1
+    while slots < wanted and _ocr_slots.acquire(blocking=False):
+        slots += 1
+    return slots
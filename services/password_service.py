@@ -0,0 +1,96 @@
+"""
+Serviço de Senhas
+Hash com scrypt (biblioteca padrão), custo configurável e verificação em tempo constante
+"""
+import base64
+import hashlib
+import hmac
+import os
+import re
+import secrets
+from concurrent.futures import ThreadPoolExecutor
+
+# Fatores de trabalho do scrypt (N deve ser potência de 2)
+SCRYPT_N = int(os.getenv("DECISUM_SCRYPT_N", str(2 ** 14)))
+SCRYPT_R = int(os.getenv("DECISUM_SCRYPT_R", "8"))
+SCRYPT_P = int(os.getenv("DECISUM_SCRYPT_P", "1"))
+SALT_BYTES = 16
+KEY_BYTES = 32
+
+# Logins simultâneos calculando KDF (limita uso de CPU/memória em picos de acesso)
+KDF_WORKERS = int(os.getenv("DECISUM_KDF_WORKERS", "4"))
+
+# Formato antigo: SHA-256 sem sal, em hexadecimal
+_LEGACY_SHA256 = re.compile(r"^[0-9a-f]{64}$")
+
+_kdf_pool = ThreadPoolExecutor(max_workers=KDF_WORKERS, thread_name_prefix="kdf")
+
+def _b64encode(data: bytes) -> str:
+    return base64.b64encode(data).decode().rstrip("=")
+
+def _b64decode(data: str) -> bytes:
+    return base64.b64decode(data + "=" * (-len(data) % 4))
+
+def _scrypt(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    return hashlib.scrypt(
+        password.encode(), salt=salt, n=n, r=r, p=p,
+        maxmem=256 * n * r, dklen=KEY_BYTES
+    )
+
+def hash_password(password: str, n: int = None, r: int = None, p: int = None) -> str:
+    """
+    Gera hash da senha no formato scrypt$n$r$p$sal$hash
+    """
+    n, r, p = n or SCRYPT_N, r or SCRYPT_R, p or SCRYPT_P
+    salt = secrets.token_bytes(SALT_BYTES)
+    key = _scrypt(password, salt, n, r, p)
+    return f"scrypt${n}${r}${p}${_b64encode(salt)}${_b64encode(key)}"
+
+def is_legacy_hash(hashed: str) -> bool:
+    """
+    Indica se o hash está no formato antigo (SHA-256 sem sal)
+    """
+    return bool(_LEGACY_SHA256.match(hashed or ""))
+
+def verify_password(password: str, hashed: str) -> bool:
+    """
+    Verifica se a senha está correta (aceita também o formato antigo)
+    """
+    if not hashed:
+        return False
+
+    if is_legacy_hash(hashed):
+        candidate = hashlib.sha256(password.encode()).hexdigest()
+        return hmac.compare_digest(candidate, hashed)
+
+    try:
+        scheme, n, r, p, salt, key = hashed.split("$")
+        if scheme != "scrypt":
+            return False
+        expected = _b64decode(key)
+        candidate = _scrypt(password, _b64decode(salt), int(n), int(r), int(p))
+    except (ValueError, TypeError):
+        return False
+
+    return hmac.compare_digest(candidate, expected)
+
+def needs_rehash(hashed: str) -> bool:
+    """
+    Indica se o hash deve ser refeito (formato antigo ou fatores de trabalho diferentes)
+    """
+    if is_legacy_hash(hashed):
+        return True
+    try:
+        scheme, n, r, p, _, _ = hashed.split("$")
+    except ValueError:
+        return True
+    return scheme != "scrypt" or (int(n), int(r), int(p)) != (SCRYPT_N, SCRYPT_R, SCRYPT_P)
+
+def run_kdf(func, *args):
+    """
+    Executa o cálculo do KDF no pool limitado de threads e aguarda o resultado
+    A sessão que chama continua bloqueada durante todo o scrypt (o login depende
+    dele); o pool apenas limita quantos cálculos rodam ao mesmo tempo, e como o
+    scrypt libera o GIL as demais sessões continuam sendo atendidas
+    """
+    return _kdf_pool.submit(func, *args).result()
@@ -0,0 +1,563 @@
+"""
+Serviço de Precedentes
+Índice vetorial local das decisões anteriores do usuário (minuta gerada e doutrina
+informada), usado para incluir no prompt os trechos mais parecidos com o caso atual
+
+- Trechos de ~CHUNK_CHARS caracteres, com vetor denso (hashing de termos com pesos TF-IDF,
+  EMBEDDING_DIMENSIONS dimensões), gravados em uma matriz float32 mapeada em memória
+- Busca aproximada por listas invertidas (IVF): centróides treinados por k-means esférico
+  quando o índice passa de IVF_MIN_ROWS trechos; a consulta compara apenas as listas
+  dos centróides mais próximos (DECISUM_PRECEDENT_PROBES)
+- Inclusão incremental: cada decisão salva é indexada em segundo plano; decisões criadas
+  em outros servidores entram pela sincronização com o banco (sync_user_precedents), também
+  em segundo plano e no máximo a cada DECISUM_PRECEDENT_SYNC_SECONDS por usuário
+- Mesma retenção da tabela decisions (DECISUM_DECISION_RETENTION_HOURS): trechos expirados
+  são descartados a cada inclusão no índice (e pela limpeza), nunca são retornados, e o
+  texto dos trechos descartados é apagado do disco (secure_delete)
+- Cada usuário recupera apenas trechos das próprias decisões
+
+Arquivos em DECISUM_PRECEDENT_DIR: vectors.f32, lists.i32, centroids.npy, df.npy e
+chunks.sqlite3 (texto e metadados de cada linha da matriz)
+"""
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+import numpy as np
+from services.cleanup_service import DECISION_RETENTION_HOURS
+from services.metrics_service import instrumented, track
+from services.recommendation_service import HASH_DIMENSIONS, term_vector, tokenize
+
+PRECEDENT_DIR = os.getenv(
+    "DECISUM_PRECEDENT_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), ".index", "precedents")
+)
+
+# Orçamento dos trechos no prompt (0 desativa a recuperação)
+PRECEDENT_TOKEN_BUDGET = int(os.getenv("DECISUM_PRECEDENT_TOKENS", "1500"))
+CHARS_PER_TOKEN = 4
+
+EMBEDDING_DIMENSIONS = 256
+CHUNK_CHARS = 1200
+MIN_SCORE = 0.12
+MAX_CHUNKS_PER_DECISION = 2
+
+# Radical aproximado: termos truncados (negativação/negativado, indevida/indevidamente)
+STEM_CHARS = 6
+
+IVF_MIN_ROWS = 4096
+IVF_PROBES = int(os.getenv("DECISUM_PRECEDENT_PROBES", "8"))
+IVF_TRAINING_SAMPLE = 16384
+IVF_ITERATIONS = 8
+
+PRECEDENT_SYNC_SECONDS = float(os.getenv("DECISUM_PRECEDENT_SYNC_SECONDS", "300"))
+
+# Buscas refeitas quando uma compactação renumera as linhas durante a consulta
+SEARCH_ATTEMPTS = 3
+
+SOURCE_LABELS = {"decision": "Decisão anterior", "doctrine": "Doutrina/jurisprudência citada"}
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.RLock()
+_state = None
+# Incrementada a cada compactação (números de linha antigos deixam de valer)
+_generation = 0
+# Última sincronização agendada de cada usuário (time.monotonic)
+_last_sync = {}
+# Um único escritor: inclusões em ordem, fora do caminho da requisição
+_index_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="precedent-index")
+
+def _path(name: str) -> str:
+    return os.path.join(PRECEDENT_DIR, name)
+
+def _connect() -> sqlite3.Connection:
+    # Texto das decisões: diretório acessível apenas ao usuário do servidor
+    os.makedirs(PRECEDENT_DIR, mode=0o700, exist_ok=True)
+    conn = sqlite3.connect(_path("chunks.sqlite3"), timeout=30)
+    conn.execute("pragma journal_mode=wal")
+    # Páginas liberadas são zeradas: o texto descartado não fica no arquivo
+    conn.execute("pragma secure_delete=on")
+    conn.execute("""
+        create table if not exists chunks (
+            row integer primary key,
+            decision_id text not null,
+            user_id text not null,
+            source text not null,
+            created_at real not null,
+            text text not null,
+            deleted integer not null default 0
+        )
+    """)
+    conn.execute("create index if not exists chunks_user_idx on chunks (user_id, deleted)")
+    conn.execute("create index if not exists chunks_decision_idx on chunks (decision_id)")
+    conn.execute("create index if not exists chunks_created_idx on chunks (created_at)")
+    conn.execute("create table if not exists meta (key text primary key, value text not null)")
+    return conn
+
+def _get_meta(conn: sqlite3.Connection, key: str, default: str = None) -> str:
+    row = conn.execute("select value from meta where key = ?", (key,)).fetchone()
+    return row[0] if row else default
+
+def _set_meta(conn: sqlite3.Connection, key: str, value):
+    conn.execute("insert or replace into meta (key, value) values (?, ?)", (key, str(value)))
+
+def _open_vectors(rows: int):
+    if not rows:
+        return np.zeros((0, EMBEDDING_DIMENSIONS), dtype=np.float32)
+    return np.memmap(_path("vectors.f32"), dtype=np.float32, mode="r", shape=(rows, EMBEDDING_DIMENSIONS))
+
+def _load_state() -> dict:
+    """
+    Abre o índice em disco; linhas da matriz sem registro no SQLite (interrupção
+    durante uma inclusão) são descartadas
+    """
+    conn = _connect()
+    try:
+        rows = conn.execute("select coalesce(max(row) + 1, 0) from chunks").fetchone()[0]
+        documents = int(_get_meta(conn, "documents", "0"))
+        trained_rows = int(_get_meta(conn, "trained_rows", "0"))
+        chunk_rows = conn.execute("select row, user_id, created_at, deleted from chunks").fetchall()
+    finally:
+        conn.close()
+
+    # Dono, data e situação de cada linha em memória (filtro da busca sem consultar o SQLite)
+    user_codes = {}
+    owners = np.full(rows, -1, dtype=np.int32)
+    created = np.zeros(rows, dtype=np.float64)
+    live = np.zeros(rows, dtype=bool)
+    for row, user_id, created_at, deleted in chunk_rows:
+        owners[row] = user_codes.setdefault(user_id, len(user_codes))
+        created[row] = created_at
+        live[row] = not deleted
+
+    row_bytes = EMBEDDING_DIMENSIONS * 4
+    for name, size in (("vectors.f32", row_bytes), ("lists.i32", 4)):
+        path = _path(name)
+        if not os.path.exists(path):
+            open(path, "wb").close()
+        if os.path.getsize(path) > rows * size:
+            os.truncate(path, rows * size)
+
+    lists = np.fromfile(_path("lists.i32"), dtype=np.int32)
+    if len(lists) < rows:
+        lists = np.concatenate([lists, np.full(rows - len(lists), -1, dtype=np.int32)])
+
+    try:
+        df = np.load(_path("df.npy"))
+    except OSError:
+        df, documents = np.zeros(HASH_DIMENSIONS, dtype=np.int32), 0
+    try:
+        centroids = np.load(_path("centroids.npy")) if trained_rows else None
+    except OSError:
+        centroids, trained_rows = None, 0
+
+    return {
+        "rows": rows,
+        "vectors": _open_vectors(rows),
+        "lists": lists,
+        "centroids": centroids,
+        "trained_rows": trained_rows,
+        "df": df,
+        "documents": documents,
+        "user_codes": user_codes,
+        "owners": owners,
+        "created": created,
+        "live": live
+    }
+
+def _get_state() -> dict:
+    global _state
+    with _lock:
+        if _state is None:
+            _state = _load_state()
+        return _state
+
+def split_chunks(text: str, size: int = CHUNK_CHARS) -> list[str]:
+    """
+    Divide o texto em trechos de até `size` caracteres, respeitando parágrafos
+    """
+    chunks, current = [], ""
+    for paragraph in (p.strip() for p in text.split("\n\n")):
+        if not paragraph:
+            continue
+        while len(paragraph) > size:
+            cut = paragraph.rfind(" ", 0, size)
+            cut = cut if cut > size // 2 else size
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(paragraph[:cut].strip())
+            paragraph = paragraph[cut:].strip()
+        if current and len(current) + len(paragraph) + 2 > size:
+            chunks.append(current)
+            current = ""
+        current = f"{current}\n\n{paragraph}" if current else paragraph
+    if current:
+        chunks.append(current)
+    return chunks
+
+def _terms(text: str) -> tuple[np.ndarray, np.ndarray]:
+    return term_vector([token[:STEM_CHARS] for token in tokenize(text)])
+
+def _embed(state: dict, term_vectors: list) -> np.ndarray:
+    # Projeção por hashing: cada termo soma seu peso TF-IDF, com sinal, em uma dimensão
+    embeddings = np.zeros((len(term_vectors), EMBEDDING_DIMENSIONS), dtype=np.float32)
+    for i, (indices, weights) in enumerate(term_vectors):
+        if not len(indices):
+            continue
+        idf = np.log((1 + state["documents"]) / (1 + state["df"][indices])) + 1
+        signs = 1 - 2 * ((indices // EMBEDDING_DIMENSIONS) % 2)
+        embeddings[i] = np.bincount(indices % EMBEDDING_DIMENSIONS, weights=weights * idf * signs,
+                                    minlength=EMBEDDING_DIMENSIONS)
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    return embeddings / np.maximum(norms, 1e-9)
+
+def _nearest_lists(centroids: np.ndarray, vectors: np.ndarray) -> np.ndarray:
+    return np.argmax(vectors @ centroids.T, axis=1).astype(np.int32)
+
+def _train_ivf(state: dict):
+    """
+    k-means esférico sobre uma amostra dos vetores; reatribui todas as linhas às listas
+    """
+    rows = state["rows"]
+    lists_count = int(min(1024, max(16, math.sqrt(rows))))
+    rng = np.random.default_rng(rows)
+    sample = np.asarray(state["vectors"][np.sort(rng.choice(rows, min(rows, IVF_TRAINING_SAMPLE), replace=False))])
+
+    centroids = sample[rng.choice(len(sample), lists_count, replace=False)].copy()
+    for _ in range(IVF_ITERATIONS):
+        assignment = _nearest_lists(centroids, sample)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, sample)
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        # Lista vazia mantém o centróide anterior
+        centroids = np.where(norms > 0, sums / np.maximum(norms, 1e-9), centroids)
+
+    lists = np.concatenate([
+        _nearest_lists(centroids, np.asarray(state["vectors"][start:start + 8192]))
+        for start in range(0, rows, 8192)
+    ])
+
+    np.save(_path("centroids.npy"), centroids)
+    lists.tofile(_path("lists.i32"))
+    state.update(centroids=centroids, lists=lists, trained_rows=rows)
+
+def _parse_timestamp(value: str) -> float:
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+def _retention_cutoff() -> float:
+    return time.time() - DECISION_RETENTION_HOURS * 3600
+
+@instrumented
+def index_decisions(decisions: list[dict]) -> int:
+    """
+    Inclui decisões no índice (já indexadas ou fora da retenção são ignoradas) e
+    descarta os trechos que expiraram desde a última inclusão
+    decisions: [{id, user_id, created_at, generated_decision, doctrine_jurisprudence}]
+    Returns: quantidade de trechos incluídos
+    """
+    with _lock:
+        cutoff = _retention_cutoff()
+        _mark_deleted("created_at < ?", (cutoff,))
+        state = _get_state()
+        conn = _connect()
+        try:
+            pending = [
+                decision for decision in decisions
+                if not conn.execute("select 1 from chunks where decision_id = ? limit 1", (decision["id"],)).fetchone()
+            ]
+
+            records = []
+            for decision in pending:
+                created_at = decision.get("created_at")
+                created_at = _parse_timestamp(created_at) if isinstance(created_at, str) else created_at or time.time()
+                if created_at < cutoff:
+                    continue
+                for source, field in (("decision", "generated_decision"), ("doctrine", "doctrine_jurisprudence")):
+                    for chunk in split_chunks(decision.get(field) or ""):
+                        records.append((decision["id"], decision["user_id"], source, created_at, chunk))
+            if not records:
+                return 0
+
+            # Frequência de documentos atualizada antes do cálculo dos novos vetores
+            term_vectors = [_terms(record[4]) for record in records]
+            for indices, _ in term_vectors:
+                state["df"][indices] += 1
+            state["documents"] += len(term_vectors)
+            embeddings = _embed(state, term_vectors)
+
+            lists = (_nearest_lists(state["centroids"], embeddings) if state["centroids"] is not None
+                     else np.full(len(embeddings), -1, dtype=np.int32))
+            with open(_path("vectors.f32"), "ab") as f:
+                f.write(embeddings.tobytes())
+            with open(_path("lists.i32"), "ab") as f:
+                f.write(lists.tobytes())
+            np.save(_path("df.npy"), state["df"])
+
+            first_row = state["rows"]
+            with conn:
+                conn.executemany(
+                    "insert into chunks (row, decision_id, user_id, source, created_at, text) values (?, ?, ?, ?, ?, ?)",
+                    [(first_row + i, *record) for i, record in enumerate(records)]
+                )
+                _set_meta(conn, "documents", state["documents"])
+
+            state["rows"] += len(records)
+            state["vectors"] = _open_vectors(state["rows"])
+            state["lists"] = np.concatenate([state["lists"], lists])
+            state["owners"] = np.concatenate([state["owners"], np.array(
+                [state["user_codes"].setdefault(record[1], len(state["user_codes"])) for record in records], dtype=np.int32
+            )])
+            state["created"] = np.concatenate([state["created"], np.array([record[3] for record in records], dtype=np.float64)])
+            state["live"] = np.concatenate([state["live"], np.ones(len(records), dtype=bool)])
+
+            if state["rows"] >= IVF_MIN_ROWS and state["rows"] >= 2 * state["trained_rows"]:
+                _train_ivf(state)
+                with conn:
+                    _set_meta(conn, "trained_rows", state["trained_rows"])
+
+            return len(records)
+        finally:
+            conn.close()
+
+def index_decision_async(decision_id: str, user_id: str, generated_text: str, doctrine: str = ""):
+    """
+    Agenda a inclusão de uma decisão recém-salva (não bloqueia a interface)
+    """
+    def run():
+        try:
+            index_decisions([{
+                "id": decision_id,
+                "user_id": user_id,
+                "generated_decision": generated_text,
+                "doctrine_jurisprudence": doctrine
+            }])
+        except Exception as e:
+            logger.warning("Falha ao indexar a decisão %s: %s", decision_id, e)
+
+    _index_pool.submit(run)
+
+@instrumented
+def sync_user_precedents(user_id: str) -> int:
+    """
+    Inclui as decisões do usuário gravadas no banco depois da última sincronização
+    (dentro da retenção), como as criadas em outros servidores
+    Returns: quantidade de trechos incluídos
+    """
+    from config.supabase_config import get_supabase_client
+
+    conn = _connect()
+    try:
+        watermark = _get_meta(conn, f"synced:{user_id}")
+    finally:
+        conn.close()
+
+    cutoff = datetime.fromtimestamp(_retention_cutoff(), timezone.utc).isoformat()
+    supabase = get_supabase_client()
+    query = supabase.table("decisions").select(
+        "id, user_id, created_at, generated_decision, doctrine_jurisprudence"
+    ).eq("user_id", user_id).gte("created_at", cutoff)
+    if watermark:
+        query = query.gt("created_at", watermark)
+    result = query.order("created_at").execute()
+
+    # Mesmo sem decisões novas: a inclusão descarta os trechos expirados
+    added = index_decisions(result.data)
+    if result.data:
+        conn = _connect()
+        try:
+            with conn:
+                _set_meta(conn, f"synced:{user_id}", result.data[-1]["created_at"])
+        finally:
+            conn.close()
+    return added
+
+def sync_user_precedents_async(user_id: str):
+    """
+    Agenda a sincronização do usuário no escritor do índice, no máximo uma vez a cada
+    PRECEDENT_SYNC_SECONDS (não bloqueia a geração)
+    """
+    now = time.monotonic()
+    with _lock:
+        if user_id in _last_sync and now - _last_sync[user_id] < PRECEDENT_SYNC_SECONDS:
+            return
+        _last_sync[user_id] = now
+
+    def run():
+        try:
+            sync_user_precedents(user_id)
+        except Exception as e:
+            logger.warning("Falha ao sincronizar os precedentes do usuário %s: %s", user_id, e)
+
+    _index_pool.submit(run)
+
+@instrumented
+def search_precedents(query_text: str, user_id: str, k: int = 8) -> list[dict]:
+    """
+    Trechos das decisões do usuário mais parecidos com o texto (cosseno)
+    Returns: [{text, score, decision_id, source}] em ordem decrescente
+    """
+    for _ in range(SEARCH_ATTEMPTS):
+        generation, results = _search(query_text, user_id, k)
+        with _lock:
+            if generation == _generation:
+                break
+    # Esgotadas as tentativas, os trechos ainda são do próprio usuário (filtro na consulta)
+    return results
+
+def _search(query_text: str, user_id: str, k: int) -> tuple[int, list[dict]]:
+    with _lock:
+        generation = _generation
+        state = _get_state()
+        if user_id not in state["user_codes"]:
+            return generation, []
+        vectors, lists, centroids = state["vectors"], state["lists"], state["centroids"]
+        query = _embed(state, [_terms(query_text)])[0]
+        allowed = np.flatnonzero(
+            (state["owners"] == state["user_codes"][user_id]) & state["live"] & (state["created"] >= _retention_cutoff())
+        )
+
+    if not len(allowed) or not query.any():
+        return generation, []
+
+    candidates = allowed
+    if centroids is not None and len(allowed) > IVF_MIN_ROWS:
+        with track("precedents.ivf_probe"):
+            probes = np.argsort(centroids @ query)[-IVF_PROBES:]
+            probed = allowed[np.isin(lists[allowed], probes)]
+        # Poucos candidatos nas listas visitadas: busca exata nas linhas do usuário
+        if len(probed) >= 4 * k:
+            candidates = probed
+
+    scores = np.asarray(vectors[candidates]) @ query
+    top = np.argsort(scores)[::-1][:4 * k]
+    best = [(int(candidates[i]), float(scores[i])) for i in top if scores[i] >= MIN_SCORE]
+    if not best:
+        return generation, []
+
+    conn = _connect()
+    try:
+        found = {
+            row: (decision_id, source, text)
+            for row, decision_id, source, text in conn.execute(
+                f"select row, decision_id, source, text from chunks where row in ({','.join('?' * len(best))}) "
+                "and user_id = ? and deleted = 0",
+                [row for row, _ in best] + [user_id]
+            )
+        }
+    finally:
+        conn.close()
+
+    results, per_decision = [], {}
+    for row, score in best:
+        if row not in found:
+            continue
+        decision_id, source, text = found[row]
+        if per_decision.get(decision_id, 0) >= MAX_CHUNKS_PER_DECISION:
+            continue
+        per_decision[decision_id] = per_decision.get(decision_id, 0) + 1
+        results.append({"text": text, "score": round(score, 4), "decision_id": decision_id, "source": source})
+        if len(results) == k:
+            break
+    return generation, results
+
+def retrieve_precedents(query_text: str, user_id: str, max_tokens: int = None) -> list[dict]:
+    """
+    Trechos para o prompt, dentro do orçamento de tokens (DECISUM_PRECEDENT_TOKENS)
+    Decisões gravadas por outros servidores entram pela sincronização em segundo plano
+    (disponíveis a partir da geração seguinte)
+    """
+    max_chars = (PRECEDENT_TOKEN_BUDGET if max_tokens is None else max_tokens) * CHARS_PER_TOKEN
+    if max_chars <= 0:
+        return []
+
+    sync_user_precedents_async(user_id)
+
+    selected, used = [], 0
+    for passage in search_precedents(query_text, user_id):
+        if used + len(passage["text"]) > max_chars:
+            continue
+        selected.append(passage)
+        used += len(passage["text"])
+    return selected
+
+def _mark_deleted(where: str, params: tuple) -> int:
+    global _state, _generation
+    with _lock:
+        conn = _connect()
+        try:
+            with conn:
+                # O texto é apagado já na marcação (a compactação só remove as linhas depois)
+                removed = conn.execute(f"update chunks set deleted = 1, text = '' where deleted = 0 and {where}", params).rowcount
+                if where == "1 = 1":
+                    conn.execute("delete from meta where key like 'synced:%'")
+            total, deleted = conn.execute("select count(*), coalesce(sum(deleted), 0) from chunks").fetchone()
+        finally:
+            conn.close()
+
+        # Maioria das linhas removida: recria os arquivos apenas com as restantes
+        compacted = bool(total and deleted * 2 >= total)
+        if compacted:
+            _compact()
+            _generation += 1
+        # Recarrega a situação das linhas na próxima busca (apenas se algo mudou)
+        if removed or compacted:
+            _state = None
+        if where == "1 = 1":
+            _last_sync.clear()
+        return removed
+
+def _compact():
+    state = _get_state()
+    conn = _connect()
+    try:
+        live = [row for (row,) in conn.execute("select row from chunks where deleted = 0 order by row")]
+        vectors = np.asarray(state["vectors"][live]) if live else np.zeros((0, EMBEDDING_DIMENSIONS), dtype=np.float32)
+        lists = state["lists"][live] if live else np.zeros(0, dtype=np.int32)
+
+        with conn:
+            conn.execute("delete from chunks where deleted = 1")
+            for new_row, old_row in enumerate(live):
+                if new_row != old_row:
+                    conn.execute("update chunks set row = ? where row = ?", (new_row, old_row))
+            _set_meta(conn, "trained_rows", len(live) if live and state["centroids"] is not None else 0)
+            if not live:
+                _set_meta(conn, "documents", 0)
+    finally:
+        conn.close()
+
+    if not live:
+        # Índice vazio: recomeça também as frequências de documentos
+        for name in ("df.npy", "centroids.npy"):
+            if os.path.exists(_path(name)):
+                os.remove(_path(name))
+
+    # Arquivos novos ao lado e substituição atômica (o mapeamento antigo continua válido até ser liberado)
+    vectors.tofile(_path("vectors.f32.tmp"))
+    lists.tofile(_path("lists.i32.tmp"))
+    os.replace(_path("vectors.f32.tmp"), _path("vectors.f32"))
+    os.replace(_path("lists.i32.tmp"), _path("lists.i32"))
+
+def prune_precedents() -> int:
+    """
+    Descarta trechos de decisões fora da retenção
+    Returns: quantidade de trechos removidos
+    """
+    return _mark_deleted("created_at < ?", (_retention_cutoff(),))
+
+def remove_user_precedents(user_id: str) -> int:
+    """
+    Descarta todos os trechos do usuário (limpeza manual dos dados)
+    """
+    return _mark_deleted("user_id = ?", (user_id,))
+
+def clear_precedents() -> int:
+    """
+    Descarta todos os trechos (limpeza completa do sistema)
+    """
+    return _mark_deleted("1 = 1", ())
@@ -1,66 +1,305 @@
 """
 Serviço de Processamento de PDFs
 """
-import PyPDF2
+import codecs
+import hashlib
 import io
+import os
 import streamlit as st
+from concurrent.futures import ThreadPoolExecutor
 from config.supabase_config import get_supabase_client
 from components.auth_components import get_current_user
+from services.ocr_service import ocr_available, needs_ocr, page_hash, ocr_pages
+from services.text_service import normalize_pages
+from services.segmentation_service import segment_process
+from services.cache_service import cache_get, cache_put, cache_get_json, cache_put_json
+from services.write_queue_service import enqueue_insert
+from services.metrics_service import instrumented, record_error, track
+
+# Codificações tentadas para depoimentos em .txt (exportações dos tribunais usam CP1252)
+TEXT_ENCODINGS = ("utf-8", "cp1252", "latin-1")
+
+# Depoimentos em PDF extraídos ao mesmo tempo (o OCR limita à parte os seus processos)
+DEPOSITION_WORKERS = int(os.getenv("DECISUM_DEPOSITION_WORKERS", "4"))
+
+# Série de métricas da leitura da camada de texto do PDF (sem OCR)
+TEXT_EXTRACTION_SERIES = "process_service.extract_text_layer"
+
+def file_fingerprint(data: bytes) -> str:
+    """
+    Hash do conteúdo de um arquivo (chave de cache e deduplicação)
+    """
+    return hashlib.sha256(data).hexdigest()
+
+def read_file_bytes(uploaded_file) -> bytes:
+    """
+    Lê o conteúdo completo de um arquivo enviado, independente da posição atual
+    """
+    if hasattr(uploaded_file, "seek"):
+        uploaded_file.seek(0)
+    return uploaded_file.read()
+
+def decode_text_file(data: bytes) -> str:
+    """
+    Decodifica um .txt tentando UTF-8 (com ou sem BOM) e depois CP1252/Latin-1
+    """
+    if data.startswith(codecs.BOM_UTF8):
+        return data[len(codecs.BOM_UTF8):].decode("utf-8", errors="replace")
+    if data.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return data.decode("utf-16", errors="replace")
+    
+    for encoding in TEXT_ENCODINGS:
+        try:
+            return data.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+    
+    return data.decode("utf-8", errors="replace")
+
+@instrumented
+def extract_pages_from_pdf(pdf_file) -> list[str]:
+    """
+    Extrai o texto de cada página de um arquivo PDF
+    Páginas escaneadas (sem texto) passam por OCR local, quando disponível
+    """
+    import PyPDF2  # Import tardio: só as páginas de upload/geração precisam
+    
+    # Ler o arquivo PDF
+    pdf_bytes = pdf_file.read()
+    
+    # Só a camada de texto, sem o OCR abaixo (páginas/s da extração no painel)
+    with track(TEXT_EXTRACTION_SERIES) as call:
+        pdf_reader = PyPDF2.PdfReader(io.BytesIO(pdf_bytes))
+        pages_text = [page.extract_text() or "" for page in pdf_reader.pages]
+        call["rows"] = len(pages_text)
+    
+    # Enviar ao OCR apenas as páginas sem texto extraível
+    scanned_pages = [i for i, page_text in enumerate(pages_text) if needs_ocr(page_text)]
+    if scanned_pages and ocr_available():
+        page_hashes = {i: page_hash(pdf_reader.pages[i]) for i in scanned_pages}
+        for i, ocr_text in ocr_pages(pdf_bytes, page_hashes).items():
+            if ocr_text.strip():
+                pages_text[i] = ocr_text
+    
+    return pages_text
+
+@instrumented
+def extract_pdf_bytes(pdf_bytes: bytes) -> tuple[str, dict]:
+    """
+    Extrai e normaliza o texto de um PDF em memória, com cache por hash do arquivo
+    Lança exceção em caso de erro (pode rodar fora da thread do Streamlit)
+    """
+    key = file_fingerprint(pdf_bytes)
+    cached = cache_get_json("pdf_text", key)
+    if cached is not None:
+        return cached["text"], cached["stats"]
+    
+    pages_text = extract_pages_from_pdf(io.BytesIO(pdf_bytes))
+    text, stats = normalize_pages(pages_text)
+    stats["pages"] = len(pages_text)
+    
+    if text:
+        cache_put_json("pdf_text", key, {"text": text, "stats": stats})
+    
+    return text, stats
+
+@instrumented
+def extract_text_with_stats(pdf_file) -> tuple[str, dict]:
+    """
+    Extrai e normaliza o texto de um PDF (remove cabeçalhos/rodapés repetidos)
+    Returns: (texto, estatísticas da normalização)
+    """
+    try:
+        return extract_pdf_bytes(read_file_bytes(pdf_file))
+    
+    except Exception as e:
+        record_error(e)
+        st.error(f"Erro ao processar PDF: {e}")
+        return "", {}
 
 def extract_text_from_pdf(pdf_file) -> str:
     """
     Extrai texto de um arquivo PDF
     """
+    text, _ = extract_text_with_stats(pdf_file)
+    return text
+
+@instrumented
+def extract_depositions(files) -> tuple[str, list[str]]:
+    """
+    Extrai vários arquivos de depoimentos (.pdf/.txt) em paralelo
+    PDFs são extraídos em threads deste processo (cache e métricas preservados); páginas
+    escaneadas seguem para o pool de OCR, limitado a OCR_MAX_WORKERS processos no total
+    Returns: (texto combinado na ordem dos arquivos, lista de erros)
+    """
+    contents = {}
+    errors = []
+    pending_pdfs = {}
+    
+    for index, file in enumerate(files):
+        data = read_file_bytes(file)
+        if file.name.lower().endswith(".pdf") or file.type == "application/pdf":
+            pending_pdfs[index] = data
+        else:
+            contents[index] = decode_text_file(data)
+    
+    if pending_pdfs:
+        workers = min(len(pending_pdfs), DEPOSITION_WORKERS)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="depositions") as executor:
+            futures = {index: executor.submit(extract_pdf_bytes, data) for index, data in pending_pdfs.items()}
+            for index, future in futures.items():
+                try:
+                    contents[index], _ = future.result()
+                except Exception as e:
+                    errors.append(f"Erro ao processar {files[index].name}: {e}")
+    
+    combined = [
+        f"**{files[index].name}:**\n{contents[index]}"
+        for index in sorted(contents) if contents[index].strip()
+    ]
+    
+    return "\n\n".join(combined), errors
+
+def _depositions_key(case_key: str) -> str:
+    # O mesmo PDF enviado por outro usuário não recupera estes depoimentos
+    return hashlib.sha256(f"{get_current_user()['id']}:{case_key}".encode()).hexdigest()
+
+def save_case_depositions(case_key: str, depositions: str):
+    """
+    Guarda os depoimentos processados associados ao processo (hash do PDF principal)
+    e ao usuário atual
+    """
+    cache_put("depoimentos", _depositions_key(case_key), depositions)
+
+def load_case_depositions(case_key: str) -> str:
+    """
+    Recupera depoimentos já processados pelo usuário atual para o processo, se houver
+    """
+    return cache_get("depoimentos", _depositions_key(case_key)) or ""
+
+def build_process_record(filename: str, txt_content: str, user_id: str, content_hash: str = None,
+                         ingested: bool = False) -> dict:
+    """
+    Monta o registro de um processo para inserção na tabela processes
+    ingested: importado em lote (fora da limpeza automática e do limite por usuário)
+    """
+    return {
+        "filename": filename,
+        "txt_content": txt_content,
+        "segments": segment_process(txt_content),
+        "content_hash": content_hash,
+        "user_id": user_id,
+        "ingested": ingested
+    }
+
+@instrumented
+def save_process_to_db(filename: str, txt_content: str, content_hash: str = None):
+    """
+    Salva o processo (com os offsets das peças processuais) pela fila local;
+    o envio ao banco acontece em segundo plano
+    Returns: id do processo (ou None em caso de erro)
+    """
     try:
-        # Ler o arquivo PDF
-        pdf_reader = PyPDF2.PdfReader(io.BytesIO(pdf_file.read()))
+        user_data = get_current_user()
         
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text() + "\n"
+        process_id = enqueue_insert(
+            "processes", build_process_record(filename, txt_content, user_data["id"], content_hash)
+        )
+        if content_hash:
+            remember_process_id(content_hash, process_id)
         
-        return text.strip()
+        return process_id
     
     except Exception as e:
-        st.error(f"Erro ao processar PDF: {e}")
-        return ""
+        record_error(e)
+        st.error(f"Erro ao salvar processo: {e}")
+        return None
+
+def remember_process_id(content_hash: str, process_id: str):
+    """
+    Guarda na sessão o id do processo correspondente ao conteúdo do arquivo
+    """
+    if 'process_ids' not in st.session_state:
+        st.session_state.process_ids = {}
+    st.session_state.process_ids[content_hash] = process_id
 
-def save_process_to_db(filename: str, txt_content: str) -> bool:
+@instrumented
+def resolve_process_id(content_hash: str):
     """
-    Salva o processo no banco de dados
+    Retorna o id do processo do usuário com este conteúdo (ou None)
+    Consulta o banco (índice user_id, content_hash) apenas uma vez por arquivo na sessão
     """
+    process_ids = st.session_state.setdefault('process_ids', {})
+    if content_hash in process_ids:
+        return process_ids[content_hash]
+    
     try:
         user_data = get_current_user()
         supabase = get_supabase_client()
         
-        result = supabase.table("processes").insert({
-            "filename": filename,
-            "txt_content": txt_content,
-            "user_id": user_data["id"]
-        }).execute()
+        result = supabase.table("processes").select("id").eq("user_id", user_data["id"]).eq("content_hash", content_hash).order("created_at", desc=True).limit(1).execute()
         
-        return True
+        process_id = result.data[0]["id"] if result.data else None
     
     except Exception as e:
-        st.error(f"Erro ao salvar processo: {e}")
-        return False
+        record_error(e)
+        st.error(f"Erro ao buscar processo: {e}")
+        return None
+    
+    process_ids[content_hash] = process_id
+    return process_id
 
+@instrumented
+def get_existing_content_hashes(user_id: str, content_hashes: list[str], chunk_size: int = 200) -> set:
+    """
+    Retorna quais hashes de conteúdo já existem nos processos do usuário
+    Lança exceção em caso de erro (uso em lote, fora da interface)
+    """
+    supabase = get_supabase_client()
+    existing = set()
+    
+    for i in range(0, len(content_hashes), chunk_size):
+        chunk = content_hashes[i:i + chunk_size]
+        result = supabase.table("processes").select("content_hash").eq("user_id", user_id).in_("content_hash", chunk).execute()
+        existing.update(row["content_hash"] for row in result.data)
+    
+    return existing
+
+@instrumented
+def save_processes_batch(records: list[dict]) -> list[dict]:
+    """
+    Insere vários processos em uma única requisição
+    Lança exceção em caso de erro (uso em lote, fora da interface)
+    Returns: registros inseridos (com id)
+    """
+    if not records:
+        return []
+    
+    supabase = get_supabase_client()
+    result = supabase.table("processes").insert(records).execute()
+    
+    return result.data
+
+def user_processes_query(supabase, user_id: str):
+    # Consulta da variante assíncrona (services/async_service.py)
+    return supabase.table("processes").select("*").eq("user_id", user_id).order("created_at", desc=True)
+
+@instrumented
 def get_user_processes():
     """
     Retorna todos os processos do usuário atual
     """
     try:
-        user_data = get_current_user()
-        supabase = get_supabase_client()
-        
-        result = supabase.table("processes").select("*").eq("user_id", user_data["id"]).order("created_at", desc=True).execute()
-        
-        return result.data
+        # Import tardio: async_service importa este módulo
+        from services.async_service import run_sync, get_user_processes_async
+        return run_sync(get_user_processes_async(get_current_user()["id"]))
     
     except Exception as e:
+        record_error(e)
         st.error(f"Erro ao buscar processos: {e}")
         return []
 
+@instrumented
 def get_process_by_id(process_id: str):
     """
     Retorna um processo específico pelo ID
@@ -75,9 +314,11 @@ def get_process_by_id(process_id: str):
         return None
     
     except Exception as e:
+        record_error(e)
         st.error(f"Erro ao buscar processo: {e}")
         return None
 
+@instrumented
 def delete_process(process_id: str) -> bool:
     """
     Deleta um processo
@@ -92,9 +333,11 @@ def delete_process(process_id: str) -> bool:
         return True
     
     except Exception as e:
+        record_error(e)
         st.error(f"Erro ao deletar processo: {e}")
         return False
 
+@instrumented
 def search_processes(query: str):
     """
     Busca processos por nome ou conteúdo
@@ -109,5 +352,6 @@ def search_processes(query: str):
         return result.data
     
     except Exception as e:
+        record_error(e)
         st.error(f"Erro na busca: {e}")
         return []
\ No newline at end of file
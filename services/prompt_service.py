@@ -2,10 +2,24 @@
 Serviço de Prompts - Versão 2
 Gerenciamento de prompts colaborativos
 """
+import logging
+import time
 import streamlit as st
 from config.supabase_config import get_supabase_client
 from components.auth_components import get_current_user
+from services.metrics_service import instrumented, record_error
+from services.query_executor import submit
 
+# Pré-carregamento dos prompts da área enquanto o usuário escolhe o tipo de ato
+PREFETCH_TTL_SECONDS = 300
+PREFETCH_WAIT_SECONDS = 10
+
+# Versão do catálogo neste servidor: alterar um prompt invalida o pré-carregamento de todas as sessões
+_prompts_version = 0
+
+logger = logging.getLogger(__name__)
+
+@instrumented
 def get_prompts_by_area_and_type(legal_area: str, decision_type: str):
     """
     Busca prompts por área jurídica e tipo de decisão
@@ -17,9 +31,75 @@ def get_prompts_by_area_and_type(legal_area: str, decision_type: str):
         
         return result.data
     except Exception as e:
+        record_error(e)
         st.error(f"Erro ao buscar prompts: {e}")
         return []
 
+def group_by_decision_type(prompts: list) -> dict:
+    """
+    Agrupa prompts por tipo de decisão
+    """
+    by_type = {}
+    for prompt in prompts:
+        by_type.setdefault(prompt["decision_type"], []).append(prompt)
+    return by_type
+
+def prefetch_area_prompts(legal_area: str):
+    """
+    Inicia em segundo plano a busca dos prompts da área (se não houver uma recente
+    e da versão atual do catálogo)
+    """
+    prefetched = st.session_state.setdefault('area_prompts', {})
+    entry = prefetched.get(legal_area)
+    if (entry and entry["version"] == _prompts_version
+            and time.time() - entry["started_at"] < PREFETCH_TTL_SECONDS):
+        return
+    
+    # Import tardio: async_service importa este módulo
+    from services.async_service import get_prompts_by_area_async
+    
+    prefetched[legal_area] = {
+        "future": submit(get_prompts_by_area_async, legal_area),
+        "started_at": time.time(),
+        "version": _prompts_version
+    }
+
+@instrumented
+def get_area_prompts_by_type(legal_area: str, decision_type: str):
+    """
+    Prompts da área/tipo a partir do pré-carregamento da área
+    Em caso de falha no pré-carregamento, consulta diretamente
+    """
+    prefetch_area_prompts(legal_area)
+    
+    try:
+        by_type = st.session_state.area_prompts[legal_area]["future"].result(timeout=PREFETCH_WAIT_SECONDS)
+        return by_type.get(decision_type, [])
+    except Exception:
+        st.session_state.area_prompts.pop(legal_area, None)
+        return get_prompts_by_area_and_type(legal_area, decision_type)
+
+def _update_recommendation_index(prompts: list = (), removed_id: str = None):
+    # Índice local de recomendação (services/recommendation_service.py): uma falha aqui
+    # não desfaz a gravação; o índice é reconstruído do banco na próxima expiração
+    try:
+        from services.recommendation_service import index_prompt, remove_prompt_from_index
+        for prompt in prompts:
+            index_prompt(prompt)
+        if removed_id:
+            remove_prompt_from_index(removed_id)
+    except Exception as e:
+        logger.warning("Falha ao atualizar o índice de recomendação de prompts: %s", e)
+
+def invalidate_prefetched_prompts():
+    """
+    Descarta os prompts pré-carregados de todas as sessões (após criar, editar ou excluir
+    um prompt); outros servidores se atualizam pela validade (PREFETCH_TTL_SECONDS)
+    """
+    global _prompts_version
+    _prompts_version += 1
+
+@instrumented
 def get_all_prompts():
     """
     Retorna todos os prompts públicos
@@ -31,9 +111,37 @@ def get_all_prompts():
         
         return result.data
     except Exception as e:
+        record_error(e)
+        st.error(f"Erro ao buscar prompts: {e}")
+        return []
+
+@instrumented
+def get_prompt_titles(legal_area: str = None, decision_type: str = None):
+    """
+    Retorna apenas id e título dos prompts públicos e dos prompts do usuário atual
+    (para filtros e seletores), ordenados por título
+    """
+    try:
+        user_data = get_current_user()
+        supabase = get_supabase_client()
+        
+        prompts = {}
+        for column, value in (("is_public", True), ("created_by", user_data["id"])):
+            query = supabase.table("prompts").select("id, title").eq(column, value)
+            if legal_area:
+                query = query.eq("legal_area", legal_area)
+            if decision_type:
+                query = query.eq("decision_type", decision_type)
+            
+            prompts.update((prompt["id"], prompt) for prompt in query.execute().data)
+        
+        return sorted(prompts.values(), key=lambda prompt: prompt["title"])
+    except Exception as e:
+        record_error(e)
         st.error(f"Erro ao buscar prompts: {e}")
         return []
 
+@instrumented
 def create_prompt(title: str, legal_area: str, decision_type: str, description: str, instruction: str, paradigm_block: str = ""):
     """
     Cria um novo prompt
@@ -53,11 +161,15 @@ def create_prompt(title: str, legal_area: str, decision_type: str, description:
             "is_public": True
         }).execute()
         
+        invalidate_prefetched_prompts()
+        _update_recommendation_index(result.data)
         return True, "Prompt criado com sucesso!"
     
     except Exception as e:
+        record_error(e)
         return False, f"Erro ao criar prompt: {e}"
 
+@instrumented
 def get_user_prompts():
     """
     Retorna prompts criados pelo usuário atual
@@ -70,9 +182,11 @@ def get_user_prompts():
         
         return result.data
     except Exception as e:
+        record_error(e)
         st.error(f"Erro ao buscar seus prompts: {e}")
         return []
 
+@instrumented
 def delete_prompt(prompt_id: str):
     """
     Deleta um prompt (apenas o criador ou admin)
@@ -87,11 +201,16 @@ def delete_prompt(prompt_id: str):
         else:
             result = supabase.table("prompts").delete().eq("id", prompt_id).eq("created_by", user_data["id"]).execute()
         
+        invalidate_prefetched_prompts()
+        if result.data:
+            _update_recommendation_index(removed_id=prompt_id)
         return True, "Prompt deletado com sucesso!"
     
     except Exception as e:
+        record_error(e)
         return False, f"Erro ao deletar prompt: {e}"
 
+@instrumented
 def update_prompt(prompt_id: str, title: str, description: str, instruction: str, paradigm_block: str):
     """
     Atualiza um prompt existente
@@ -116,9 +235,12 @@ def update_prompt(prompt_id: str, title: str, description: str, instruction: str
                 "paradigm_block": paradigm_block
             }).eq("id", prompt_id).eq("created_by", user_data["id"]).execute()
         
+        invalidate_prefetched_prompts()
+        _update_recommendation_index(result.data)
         return True, "Prompt atualizado com sucesso!"
     
     except Exception as e:
+        record_error(e)
         return False, f"Erro ao atualizar prompt: {e}"
 
 # Mapeamento das áreas jurídicas
@@ -0,0 +1,141 @@
+"""
+Execução Concorrente de Consultas
+Dispara leituras independentes em paralelo e reúne os resultados, com tempo limite:
+uma tabela lenta não trava a página (o resultado dela vira o valor de fallback)
+
+Funções síncronas executam no pool de threads; funções assíncronas (async def), no laço de
+eventos dos serviços (get_event_loop), onde a consulta além do tempo é de fato cancelada
+
+Consultas além do tempo ainda na fila são canceladas; as que já estão rodando não podem
+ser interrompidas e seguem ocupando uma thread até terminar. O pool tem
+QUERY_STALL_HEADROOM threads além de QUERY_WORKERS para absorvê-las, e a contagem é
+feita por sessão: uma sessão com QUERY_MAX_STALLED consultas travadas recebe o fallback
+na hora, sem afetar as demais; só quando a folga inteira está ocupada todas recebem
+"""
+import asyncio
+import contextvars
+import functools
+import inspect
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from services.metrics_service import increment
+
+QUERY_TIMEOUT_SECONDS = float(os.getenv("DECISUM_QUERY_TIMEOUT", "5"))
+QUERY_WORKERS = int(os.getenv("DECISUM_QUERY_WORKERS", "8"))
+QUERY_STALL_HEADROOM = int(os.getenv("DECISUM_QUERY_STALL_HEADROOM", "0")) or QUERY_WORKERS
+# Por sessão
+QUERY_MAX_STALLED = int(os.getenv("DECISUM_QUERY_MAX_STALLED", "0")) or max(1, QUERY_STALL_HEADROOM // 4)
+
+_pool = ThreadPoolExecutor(max_workers=QUERY_WORKERS + QUERY_STALL_HEADROOM, thread_name_prefix="query")
+
+# Consultas que passaram do tempo e ainda ocupam uma thread do pool, por sessão
+_stalled = {}
+_stalled_lock = threading.Lock()
+
+_loop = None
+_loop_lock = threading.Lock()
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """
+    Laço de eventos compartilhado pelas corrotinas dos serviços, em uma thread de fundo
+    (o cliente PostgREST assíncrono e seu pool de conexões ficam vinculados a ele)
+    """
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="async-services", daemon=True).start()
+    return _loop
+
+def _get_script_ctx():
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        return get_script_run_ctx()
+    except ImportError:
+        return None
+
+def _set_script_ctx(ctx):
+    # Contexto da sessão do Streamlit na thread (st.session_state, st.error...)
+    try:
+        from streamlit.runtime.scriptrunner.script_run_context import SCRIPT_RUN_CONTEXT_ATTR_NAME
+        setattr(threading.current_thread(), SCRIPT_RUN_CONTEXT_ATTR_NAME, ctx)
+    except ImportError:
+        pass
+
+def _run_task(context: contextvars.Context, script_ctx, func):
+    _set_script_ctx(script_ctx)
+    try:
+        # Mesmas variáveis de contexto da chamada (rastreamento de consultas e métricas)
+        return context.run(func)
+    finally:
+        _set_script_ctx(None)
+
+def _session_key(script_ctx) -> str:
+    # Chamadas fora de uma sessão (threads de fundo) dividem a mesma conta
+    return getattr(script_ctx, "session_id", None) or "global"
+
+def _is_saturated(session: str) -> bool:
+    with _stalled_lock:
+        return _stalled.get(session, 0) >= QUERY_MAX_STALLED or sum(_stalled.values()) >= QUERY_STALL_HEADROOM
+
+def _abandon(future, session: str):
+    # Corrotinas e consultas ainda na fila são canceladas; uma thread já em execução não:
+    # contabiliza a thread ocupada até o término
+    if future.cancel():
+        return
+    with _stalled_lock:
+        _stalled[session] = _stalled.get(session, 0) + 1
+    future.add_done_callback(functools.partial(_release_stalled, session))
+
+def _release_stalled(session: str, _future):
+    with _stalled_lock:
+        _stalled[session] -= 1
+        if not _stalled[session]:
+            del _stalled[session]
+
+def _dispatch(func, script_ctx):
+    if inspect.iscoroutinefunction(func):
+        # As variáveis de contexto da chamada seguem para a corrotina
+        return asyncio.run_coroutine_threadsafe(func(), get_event_loop())
+    return _pool.submit(_run_task, contextvars.copy_context(), script_ctx, func)
+
+def submit(func, *args):
+    """
+    Dispara a função (síncrona ou assíncrona) sem aguardar (pré-carregamentos)
+    Leva as variáveis de contexto e a sessão do Streamlit da chamada, como run_concurrently
+    Returns: Future
+    """
+    return _dispatch(functools.partial(func, *args), _get_script_ctx())
+
+def run_concurrently(tasks: dict, timeout: float = None, fallback=None) -> dict:
+    """
+    Executa as funções (sem argumentos, síncronas ou assíncronas) em paralelo
+    tasks: {nome: função}; timeout: segundos por consulta, contados a partir do disparo
+    Returns: {nome: resultado}; consultas com erro ou além do tempo recebem `fallback`
+    """
+    timeout = QUERY_TIMEOUT_SECONDS if timeout is None else timeout
+    script_ctx = _get_script_ctx()
+    session = _session_key(script_ctx)
+
+    if _is_saturated(session):
+        increment("query_executor.saturated")
+        return {name: fallback for name in tasks}
+
+    futures = {name: _dispatch(func, script_ctx) for name, func in tasks.items()}
+    deadline = time.monotonic() + timeout
+
+    results = {}
+    for name, future in futures.items():
+        try:
+            results[name] = future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except FutureTimeoutError:
+            increment(f"query_executor.timeout.{name}")
+            results[name] = fallback
+            _abandon(future, session)
+        except Exception:
+            increment(f"query_executor.error.{name}")
+            results[name] = fallback
+
+    return results
@@ -0,0 +1,167 @@
+"""
+Rastreamento de Consultas por Renderização
+Conta e mede cada chamada ao Supabase feita durante a renderização de uma página
+e avisa quando o orçamento de consultas da página é excedido
+
+Orçamentos: DECISUM_QUERY_BUDGET (padrão para todas as páginas) e
+DECISUM_QUERY_BUDGETS para páginas específicas, ex.: "Dashboard=6,Configurações=4"
+
+Em testes:
+    with assert_query_budget(3):
+        get_system_overview()
+"""
+import contextvars
+import inspect
+import logging
+import os
+import time
+from contextlib import contextmanager
+from services.metrics_service import increment, track
+
+QUERY_BUDGET_DEFAULT = int(os.getenv("DECISUM_QUERY_BUDGET", "10"))
+
+logger = logging.getLogger(__name__)
+
+_current_trace = contextvars.ContextVar("current_trace", default=None)
+
+def _parse_budgets(spec: str) -> dict:
+    budgets = {}
+    for item in spec.split(","):
+        if "=" in item:
+            page, budget = item.rsplit("=", 1)
+            budgets[page.strip()] = int(budget)
+    return budgets
+
+PAGE_BUDGETS = _parse_budgets(os.getenv("DECISUM_QUERY_BUDGETS", ""))
+
+class _TracedQuery:
+    """
+    Envolve o construtor de consultas do postgrest e registra cada execute()
+    """
+    def __init__(self, builder, table: str, operation: str = "select"):
+        self._builder = builder
+        self._table = table
+        self._operation = operation
+
+    def __getattr__(self, name):
+        attr = getattr(self._builder, name)
+        if name == "execute":
+            return self._execute
+        if not callable(attr):
+            return attr
+
+        operation = name if name in ("select", "insert", "update", "upsert", "delete") else self._operation
+
+        def call(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            return _TracedQuery(result, self._table, operation) if hasattr(result, "execute") else result
+
+        return call
+
+    def _record(self, started: float):
+        trace = _current_trace.get()
+        if trace is not None:
+            trace["queries"].append({
+                "table": self._table,
+                "operation": self._operation,
+                "seconds": time.perf_counter() - started
+            })
+
+    def _execute(self, *args, **kwargs):
+        if inspect.iscoroutinefunction(self._builder.execute):
+            return self._execute_async(*args, **kwargs)
+
+        started = time.perf_counter()
+        try:
+            with track(f"supabase.{self._table}.{self._operation}"):
+                return self._builder.execute(*args, **kwargs)
+        finally:
+            self._record(started)
+
+    async def _execute_async(self, *args, **kwargs):
+        # Cliente assíncrono (services/async_service.py): mede até a resposta, não a criação da corrotina
+        started = time.perf_counter()
+        try:
+            with track(f"supabase.{self._table}.{self._operation}"):
+                return await self._builder.execute(*args, **kwargs)
+        finally:
+            self._record(started)
+
+class _TracedClient:
+    """
+    Envolve o cliente Supabase: table()/from_()/rpc() passam a ser rastreados
+    """
+    def __init__(self, client):
+        self._client = client
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if name in ("table", "from_"):
+            return lambda table: _TracedQuery(attr(table), table)
+        if name == "rpc":
+            return lambda function, *args, **kwargs: _TracedQuery(attr(function, *args, **kwargs), f"rpc.{function}", "rpc")
+        return attr
+
+def traced_client(client):
+    """
+    Retorna o cliente com rastreamento de consultas (idempotente)
+    """
+    return client if isinstance(client, _TracedClient) else _TracedClient(client)
+
+def get_query_budget(page: str) -> int:
+    """
+    Orçamento de consultas da página
+    """
+    return PAGE_BUDGETS.get(page, QUERY_BUDGET_DEFAULT)
+
+@contextmanager
+def trace_queries(name: str):
+    """
+    Registra as consultas feitas dentro do bloco
+    Returns (via with): dicionário com name, queries, count e seconds
+    """
+    trace = {"name": name, "queries": [], "count": 0, "seconds": 0.0}
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+        trace["count"] = len(trace["queries"])
+        trace["seconds"] = round(sum(query["seconds"] for query in trace["queries"]), 4)
+
+def check_query_budget(trace: dict, budget: int = None) -> bool:
+    """
+    Verifica o orçamento da página; registra aviso e métrica quando excedido
+    Returns: True se dentro do orçamento
+    """
+    budget = get_query_budget(trace["name"]) if budget is None else budget
+    if trace["count"] <= budget:
+        return True
+
+    increment(f"query_budget.exceeded.{trace['name']}")
+    logger.warning(
+        "Página '%s' fez %d consultas ao Supabase (orçamento: %d): %s",
+        trace["name"], trace["count"], budget, summarize_queries(trace)
+    )
+    return False
+
+def summarize_queries(trace: dict) -> str:
+    """
+    Consultas agrupadas por tabela/operação, ex.: "processes.select x3, users.select x1"
+    """
+    counts = {}
+    for query in trace["queries"]:
+        key = f"{query['table']}.{query['operation']}"
+        counts[key] = counts.get(key, 0) + 1
+    return ", ".join(f"{key} x{count}" for key, count in sorted(counts.items(), key=lambda item: -item[1]))
+
+@contextmanager
+def assert_query_budget(budget: int, name: str = "teste"):
+    """
+    Falha (AssertionError) se o bloco fizer mais consultas que o orçamento
+    """
+    with trace_queries(name) as trace:
+        yield trace
+    assert trace["count"] <= budget, (
+        f"{name}: {trace['count']} consultas ao Supabase, orçamento {budget} ({summarize_queries(trace)})"
+    )
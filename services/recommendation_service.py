@@ -0,0 +1,249 @@
+"""
+Serviço de Recomendação de Prompts
+Sugere prompts do catálogo a partir do texto do processo, sem rede (TF-IDF local)
+
+Cada prompt público vira um vetor esparso de termos (título, área, tipo, descrição,
+instrução e bloco paradigma), calculado uma vez e atualizado em create_prompt/update_prompt.
+Os vetores ficam em um índice NumPy compacto em disco (DECISUM_PROMPT_INDEX_PATH),
+reconstruído a partir do banco quando ausente ou mais antigo que DECISUM_PROMPT_INDEX_HOURS
+(alterações feitas em outros servidores)
+
+O IDF é derivado dos próprios vetores no momento da consulta, então incluir ou
+remover um prompt não exige recalcular os demais
+"""
+import math
+import os
+import re
+import threading
+import time
+import unicodedata
+import zlib
+import numpy as np
+from services.metrics_service import instrumented
+
+INDEX_PATH = os.getenv(
+    "DECISUM_PROMPT_INDEX_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), ".index", "prompts.npz")
+)
+INDEX_MAX_AGE_HOURS = float(os.getenv("DECISUM_PROMPT_INDEX_HOURS", "24"))
+
+# Espaço de termos por hashing (sem vocabulário a manter entre atualizações)
+HASH_DIMENSIONS = 2 ** 18
+
+# Recorte do processo usado na consulta (peças mais descritivas do caso primeiro)
+QUERY_MAX_CHARS = 30000
+
+# Peso do título em relação ao restante do prompt
+TITLE_WEIGHT = 3
+
+STOPWORDS = frozenset("""
+    a ao aos as ate com como da das de dela dele deles do dos e ela ele eles em entre
+    era essa esse esta este foi for ha isso isto ja lhe mais mas mesmo na nao nas nem
+    no nos num numa o os ou para pela pelas pelo pelos por qual quando que quem se
+    sem ser seu seus sob sua suas tambem tem ter um uma umas uns vez
+    art autos fls folhas processo processos parte partes id pagina paginas
+""".split())
+
+_TOKEN_PATTERN = re.compile(r"[a-z]{3,}")
+
+_lock = threading.Lock()
+_index = None
+
+def tokenize(text: str) -> list[str]:
+    """
+    Termos em minúsculas e sem acentos, sem palavras vazias
+    """
+    text = unicodedata.normalize("NFKD", text.lower()).encode("ascii", "ignore").decode()
+    return [token for token in _TOKEN_PATTERN.findall(text) if token not in STOPWORDS]
+
+def term_vector(tokens: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Vetor esparso de frequências (1 + log tf) no espaço de hashing
+    Returns: (índices ordenados, pesos)
+    """
+    counts = {}
+    for token in tokens:
+        slot = zlib.crc32(token.encode()) % HASH_DIMENSIONS
+        counts[slot] = counts.get(slot, 0) + 1
+
+    indices = np.fromiter(sorted(counts), dtype=np.int32, count=len(counts))
+    weights = np.array([1 + math.log(counts[slot]) for slot in indices], dtype=np.float32)
+    return indices, weights
+
+def _prompt_tokens(prompt: dict) -> list[str]:
+    title = tokenize(prompt.get("title") or "")
+    body = " ".join(prompt.get(field) or "" for field in
+                    ("legal_area", "decision_type", "description", "instruction", "paradigm_block"))
+    return title * TITLE_WEIGHT + tokenize(body)
+
+def _empty_index() -> dict:
+    return {"ids": [], "meta": [], "rows": [], "built_at": time.time(), "matrix": None}
+
+def _save_index(index: dict):
+    rows = index["rows"]
+    indptr = np.cumsum([0] + [len(indices) for indices, _ in rows]).astype(np.int64)
+
+    os.makedirs(os.path.dirname(INDEX_PATH), exist_ok=True)
+    tmp_path = f"{INDEX_PATH}.{os.getpid()}.tmp.npz"
+    np.savez_compressed(
+        tmp_path,
+        ids=np.array(index["ids"], dtype=str),
+        titles=np.array([meta["title"] for meta in index["meta"]], dtype=str),
+        areas=np.array([meta["legal_area"] for meta in index["meta"]], dtype=str),
+        types=np.array([meta["decision_type"] for meta in index["meta"]], dtype=str),
+        indptr=indptr,
+        indices=np.concatenate([indices for indices, _ in rows]) if rows else np.zeros(0, np.int32),
+        weights=np.concatenate([weights for _, weights in rows]) if rows else np.zeros(0, np.float32),
+        built_at=np.array(index["built_at"])
+    )
+    os.replace(tmp_path, INDEX_PATH)
+
+def _load_index():
+    try:
+        with np.load(INDEX_PATH) as data:
+            built_at = float(data["built_at"])
+            if time.time() - built_at > INDEX_MAX_AGE_HOURS * 3600:
+                return None
+
+            indptr, indices, weights = data["indptr"], data["indices"], data["weights"]
+            index = _empty_index()
+            index["built_at"] = built_at
+            index["ids"] = data["ids"].tolist()
+            index["meta"] = [
+                {"title": title, "legal_area": area, "decision_type": decision_type}
+                for title, area, decision_type in zip(data["titles"].tolist(), data["areas"].tolist(), data["types"].tolist())
+            ]
+            index["rows"] = [
+                (indices[indptr[i]:indptr[i + 1]], weights[indptr[i]:indptr[i + 1]])
+                for i in range(len(indptr) - 1)
+            ]
+            return index
+    except (OSError, KeyError, ValueError):
+        return None
+
+def _put_row(index: dict, prompt: dict):
+    meta = {field: prompt.get(field) or "" for field in ("title", "legal_area", "decision_type")}
+    row = term_vector(_prompt_tokens(prompt))
+    if prompt["id"] in index["ids"]:
+        position = index["ids"].index(prompt["id"])
+        index["meta"][position], index["rows"][position] = meta, row
+    else:
+        index["ids"].append(prompt["id"])
+        index["meta"].append(meta)
+        index["rows"].append(row)
+    index["matrix"] = None
+
+def _drop_row(index: dict, prompt_id: str):
+    if prompt_id in index["ids"]:
+        position = index["ids"].index(prompt_id)
+        for key in ("ids", "meta", "rows"):
+            del index[key][position]
+        index["matrix"] = None
+
+def _fetch_public_prompts() -> list:
+    # Import tardio: o índice só consulta o banco ao ser (re)construído
+    from config.supabase_config import get_supabase_client
+    supabase = get_supabase_client()
+    result = supabase.table("prompts").select(
+        "id, title, legal_area, decision_type, description, instruction, paradigm_block"
+    ).eq("is_public", True).execute()
+    return result.data
+
+@instrumented
+def rebuild_prompt_index() -> int:
+    """
+    Reconstrói o índice com todos os prompts públicos
+    Returns: quantidade de prompts indexados
+    """
+    global _index
+    index = _empty_index()
+    for prompt in _fetch_public_prompts():
+        _put_row(index, prompt)
+
+    with _lock:
+        _index = index
+        _save_index(index)
+    return len(index["ids"])
+
+def _get_index() -> dict:
+    global _index
+    with _lock:
+        if _index is not None and time.time() - _index["built_at"] <= INDEX_MAX_AGE_HOURS * 3600:
+            return _index
+        _index = _load_index()
+        if _index is not None:
+            return _index
+
+    rebuild_prompt_index()
+    return _index
+
+def index_prompt(prompt: dict):
+    """
+    Inclui ou atualiza o vetor de um prompt (apenas prompts públicos são sugeridos)
+    """
+    index = _get_index()
+    with _lock:
+        if prompt.get("is_public", True):
+            _put_row(index, prompt)
+        else:
+            _drop_row(index, prompt["id"])
+        _save_index(index)
+
+def remove_prompt_from_index(prompt_id: str):
+    """
+    Remove o prompt do índice
+    """
+    index = _get_index()
+    with _lock:
+        _drop_row(index, prompt_id)
+        _save_index(index)
+
+def _matrix(index: dict) -> tuple:
+    # Forma concatenada (CSR) dos vetores, refeita apenas após alterações
+    if index["matrix"] is None:
+        rows = index["rows"]
+        lengths = np.array([len(indices) for indices, _ in rows], dtype=np.int64)
+        indices = np.concatenate([indices for indices, _ in rows]).astype(np.int64)
+        weights = np.concatenate([weights for _, weights in rows])
+        row_of = np.repeat(np.arange(len(rows)), lengths)
+        document_frequency = np.bincount(indices, minlength=HASH_DIMENSIONS)
+        index["matrix"] = (indices, weights, row_of, document_frequency)
+    return index["matrix"]
+
+@instrumented
+def recommend_prompts(text: str, k: int = 5, legal_area: str = None, decision_type: str = None) -> list[dict]:
+    """
+    Prompts mais próximos do texto do processo (similaridade de cosseno TF-IDF)
+    legal_area/decision_type restringem as sugestões quando já escolhidos
+    Returns: [{id, title, legal_area, decision_type, score}] em ordem decrescente
+    """
+    from services.segmentation_service import select_relevant_text
+
+    index = _get_index()
+    with _lock:
+        if not index["ids"]:
+            return []
+        ids, meta = list(index["ids"]), list(index["meta"])
+        indices, weights, row_of, document_frequency = _matrix(index)
+
+    query_indices, query_weights = term_vector(tokenize(select_relevant_text(text, "Decisão", QUERY_MAX_CHARS)))
+    if not len(query_indices):
+        return []
+
+    idf = np.log((1 + len(ids)) / (1 + document_frequency)).astype(np.float32) + 1
+    query = np.zeros(HASH_DIMENSIONS, dtype=np.float32)
+    query[query_indices] = query_weights * idf[query_indices]
+    query /= np.linalg.norm(query)
+
+    weighted = weights * idf[indices]
+    norms = np.sqrt(np.bincount(row_of, weights=weighted ** 2, minlength=len(ids)))
+    scores = np.bincount(row_of, weights=weighted * query[indices], minlength=len(ids)) / np.maximum(norms, 1e-9)
+
+    candidates = [
+        i for i in range(len(ids))
+        if (not legal_area or meta[i]["legal_area"] == legal_area)
+        and (not decision_type or meta[i]["decision_type"] == decision_type)
+    ]
+    best = sorted(candidates, key=lambda i: scores[i], reverse=True)[:k]
+
+    return [{"id": ids[i], **meta[i], "score": round(float(scores[i]), 4)} for i in best if scores[i] > 0]
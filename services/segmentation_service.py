@@ -0,0 +1,121 @@
+"""
+Serviço de Segmentação Processual
+Divide o texto do processo em peças (inicial, contestação, decisões, audiências, laudos)
+"""
+import re
+
+SEGMENT_LABELS = {
+    "preambulo": "Capa e autuação",
+    "peticao_inicial": "Petição inicial",
+    "contestacao": "Contestação",
+    "replica": "Réplica",
+    "peticao": "Petição",
+    "decisao": "Decisão anterior",
+    "audiencia": "Ata de audiência",
+    "laudo": "Laudo pericial"
+}
+
+# Cabeçalhos reconhecidos no início da linha (ordem importa: mais específicos primeiro)
+HEADING_PATTERNS = [
+    ("peticao_inicial", re.compile(r"^\s*PETI[ÇC][ÃA]O\s+INICIAL\b", re.IGNORECASE)),
+    ("contestacao", re.compile(r"^\s*CONTESTA[ÇC][ÃA]O\b", re.IGNORECASE)),
+    ("replica", re.compile(r"^\s*(R[ÉE]PLICA\b|IMPUGNA[ÇC][ÃA]O\s+[ÀA]\s+CONTESTA[ÇC][ÃA]O)", re.IGNORECASE)),
+    ("audiencia", re.compile(r"^\s*(ATA|TERMO)\s+DE\s+AUDI[ÊE]NCIA\b", re.IGNORECASE)),
+    ("laudo", re.compile(r"^\s*LAUDO(\s+(PERICIAL|T[ÉE]CNICO|M[ÉE]DICO|SOCIAL|PSICOL[ÓO]GICO))?\b", re.IGNORECASE)),
+    ("decisao", re.compile(r"^\s*(SENTEN[ÇC]A|DECIS[ÃA]O(\s+INTERLOCUT[ÓO]RIA)?|DESPACHO)\s*:?\s*$", re.IGNORECASE)),
+    ("decisao", re.compile(r"^\s*Vistos[\s,.]", re.IGNORECASE)),
+    ("peticao", re.compile(r"^\s*EXCELENT[ÍI]SSIM[OA]", re.IGNORECASE)),
+]
+
+# Cabeçalho específico logo após o endereçamento ("Excelentíssimo...") reclassifica a peça
+MERGE_DISTANCE = 1500
+
+# Peças mais relevantes para cada tipo de ato, em ordem de prioridade
+RELEVANCE_BY_DECISION_TYPE = {
+    "Despacho": ["decisao", "peticao", "peticao_inicial"],
+    "Decisão": ["peticao_inicial", "decisao", "contestacao", "peticao", "laudo"],
+    "Sentença": ["peticao_inicial", "contestacao", "audiencia", "laudo", "replica", "decisao", "peticao"]
+}
+
+# Tipos em que as peças mais recentes importam mais que as antigas
+PREFER_RECENT = {"Despacho"}
+
+def segment_process(text: str) -> list[dict]:
+    """
+    Identifica as peças processuais pelo cabeçalho
+    Returns: lista de {"kind", "start", "end"} com offsets no texto
+    """
+    headings = []
+    offset = 0
+
+    for line in text.split("\n"):
+        for kind, pattern in HEADING_PATTERNS:
+            if pattern.match(line):
+                previous = headings[-1] if headings else None
+                if previous and offset - previous["start"] < MERGE_DISTANCE and previous["kind"] == "peticao" and kind != "peticao":
+                    previous["kind"] = kind
+                elif not (previous and previous["kind"] == kind and offset - previous["start"] < MERGE_DISTANCE):
+                    headings.append({"kind": kind, "start": offset})
+                break
+        offset += len(line) + 1
+
+    if not headings:
+        return []
+
+    # A primeira petição do processo é a inicial
+    for heading in headings:
+        if heading["kind"] == "peticao_inicial":
+            break
+        if heading["kind"] == "peticao":
+            heading["kind"] = "peticao_inicial"
+            break
+
+    segments = []
+    if headings[0]["start"] > 0:
+        segments.append({"kind": "preambulo", "start": 0, "end": headings[0]["start"]})
+
+    for i, heading in enumerate(headings):
+        end = headings[i + 1]["start"] if i + 1 < len(headings) else len(text)
+        segments.append({"kind": heading["kind"], "start": heading["start"], "end": end})
+
+    return segments
+
+def select_relevant_text(text: str, decision_type: str, max_chars: int = 15000, segments: list = None) -> str:
+    """
+    Monta um recorte do processo com as peças mais relevantes para o tipo de ato
+    Sem peças identificadas, mantém o comportamento anterior (início do texto)
+    """
+    if len(text) <= max_chars:
+        return text
+
+    if segments is None:
+        segments = segment_process(text)
+
+    priorities = RELEVANCE_BY_DECISION_TYPE.get(decision_type)
+    if not segments or not priorities:
+        return text[:max_chars]
+
+    recent_first = decision_type in PREFER_RECENT
+    remaining = max_chars
+    selected = []
+
+    for kind in priorities:
+        candidates = [segment for segment in segments if segment["kind"] == kind]
+        if recent_first:
+            candidates.reverse()
+
+        for segment in candidates:
+            if remaining <= 0:
+                break
+            length = min(segment["end"] - segment["start"], remaining)
+            selected.append((segment["start"], segment["start"] + length, kind))
+            remaining -= length
+
+    if not selected:
+        return text[:max_chars]
+
+    # Reordenar na ordem original do processo
+    selected.sort()
+    parts = [f"[{SEGMENT_LABELS[kind]}]\n{text[start:end].strip()}" for start, end, kind in selected]
+
+    return "\n\n".join(parts)
@@ -0,0 +1,76 @@
+"""
+Perfil de Inicialização
+Mede o tempo de import de cada módulo e o tempo até a primeira renderização
+
+Ative com DECISUM_PROFILE_STARTUP=1 (ex.: DECISUM_PROFILE_STARTUP=1 streamlit run app.py)
+"""
+import builtins
+import os
+import sys
+import time
+
+PROFILE_ENABLED = os.getenv("DECISUM_PROFILE_STARTUP", "") not in ("", "0", "false")
+
+# Referência do início do processo (primeira importação deste módulo)
+PROCESS_START = time.perf_counter()
+
+_original_import = builtins.__import__
+_import_times = {}
+_stack = []
+_first_render = {}
+
+def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+    # Módulos já carregados seguem pelo caminho rápido
+    if level == 0 and name in sys.modules:
+        return _original_import(name, globals, locals, fromlist, level)
+
+    started = time.perf_counter()
+    _stack.append(0.0)
+    try:
+        return _original_import(name, globals, locals, fromlist, level)
+    finally:
+        elapsed = time.perf_counter() - started
+        children = _stack.pop()
+        if _stack:
+            _stack[-1] += elapsed
+        if name not in _import_times:
+            _import_times[name] = {"inclusive": elapsed, "self": elapsed - children}
+
+def start_import_profiling():
+    """
+    Instala o medidor de imports (idempotente)
+    """
+    if builtins.__import__ is not _timed_import:
+        builtins.__import__ = _timed_import
+
+def record_render(page: str, script_started: float):
+    """
+    Registra o tempo de renderização da primeira execução de cada página
+    """
+    if page not in _first_render:
+        now = time.perf_counter()
+        _first_render[page] = {
+            "render_ms": round((now - script_started) * 1000, 1),
+            "since_process_start_ms": round((now - PROCESS_START) * 1000, 1)
+        }
+
+def get_startup_report(limit: int = 25) -> dict:
+    """
+    Retorna os imports mais lentos e os tempos de primeira renderização
+    """
+    slowest = sorted(_import_times.items(), key=lambda item: item[1]["inclusive"], reverse=True)[:limit]
+    return {
+        "imports": [
+            {
+                "module": module,
+                "inclusive_ms": round(times["inclusive"] * 1000, 1),
+                "self_ms": round(times["self"] * 1000, 1)
+            }
+            for module, times in slowest
+        ],
+        "first_render": dict(_first_render),
+        "loaded_heavy_modules": [
+            module for module in ("google.generativeai", "PyPDF2", "supabase", "pypdfium2", "pyperclip")
+            if module in sys.modules
+        ]
+    }
@@ -5,207 +5,246 @@ Dashboard com métricas compartilhadas entre todos os usuários
 import streamlit as st
 from config.supabase_config import get_supabase_client
 from datetime import datetime, timedelta
+from services.metrics_service import instrumented, record_error
+import os
 
-def get_decision_stats():
-    """
-    Retorna estatísticas de decisões geradas por tipo
-    """
-    try:
-        supabase = get_supabase_client()
-        
-        # Buscar todas as decisões com informações dos prompts
-        result = supabase.table("decisions").select("""
+# Preço do Gemini em US$ por milhão de tokens (estimativa de custo)
+GEMINI_PRICE_INPUT_PER_MTOK = float(os.getenv("DECISUM_GEMINI_PRICE_INPUT", "0.5"))
+GEMINI_PRICE_OUTPUT_PER_MTOK = float(os.getenv("DECISUM_GEMINI_PRICE_OUTPUT", "1.5"))
+
+# Consultas e resumos usados pela variante assíncrona (services/async_service.py), da qual
+# as funções get_* abaixo são fachadas: as funções *_query recebem o cliente e devolvem a
+# consulta sem executar; as funções summarize_* montam o resultado a partir das linhas
+
+EMPTY_TYPE_COUNTS = {"Despacho": 0, "Decisão": 0, "Sentença": 0}
+
+def decision_stats_query(supabase):
+    # Todas as decisões com informações dos prompts
+    return supabase.table("decisions").select("""
             id,
             created_at,
             prompts!inner(decision_type, legal_area, title)
-        """).execute()
-        
-        if not result.data:
-            return {
-                "total_decisions": 0,
-                "by_type": {"Despacho": 0, "Decisão": 0, "Sentença": 0},
-                "recent_count": 0,
-                "success": True
-            }
-        
-        # Contar por tipo
-        type_counts = {"Despacho": 0, "Decisão": 0, "Sentença": 0}
-        recent_count = 0
-        
-        # Data de 7 dias atrás para contar decisões recentes
-        seven_days_ago = datetime.now() - timedelta(days=7)
-        
-        for decision in result.data:
-            decision_type = decision["prompts"]["decision_type"]
-            if decision_type in type_counts:
-                type_counts[decision_type] += 1
-            
-            # Contar decisões recentes
-            created_date = datetime.fromisoformat(decision["created_at"].replace('Z', '+00:00'))
-            if created_date >= seven_days_ago:
-                recent_count += 1
-        
+        """)
+
+def summarize_decision_stats(rows: list) -> dict:
+    if not rows:
         return {
-            "total_decisions": len(result.data),
-            "by_type": type_counts,
-            "recent_count": recent_count,
+            "total_decisions": 0,
+            "by_type": dict(EMPTY_TYPE_COUNTS),
+            "recent_count": 0,
             "success": True
         }
     
+    # Contar por tipo
+    type_counts = dict(EMPTY_TYPE_COUNTS)
+    recent_count = 0
+    
+    # Data de 7 dias atrás para contar decisões recentes
+    seven_days_ago = datetime.now() - timedelta(days=7)
+    
+    for decision in rows:
+        decision_type = decision["prompts"]["decision_type"]
+        if decision_type in type_counts:
+            type_counts[decision_type] += 1
+        
+        # Contar decisões recentes
+        created_date = datetime.fromisoformat(decision["created_at"].replace('Z', '+00:00'))
+        if created_date >= seven_days_ago:
+            recent_count += 1
+    
+    return {
+        "total_decisions": len(rows),
+        "by_type": type_counts,
+        "recent_count": recent_count,
+        "success": True
+    }
+
+def top_legal_areas_query(supabase):
+    # Todos os prompts públicos (contagem por área feita aqui)
+    return supabase.table("prompts").select("legal_area").eq("is_public", True)
+
+def summarize_top_legal_areas(rows: list) -> dict:
+    # Contar por área jurídica
+    area_counts = {}
+    for prompt in rows or []:
+        area = prompt["legal_area"]
+        area_counts[area] = area_counts.get(area, 0) + 1
+    
+    # Ordenar e pegar top 5
+    top_areas = sorted(area_counts.items(), key=lambda x: x[1], reverse=True)[:5]
+    
+    return {
+        "areas": [{"area": area, "count": count} for area, count in top_areas],
+        "success": True
+    }
+
+def recent_prompts_query(supabase):
+    # Últimos 10 prompts públicos com dados do criador
+    return supabase.table("prompts").select("""
+            id,
+            title,
+            legal_area,
+            decision_type,
+            created_at,
+            users!inner(email)
+        """).eq("is_public", True).order("created_at", desc=True).limit(10)
+
+def summarize_recent_prompts(rows: list) -> dict:
+    formatted_prompts = []
+    for prompt in rows or []:
+        # Mascarar email para privacidade (mostrar só primeiro nome)
+        email = prompt["users"]["email"]
+        masked_email = email.split("@")[0][:3] + "***" if email else "Usuário"
+        
+        formatted_prompts.append({
+            "title": prompt["title"],
+            "area": prompt["legal_area"],
+            "type": prompt["decision_type"], 
+            "created_at": prompt["created_at"],
+            "creator": masked_email
+        })
+    
+    return {
+        "prompts": formatted_prompts,
+        "success": True
+    }
+
+def top_prompt_contributors_query(supabase):
+    # Prompts públicos com dados dos criadores
+    return supabase.table("prompts").select("""
+            created_by,
+            users!inner(email)
+        """).eq("is_public", True)
+
+def summarize_top_prompt_contributors(rows: list) -> dict:
+    # Contar prompts por usuário
+    user_counts = {}
+    for prompt in rows or []:
+        email = prompt["users"]["email"]
+        # Mascarar email para privacidade
+        masked_email = email.split("@")[0][:4] + "***" if email else "Usuário"
+        user_counts[masked_email] = user_counts.get(masked_email, 0) + 1
+    
+    # Ordenar e pegar top 10
+    top_contributors = sorted(user_counts.items(), key=lambda x: x[1], reverse=True)[:10]
+    
+    return {
+        "contributors": [{"user": user, "count": count} for user, count in top_contributors],
+        "success": True
+    }
+
+def system_overview_queries(supabase) -> dict:
+    # Consultas independentes (executadas em paralelo)
+    return {
+        "users": supabase.table("users").select("id", count="exact"),
+        "prompts": supabase.table("prompts").select("id", count="exact").eq("is_public", True),
+        "processes": supabase.table("processes").select("id", count="exact"),
+        # Usuários ativos (que fizeram login nas últimas 24h ou têm processos)
+        "active_users": supabase.table("processes").select("user_id")
+    }
+
+def summarize_system_overview(results: dict) -> dict:
+    # Resultado ausente (tempo limite) conta como zero
+    def count(name):
+        return results[name].count if results.get(name) is not None else 0
+    
+    active_users = results["active_users"].data if results.get("active_users") is not None else None
+    unique_active_users = len(set(p["user_id"] for p in active_users)) if active_users else 0
+    
+    return {
+        "total_users": count("users") or 0,
+        "active_users": unique_active_users,
+        "total_prompts": count("prompts") or 0,
+        "total_processes": count("processes") or 0,
+        "success": True
+    }
+
+@instrumented
+def get_decision_stats():
+    """
+    Retorna estatísticas de decisões geradas por tipo
+    """
+    try:
+        # Import tardio: async_service importa este módulo
+        from services.async_service import run_sync, get_decision_stats_async
+        return run_sync(get_decision_stats_async())
+    
     except Exception as e:
+        record_error(e)
         return {
             "total_decisions": 0,
-            "by_type": {"Despacho": 0, "Decisão": 0, "Sentença": 0},
+            "by_type": dict(EMPTY_TYPE_COUNTS),
             "recent_count": 0,
             "error": str(e),
             "success": False
         }
 
+@instrumented
 def get_top_legal_areas():
     """
     Retorna as 5 principais áreas jurídicas dos prompts
     """
     try:
-        supabase = get_supabase_client()
-        
-        # Buscar todos os prompts públicos com contagem por área
-        result = supabase.table("prompts").select("legal_area").eq("is_public", True).execute()
-        
-        if not result.data:
-            return {"areas": [], "success": True}
-        
-        # Contar por área jurídica
-        area_counts = {}
-        for prompt in result.data:
-            area = prompt["legal_area"]
-            area_counts[area] = area_counts.get(area, 0) + 1
-        
-        # Ordenar e pegar top 5
-        top_areas = sorted(area_counts.items(), key=lambda x: x[1], reverse=True)[:5]
-        
-        return {
-            "areas": [{"area": area, "count": count} for area, count in top_areas],
-            "success": True
-        }
+        # Import tardio: async_service importa este módulo
+        from services.async_service import run_sync, get_top_legal_areas_async
+        return run_sync(get_top_legal_areas_async())
     
     except Exception as e:
+        record_error(e)
         return {
             "areas": [],
             "error": str(e),
             "success": False
         }
 
+@instrumented
 def get_recent_prompts():
     """
     Retorna os últimos prompts adicionados (públicos)
     """
     try:
-        supabase = get_supabase_client()
-        
-        # Buscar últimos 10 prompts públicos com dados do criador
-        result = supabase.table("prompts").select("""
-            id,
-            title,
-            legal_area,
-            decision_type,
-            created_at,
-            users!inner(email)
-        """).eq("is_public", True).order("created_at", desc=True).limit(10).execute()
-        
-        if not result.data:
-            return {"prompts": [], "success": True}
-        
-        # Formatar dados
-        formatted_prompts = []
-        for prompt in result.data:
-            # Mascarar email para privacidade (mostrar só primeiro nome)
-            email = prompt["users"]["email"]
-            masked_email = email.split("@")[0][:3] + "***" if email else "Usuário"
-            
-            formatted_prompts.append({
-                "title": prompt["title"],
-                "area": prompt["legal_area"],
-                "type": prompt["decision_type"], 
-                "created_at": prompt["created_at"],
-                "creator": masked_email
-            })
-        
-        return {
-            "prompts": formatted_prompts,
-            "success": True
-        }
+        # Import tardio: async_service importa este módulo
+        from services.async_service import run_sync, get_recent_prompts_async
+        return run_sync(get_recent_prompts_async())
     
     except Exception as e:
+        record_error(e)
         return {
             "prompts": [],
             "error": str(e),
             "success": False
         }
 
+@instrumented
 def get_top_prompt_contributors():
     """
     Retorna top 10 usuários que mais contribuíram com prompts
     """
     try:
-        supabase = get_supabase_client()
-        
-        # Buscar prompts com dados dos criadores
-        result = supabase.table("prompts").select("""
-            created_by,
-            users!inner(email)
-        """).eq("is_public", True).execute()
-        
-        if not result.data:
-            return {"contributors": [], "success": True}
-        
-        # Contar prompts por usuário
-        user_counts = {}
-        for prompt in result.data:
-            email = prompt["users"]["email"]
-            # Mascarar email para privacidade
-            masked_email = email.split("@")[0][:4] + "***" if email else "Usuário"
-            user_counts[masked_email] = user_counts.get(masked_email, 0) + 1
-        
-        # Ordenar e pegar top 10
-        top_contributors = sorted(user_counts.items(), key=lambda x: x[1], reverse=True)[:10]
-        
-        return {
-            "contributors": [{"user": user, "count": count} for user, count in top_contributors],
-            "success": True
-        }
+        # Import tardio: async_service importa este módulo
+        from services.async_service import run_sync, get_top_prompt_contributors_async
+        return run_sync(get_top_prompt_contributors_async())
     
     except Exception as e:
+        record_error(e)
         return {
             "contributors": [],
             "error": str(e),
             "success": False
         }
 
+@instrumented
 def get_system_overview():
     """
     Retorna visão geral do sistema para o dashboard
     """
     try:
-        supabase = get_supabase_client()
-        
-        # Contar totais
-        total_users = supabase.table("users").select("id", count="exact").execute().count or 0
-        total_prompts = supabase.table("prompts").select("id", count="exact").eq("is_public", True).execute().count or 0
-        total_processes = supabase.table("processes").select("id", count="exact").execute().count or 0
-        
-        # Usuários ativos (que fizeram login nas últimas 24h ou têm processos)
-        active_users = supabase.table("processes").select("user_id").execute()
-        unique_active_users = len(set(p["user_id"] for p in active_users.data)) if active_users.data else 0
-        
-        return {
-            "total_users": total_users,
-            "active_users": unique_active_users,
-            "total_prompts": total_prompts,
-            "total_processes": total_processes,
-            "success": True
-        }
+        # Import tardio: async_service importa este módulo
+        from services.async_service import run_sync, get_system_overview_async
+        return run_sync(get_system_overview_async())
     
     except Exception as e:
+        record_error(e)
         return {
             "total_users": 0,
             "active_users": 0,
@@ -215,6 +254,66 @@ def get_system_overview():
             "success": False
         }
 
+def estimate_gemini_cost(prompt_tokens: int, output_tokens: int) -> float:
+    """
+    Custo estimado (US$) a partir dos tokens de entrada e saída
+    """
+    return (prompt_tokens * GEMINI_PRICE_INPUT_PER_MTOK + output_tokens * GEMINI_PRICE_OUTPUT_PER_MTOK) / 1_000_000
+
+@instrumented
+def get_gemini_usage_summary(days: int = 7, group_by: str = "prompt"):
+    """
+    Consumo do Gemini nos últimos dias, agrupado por prompt, usuário ou dia
+    A agregação por usuário/prompt/dia é feita no banco (view gemini_usage_daily)
+    """
+    try:
+        supabase = get_supabase_client()
+        
+        since = (datetime.now() - timedelta(days=days)).date().isoformat()
+        result = supabase.table("gemini_usage_daily").select("*").gte("day", since).execute()
+        
+        key_fields = {
+            "prompt": ("prompt_id", "prompt_title"),
+            "user": ("user_id", "email"),
+            "day": ("day", "day")
+        }[group_by]
+        
+        groups = {}
+        for row in result.data:
+            group = groups.setdefault(row[key_fields[0]], {
+                "label": row[key_fields[1]] or "—",
+                "calls": 0,
+                "prompt_tokens": 0,
+                "output_tokens": 0,
+                "cached_tokens": 0,
+                "wall_ms_total": 0
+            })
+            group["calls"] += row["calls"]
+            group["prompt_tokens"] += row["prompt_tokens"]
+            group["output_tokens"] += row["output_tokens"]
+            group["cached_tokens"] += row["cached_tokens"]
+            group["wall_ms_total"] += row["avg_wall_ms"] * row["calls"]
+        
+        summary = []
+        for group in groups.values():
+            summary.append({
+                "label": group["label"],
+                "calls": group["calls"],
+                "prompt_tokens": group["prompt_tokens"],
+                "output_tokens": group["output_tokens"],
+                "cached_tokens": group["cached_tokens"],
+                "avg_prompt_tokens": group["prompt_tokens"] // group["calls"],
+                "avg_wall_s": round(group["wall_ms_total"] / group["calls"] / 1000, 1),
+                "cost_usd": round(estimate_gemini_cost(group["prompt_tokens"], group["output_tokens"]), 4)
+            })
+        
+        return sorted(summary, key=lambda item: item["cost_usd"], reverse=True)
+    
+    except Exception as e:
+        record_error(e)
+        st.error(f"Erro ao buscar consumo do Gemini: {e}")
+        return []
+
 def format_time_ago(created_at):
     """
     Formata data para 'X tempo atrás'
@@ -0,0 +1,85 @@
+"""
+Serviço de Normalização de Texto
+Remove cabeçalhos, rodapés e carimbos repetidos nas páginas dos processos
+"""
+import hashlib
+import os
+import re
+
+# Uma linha é considerada repetitiva se aparece nesta fração das páginas
+BOILERPLATE_MIN_PAGE_RATIO = float(os.getenv("DECISUM_BOILERPLATE_RATIO", "0.5"))
+BOILERPLATE_MIN_PAGES = 3
+
+_DIGITS = re.compile(r"\d+")
+_SPACES = re.compile(r"[ \t\f\v\u00a0]+")
+_BLANK_LINES = re.compile(r"\n{3,}")
+
+def _line_signature(line: str) -> str:
+    """
+    Assinatura da linha ignorando números (páginas, datas, folhas) e espaços
+    """
+    normalized = _DIGITS.sub("#", _SPACES.sub(" ", line).strip().lower())
+    return hashlib.md5(normalized.encode()).hexdigest()
+
+def collapse_whitespace(text: str) -> str:
+    """
+    Colapsa espaços e linhas em branco consecutivas
+    """
+    lines = [_SPACES.sub(" ", line).strip() for line in text.split("\n")]
+    return _BLANK_LINES.sub("\n\n", "\n".join(lines)).strip()
+
+def remove_repeated_lines(pages_text: list[str]) -> tuple[list[str], int]:
+    """
+    Remove linhas que se repetem na maioria das páginas (mantém a primeira ocorrência)
+    Returns: (páginas limpas, caracteres removidos)
+    """
+    if len(pages_text) < BOILERPLATE_MIN_PAGES:
+        return pages_text, 0
+
+    # Contar em quantas páginas distintas cada linha aparece
+    page_frequency = {}
+    for page_text in pages_text:
+        signatures = {_line_signature(line) for line in page_text.split("\n") if line.strip()}
+        for signature in signatures:
+            page_frequency[signature] = page_frequency.get(signature, 0) + 1
+
+    min_pages = max(BOILERPLATE_MIN_PAGES, int(len(pages_text) * BOILERPLATE_MIN_PAGE_RATIO))
+    repeated = {signature for signature, count in page_frequency.items() if count >= min_pages}
+
+    if not repeated:
+        return pages_text, 0
+
+    cleaned_pages = []
+    removed_chars = 0
+    seen = set()
+
+    for page_text in pages_text:
+        kept_lines = []
+        for line in page_text.split("\n"):
+            signature = _line_signature(line) if line.strip() else None
+            if signature in repeated:
+                if signature in seen:
+                    removed_chars += len(line) + 1
+                    continue
+                seen.add(signature)
+            kept_lines.append(line)
+        cleaned_pages.append("\n".join(kept_lines))
+
+    return cleaned_pages, removed_chars
+
+def normalize_pages(pages_text: list[str]) -> tuple[str, dict]:
+    """
+    Normaliza o texto extraído página a página
+    Returns: (texto normalizado, estatísticas da normalização)
+    """
+    original_chars = sum(len(page_text) for page_text in pages_text) + max(len(pages_text) - 1, 0)
+
+    cleaned_pages, boilerplate_chars = remove_repeated_lines(pages_text)
+    text = collapse_whitespace("\n".join(cleaned_pages))
+
+    return text, {
+        "original_chars": original_chars,
+        "final_chars": len(text),
+        "boilerplate_chars": boilerplate_chars,
+        "removed_chars": original_chars - len(text)
+    }
@@ -0,0 +1,300 @@
+"""
+Fila de Gravação (write-behind)
+Registros são confirmados em uma fila SQLite local e enviados ao Supabase em lotes
+por uma thread em segundo plano, com novas tentativas e backoff exponencial.
+A fila sobrevive a reinícios: o que ficou pendente é enviado na próxima execução.
+Registros recusados de forma definitiva (ou após o limite de tentativas) vão para
+a tabela failed_writes, fora do envio, até um administrador reenviá-los.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from services.metrics_service import instrumented
+
+# Fora do diretório de cache: a limpeza por TTL não pode apagar gravações pendentes
+QUEUE_PATH = os.getenv("DECISUM_QUEUE_PATH", os.path.join(os.path.dirname(os.path.dirname(__file__)), ".queue", "write_queue.sqlite3"))
+QUEUE_BATCH_SIZE = int(os.getenv("DECISUM_QUEUE_BATCH_SIZE", "50"))
+QUEUE_POLL_SECONDS = float(os.getenv("DECISUM_QUEUE_POLL_SECONDS", "1"))
+RETRY_BASE_SECONDS = 2
+RETRY_MAX_SECONDS = 300
+QUEUE_MAX_ATTEMPTS = int(os.getenv("DECISUM_QUEUE_MAX_ATTEMPTS", "10"))
+
+# Tabelas aceitas pela fila, na ordem de envio (registros referenciados vão antes)
+QUEUE_TABLES = ("processes", "decisions", "gemini_usage")
+
+# Códigos PostgreSQL tratados no envio
+FOREIGN_KEY_VIOLATION = "23503"
+UNIQUE_VIOLATION = "23505"
+
+# Recusas que não mudam com novas tentativas: dados inválidos (22), restrições (23),
+# esquema/permissão (42) e requisições rejeitadas pelo PostgREST (PGRST1xx/PGRST2xx)
+PERMANENT_ERROR_PREFIXES = ("22", "23", "42", "PGRST1", "PGRST2")
+
+_lock = threading.Lock()
+_wakeup = threading.Event()
+_flusher = None
+_stats = {"flushed": 0, "failed_attempts": 0, "dead_lettered": 0, "last_flush_at": None, "last_error": None}
+
+def _connect() -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(QUEUE_PATH), exist_ok=True)
+    conn = sqlite3.connect(QUEUE_PATH, timeout=30)
+    conn.execute("pragma journal_mode=wal")
+    conn.execute("""
+        create table if not exists pending_writes (
+            seq integer primary key autoincrement,
+            table_name text not null,
+            record_id text not null,
+            payload text not null,
+            enqueued_at real not null,
+            attempts integer not null default 0,
+            next_attempt_at real not null,
+            last_error text
+        )
+    """)
+    conn.execute("create index if not exists pending_writes_record_idx on pending_writes (record_id)")
+    conn.execute("""
+        create table if not exists failed_writes (
+            seq integer primary key,
+            table_name text not null,
+            record_id text not null,
+            payload text not null,
+            enqueued_at real not null,
+            attempts integer not null,
+            failed_at real not null,
+            last_error text
+        )
+    """)
+    return conn
+
+def enqueue_insert(table: str, record: dict) -> str:
+    """
+    Grava o registro na fila local e retorna imediatamente
+    O id é gerado aqui para que o chamador possa usá-lo antes do envio ao banco
+    Returns: id do registro
+    """
+    if table not in QUEUE_TABLES:
+        raise ValueError(f"Tabela não suportada pela fila: {table}")
+
+    record = {**record, "id": record.get("id") or str(uuid.uuid4())}
+    now = time.time()
+
+    with _lock:
+        conn = _connect()
+        try:
+            with conn:
+                conn.execute(
+                    "insert into pending_writes (table_name, record_id, payload, enqueued_at, next_attempt_at) values (?, ?, ?, ?, ?)",
+                    (table, record["id"], json.dumps(record, ensure_ascii=False), now, now)
+                )
+        finally:
+            conn.close()
+
+    start_flusher()
+    _wakeup.set()
+    return record["id"]
+
+def start_flusher():
+    """
+    Inicia a thread de envio (idempotente)
+    """
+    global _flusher
+    with _lock:
+        if _flusher is None or not _flusher.is_alive():
+            _flusher = threading.Thread(target=_flush_loop, name="write-queue", daemon=True)
+            _flusher.start()
+
+def _flush_loop():
+    while True:
+        _wakeup.wait(QUEUE_POLL_SECONDS)
+        _wakeup.clear()
+        try:
+            while flush_pending() == QUEUE_BATCH_SIZE:
+                pass
+        except Exception as e:
+            _stats["last_error"] = str(e)
+
+@instrumented
+def flush_pending() -> int:
+    """
+    Envia um lote de registros vencidos de cada tabela
+    Returns: maior número de registros lidos em uma tabela (igual ao lote = pode haver mais)
+    """
+    from config.supabase_config import get_supabase_client
+
+    largest = 0
+    for table in QUEUE_TABLES:
+        with _lock:
+            conn = _connect()
+            try:
+                rows = conn.execute(
+                    "select seq, payload, attempts from pending_writes where table_name = ? and next_attempt_at <= ? order by seq limit ?",
+                    (table, time.time(), QUEUE_BATCH_SIZE)
+                ).fetchall()
+            finally:
+                conn.close()
+
+        if not rows:
+            continue
+        largest = max(largest, len(rows))
+
+        supabase = get_supabase_client()
+        records = [json.loads(payload) for _, payload, _ in rows]
+
+        try:
+            supabase.table(table).insert(records, returning="minimal").execute()
+            _mark_done([seq for seq, _, _ in rows])
+        except Exception:
+            # Lote recusado: envia um a um para isolar o registro com problema
+            for (seq, _, attempts), record in zip(rows, records):
+                _flush_one(supabase, table, seq, attempts, record)
+
+    return largest
+
+def _flush_one(supabase, table: str, seq: int, attempts: int, record: dict):
+    try:
+        try:
+            supabase.table(table).insert(record, returning="minimal").execute()
+        except Exception as e:
+            # Decisão de um processo removido pela limpeza automática: grava sem o vínculo
+            if table != "decisions" or getattr(e, "code", None) != FOREIGN_KEY_VIOLATION or not record.get("process_id"):
+                raise
+            if _is_pending(record["process_id"]):
+                # O processo ainda está na fila: a decisão aguarda a próxima tentativa
+                _mark_failed(seq, attempts, str(e))
+                return
+            supabase.table(table).insert({**record, "process_id": None}, returning="minimal").execute()
+        _mark_done([seq])
+    except Exception as e:
+        if getattr(e, "code", None) == UNIQUE_VIOLATION:
+            # Já gravado em uma tentativa anterior (mesmo id)
+            _mark_done([seq])
+            return
+        _mark_failed(seq, attempts, str(e), permanent=_is_permanent(e))
+
+def _is_permanent(error: Exception) -> bool:
+    """
+    Recusa definitiva do banco (o mesmo registro nunca será aceito)
+    Erros sem código (rede, tempo esgotado, 5xx) são tratados como transitórios
+    """
+    code = str(getattr(error, "code", None) or "")
+    return code.startswith(PERMANENT_ERROR_PREFIXES)
+
+def _is_pending(record_id: str) -> bool:
+    with _lock:
+        conn = _connect()
+        try:
+            return conn.execute("select 1 from pending_writes where record_id = ? limit 1", (record_id,)).fetchone() is not None
+        finally:
+            conn.close()
+
+def _mark_done(seqs: list[int]):
+    with _lock:
+        conn = _connect()
+        try:
+            with conn:
+                conn.executemany("delete from pending_writes where seq = ?", [(seq,) for seq in seqs])
+        finally:
+            conn.close()
+    _stats["flushed"] += len(seqs)
+    _stats["last_flush_at"] = time.time()
+
+def _mark_failed(seq: int, attempts: int, error: str, permanent: bool = False):
+    """
+    Agenda nova tentativa com backoff, ou move o registro para failed_writes
+    quando a recusa é definitiva ou o limite de tentativas foi atingido
+    """
+    now = time.time()
+    dead = permanent or attempts + 1 >= QUEUE_MAX_ATTEMPTS
+    with _lock:
+        conn = _connect()
+        try:
+            with conn:
+                conn.execute(
+                    "update pending_writes set attempts = attempts + 1, next_attempt_at = ?, last_error = ? where seq = ?",
+                    (now + min(RETRY_BASE_SECONDS * 2 ** attempts, RETRY_MAX_SECONDS), error[:500], seq)
+                )
+                if dead:
+                    conn.execute(
+                        """insert or replace into failed_writes (seq, table_name, record_id, payload, enqueued_at, attempts, failed_at, last_error)
+                           select seq, table_name, record_id, payload, enqueued_at, attempts, ?, last_error from pending_writes where seq = ?""",
+                        (now, seq)
+                    )
+                    conn.execute("delete from pending_writes where seq = ?", (seq,))
+        finally:
+            conn.close()
+    _stats["failed_attempts"] += 1
+    _stats["last_error"] = error
+    if dead:
+        _stats["dead_lettered"] += 1
+
+def get_failed_writes(limit: int = 20) -> list[dict]:
+    """
+    Registros recusados de forma definitiva, mais recentes primeiro
+    """
+    with _lock:
+        conn = _connect()
+        try:
+            rows = conn.execute(
+                "select seq, table_name, record_id, attempts, failed_at, last_error from failed_writes order by failed_at desc limit ?",
+                (limit,)
+            ).fetchall()
+        finally:
+            conn.close()
+    return [
+        {"seq": seq, "table": table, "record_id": record_id, "attempts": attempts, "failed_at": failed_at, "last_error": last_error}
+        for seq, table, record_id, attempts, failed_at, last_error in rows
+    ]
+
+def requeue_failed_writes() -> int:
+    """
+    Devolve à fila os registros de failed_writes (ex.: após corrigir esquema ou permissões)
+    Returns: número de registros reenviados
+    """
+    now = time.time()
+    with _lock:
+        conn = _connect()
+        try:
+            with conn:
+                requeued = conn.execute(
+                    """insert into pending_writes (seq, table_name, record_id, payload, enqueued_at, attempts, next_attempt_at, last_error)
+                       select seq, table_name, record_id, payload, enqueued_at, 0, ?, last_error from failed_writes""",
+                    (now,)
+                ).rowcount
+                conn.execute("delete from failed_writes")
+        finally:
+            conn.close()
+
+    if requeued:
+        start_flusher()
+        _wakeup.set()
+    return requeued
+
+def get_queue_metrics() -> dict:
+    """
+    Profundidade e atraso da fila
+    - depth: registros aguardando envio (por tabela em by_table)
+    - lag_seconds: idade do registro pendente mais antigo
+    - retrying: registros que já falharam ao menos uma vez
+    - dead_letter: registros fora do envio em failed_writes
+    """
+    with _lock:
+        conn = _connect()
+        try:
+            by_table = dict(conn.execute("select table_name, count(*) from pending_writes group by table_name").fetchall())
+            oldest, retrying = conn.execute("select min(enqueued_at), sum(attempts > 0) from pending_writes").fetchone()
+            dead_letter = conn.execute("select count(*) from failed_writes").fetchone()[0]
+        finally:
+            conn.close()
+
+    return {
+        "depth": sum(by_table.values()),
+        "by_table": by_table,
+        "lag_seconds": round(time.time() - oldest, 1) if oldest else 0.0,
+        "retrying": retrying or 0,
+        "dead_letter": dead_letter,
+        "flusher_alive": _flusher is not None and _flusher.is_alive(),
+        **_stats
+    }